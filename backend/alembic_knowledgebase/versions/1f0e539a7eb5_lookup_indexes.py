@@ -0,0 +1,71 @@
+"""lookup indexes
+
+Covering indexes for the access paths of db/repository/view.py:
+term lookups on VN_main, VN_synonym, EN_main, EN_synonym and the vsource
+ids, and the Update_Date / Insert_Date windows of the review and editor
+activity pages.
+
+Revision ID: 1f0e539a7eb5
+Revises:
+Create Date: 2026-10-16 09:12:41.220315
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "1f0e539a7eb5"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+DICTIONARY = "CID_LCIN_DICTIONARY"
+VN_SYNONYM = "CID_LCIN_VN_SYNONYM"
+EN_DO = "CID_LCIN_EN_DO"
+EN_UMLS = "CID_LCIN_EN_UMLS"
+DO_SYNONYM = "CID_LCIN_EN_DO_SYNONYM"
+UMLS_SYNONYM = "CID_LCIN_EN_UMLS_SYNONYM"
+
+
+# The vsource ids: primary keys of the source tables and foreign keys of
+# their synonym tables
+DO_ID = "DO_ID"
+CUI = "CUI"
+
+# (table, key columns, included columns) of every index of this revision
+LOOKUP_INDEXES = [
+    (DICTIONARY, ["VN_main"], ["EN_main"]),
+    (DICTIONARY, ["EN_main"], ["VN_main"]),
+    (VN_SYNONYM, ["VN_synonym"], ["VN_main"]),
+    (VN_SYNONYM, ["VN_main"], ["VN_synonym"]),
+    (EN_DO, ["EN_main"], [DO_ID]),
+    (EN_UMLS, ["EN_main"], [CUI]),
+    (DO_SYNONYM, ["EN_synonym"], [DO_ID]),
+    (DO_SYNONYM, [DO_ID], ["EN_synonym"]),
+    (UMLS_SYNONYM, ["EN_synonym"], [CUI]),
+    (UMLS_SYNONYM, [CUI], ["EN_synonym"]),
+] + [
+    (table, [f"{event}_Date"], [f"{event}_User"])
+    for table in [DICTIONARY, VN_SYNONYM, EN_DO, EN_UMLS, DO_SYNONYM, UMLS_SYNONYM]
+    for event in ["Update", "Insert"]
+]
+
+
+def index_name(table, columns):
+    return f"ix_{table}_{'_'.join(columns)}"
+
+
+def upgrade() -> None:
+    for table, columns, include in LOOKUP_INDEXES:
+        op.create_index(
+            index_name(table, columns),
+            table,
+            columns,
+            unique=False,
+            mssql_include=include,
+        )
+
+
+def downgrade() -> None:
+    for table, columns, _ in reversed(LOOKUP_INDEXES):
+        op.drop_index(index_name(table, columns), table_name=table)
@@ -1,6 +1,9 @@
+import time
+
 from core.config import settings
 from core.hashing import Hasher
-from core.security import create_access_token
+from core.security import Principal, create_access_token, principal_cache
+from db.executor import run_db
 from db.repository.login import get_user
 from db.session import get_userdb as get_db
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -24,9 +27,33 @@ def authenticate_user(email: str, password: str, db: Session):
     return user
 
 
+async def authenticate_user_async(email: str, password: str, db: Session):
+    """
+    Same as authenticate_user, without blocking the event loop: the user
+    lookup runs in the database pool and bcrypt in the hashing pool
+    """
+    user = await run_db(get_user, email=email, db=db)
+    if not user:
+        return False
+    if not await Hasher.verify_password_async(password, user.password):
+        return False
+    return user
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+) -> Principal:
+    """
+    Return the `Principal` of the active user owning `token`.
+
+    Verified tokens are remembered in `principal_cache` until the earlier of
+    their expiry and PRINCIPAL_CACHE_TTL_SECONDS, so repeated requests skip
+    both the JWT decoding and the user database query.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -42,16 +69,24 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     user = get_user(email=username, db=db)
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user
+
+    principal = Principal.of(user)
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        principal_cache.set(token, principal, ttl=ttl)
+    return principal
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user_async(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,5 +1,5 @@
 from apis.v1.route_login import get_current_user
-from db.models.user import User
+from core.security import Principal
 from db.session import get_userdb
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
@@ -11,7 +11,7 @@ router = APIRouter()
 def protected_one(
     id: int,
     userdb: Session = Depends(get_userdb),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     message = show_test_private(id, db=userdb)
     return {"message": message}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from apps.v1 import route_chart, route_login, route_view
+from apps.v1 import route_admin, route_chart, route_login, route_view
 
 app_router = APIRouter()
 
@@ -17,3 +17,7 @@ app_router.include_router(
 app_router.include_router(
     route_login.router, prefix="/auth", tags=[""], include_in_schema=False
 )
+
+app_router.include_router(
+    route_admin.router, prefix="", tags=["admin"], include_in_schema=False
+)
@@ -0,0 +1,215 @@
+import secrets
+
+from apps.v1.route_login import validate_superuser
+from core.config import settings
+from core.http_cache import response_cache
+from core.metrics import CONTENT_TYPE, registry
+from core.profiler import profile_store
+from db.executor import run_db
+from db.pool import pool_status
+from db.repository import view
+from db.repository.user import deactivate_user
+from db.session import get_userdb, knowledgebase_engine, userdb_engine
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+
+router = APIRouter()
+
+
+@router.get("/admin/concept_index")
+async def concept_index_status(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Show build time, size and age of the in-memory concept index, and of
+    the type-ahead suggestions. Superusers only
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    return {
+        "enabled": settings.CONCEPT_INDEX_ENABLED,
+        **view.concept_index.status(),
+        "suggestions": view.suggestions.status(),
+    }
+
+
+@router.post("/admin/concept_index/refresh")
+async def refresh_concept_index(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Rebuild the concept index in the background. Lookups keep using the
+    current index (or the database) until the new one is ready.
+    Superusers only
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    started = view.concept_index.refresh()
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder({"started": started, **view.concept_index.status()}),
+    )
+
+
+@router.post("/admin/users/{email}/deactivate")
+async def deactivate(
+    request: Request,
+    email: str,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Deactivate the user `email`. Their access tokens stop working on their
+    next request. Superusers only
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    user = await run_db(deactivate_user, email, userdb)
+    if user is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": f"{email} not found"},
+        )
+    return {"email": user.email, "is_active": user.is_active}
+
+
+@router.get("/admin/cache")
+async def cache_status(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Hit ratio, size and evictions of the response cache, and the table
+    change tokens and change feed that invalidate it. Superusers only
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    return {
+        "response": response_cache.stats(),
+        "row_count": view.row_count_cache.stats(),
+        "change_tokens": view.change_tokens.status(),
+        "change_feed": {
+            "enabled": settings.CHANGE_FEED_ENABLED,
+            **view.change_feed.status(),
+        },
+    }
+
+
+@router.get("/admin/schema")
+async def schema_snapshot_status(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Show the version and freshness of the cached knowledge-base schema
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    return view.schema_snapshot.status()
+
+
+@router.get("/health/db")
+async def database_health(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Connection pool usage of both engines: checked-out, idle and overflow
+    connections and how long checkouts waited for a connection
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    return {
+        "userdb": pool_status(userdb_engine),
+        "knowledgebase": pool_status(knowledgebase_engine),
+    }
+
+
+def has_metrics_token(request: Request) -> bool:
+    if settings.METRICS_TOKEN is None:
+        return False
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(
+        token, settings.METRICS_TOKEN
+    )
+
+
+@router.get("/metrics")
+async def metrics(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Request counts and latencies and SQL statements, time and rows per
+    request, by route, of this worker in the Prometheus text format.
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`,
+    people as superusers
+    """
+    if not has_metrics_token(request):
+        response = await run_db(validate_superuser, request, userdb)
+        if response:
+            return response
+
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/admin/profiles")
+async def list_profiles(
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Recent request profiles, newest first: route, parameters, status, time
+    and number of samples. Superusers only.
+
+    Profile a request by sending it with `X-Profile: 1` or `?profile=1`
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    return {
+        "enabled": settings.PROFILER_ENABLED,
+        "profiles": await run_db(profile_store.list),
+    }
+
+
+@router.get("/admin/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    request: Request,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Folded stacks of a profile ("frame;frame;... count" lines), to open in
+    speedscope or feed to flamegraph.pl. Superusers only
+    """
+    response = await run_db(validate_superuser, request, userdb)
+    if response:
+        return response
+
+    folded = await run_db(profile_store.folded, profile_id)
+    if folded is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": f"No profile {profile_id}"},
+        )
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
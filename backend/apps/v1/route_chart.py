@@ -1,7 +1,15 @@
+import asyncio
+import hashlib
+import os
+
 from apps.v1.route_login import validate_login
+from core.charts import chart_key, chart_renderer
+from core.http_cache import is_not_modified
+from db.executor import run_db
+from db.models.table import Resolution
 from db.repository import chart
 from db.session import get_knowledgebase, get_userdb
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
@@ -12,22 +20,48 @@ router = APIRouter()
 @router.get("/summary/editor/activity")
 async def editor_activity_chart(
     request: Request,
+    resolution: Resolution = Resolution.DAY,
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
     """
-    Show the number of rows updated per editor per day as line charts
+    Show the number of rows updated per editor per day (or per week / month
+    with `resolution`) as line charts
 
+    Charts are rendered out of process and only when their data changed;
+    the page carries an ETag derived from the data of all charts.
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    dfs = chart.editor_activity()
-    for table_name, data in dfs.items():
-        chart.create_activity_chart(
-            data, table_name, f"static/chart/activity_{table_name}.png"
-        )
+    dfs = await run_db(chart.editor_activity, resolution=resolution)
+    keys = {
+        table_name: chart_key(table_name, data, resolution=resolution.value)
+        for table_name, data in dfs.items()
+    }
+
+    # The keys identify the charts: answer revalidations before rendering
+    etag = '"{}"'.format(
+        hashlib.sha256("".join(keys.values()).encode()).hexdigest()[:20]
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    paths = await asyncio.gather(
+        *[
+            chart_renderer.activity_chart(data, table_name, keys[table_name])
+            for table_name, data in dfs.items()
+        ]
+    )
+
+    charts = [
+        (table_name, f"/static/chart/{os.path.basename(path)}")
+        for table_name, path in zip(dfs, paths)
+    ]
     return templates.TemplateResponse(
-        "chart/activity.html", {"request": request, "table_names": list(dfs)}
+        "chart/activity.html",
+        {"request": request, "table_names": list(dfs), "charts": charts},
+        headers=headers,
     )
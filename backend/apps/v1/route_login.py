@@ -1,10 +1,12 @@
 import json
 from typing import Optional
 
-from apis.v1.route_login import authenticate_user, get_current_user
+from apis.v1.route_login import authenticate_user_async, get_current_user
+from core.hashing import Hasher
 from core.security import create_access_token
+from db.executor import run_db
 from db.repository.user import create_new_user
-from db.session import get_userdb
+from db.session import UserdbSessionLocal, get_userdb
 from fastapi import (APIRouter, Depends, Form, Request, Response, responses,
                      status)
 from fastapi.security.utils import get_authorization_scheme_param
@@ -24,7 +26,7 @@ def register_get(request: Request):
 
 
 @router.post("/register")
-def register_post(
+async def register_post(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
@@ -33,7 +35,8 @@ def register_post(
     errors = []
     try:
         user = UserCreate(email=email, password=password)
-        create_new_user(user=user, db=db)
+        hashed_password = await Hasher.get_password_hash_async(user.password)
+        await run_db(create_new_user, user=user, db=db, hashed_password=hashed_password)
         return responses.RedirectResponse(
             "/?alert=Successfully%20Registered", status_code=status.HTTP_302_FOUND
         )
@@ -57,14 +60,14 @@ def login_get(
 
 
 @router.post("/login")
-def login_post(
+async def login_post(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
     userdb: Session = Depends(get_userdb),
 ):
     errors = []
-    user = authenticate_user(email=email, password=password, db=userdb)
+    user = await authenticate_user_async(email=email, password=password, db=userdb)
     if not user:
         errors.append("Incorrect email or password")
         return templates.TemplateResponse(
@@ -116,3 +119,42 @@ def validate_login(request: Request, userdb: Session = Depends(get_userdb)):
         response.delete_cookie(key="access_token")
 
         return response
+
+
+def get_superuser(request: Request, userdb: Session):
+    """
+    Return the logged-in user of `request` if a superuser, else None
+    """
+    token = request.cookies.get("access_token")
+    _, token = get_authorization_scheme_param(token)
+    try:
+        user = get_current_user(token=token, db=userdb)
+    except Exception:
+        return None
+    return user if user.is_superuser else None
+
+
+def request_superuser(request: Request):
+    """
+    Same as get_superuser, with a user database session of its own, for
+    middleware
+    """
+    userdb = UserdbSessionLocal()
+    try:
+        return get_superuser(request, userdb)
+    finally:
+        userdb.close()
+
+
+def validate_superuser(request: Request, userdb: Session = Depends(get_userdb)):
+    """
+    Same as validate_login, and answer 403 to users who are not superusers
+    """
+    response = validate_login(request, userdb)
+    if response:
+        return response
+    if get_superuser(request, userdb) is None:
+        return responses.JSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN,
+            content={"detail": "Superusers only"},
+        )
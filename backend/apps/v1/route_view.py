@@ -1,16 +1,26 @@
-from typing import List, Optional
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import (Any, AsyncIterator, Awaitable, Callable, Hashable, List,
+                    Optional)
 
 from apis.v1.route_login import get_current_user
 from apps.v1.route_login import validate_login
-from db.models.table import StandardName, TableName
+from core.config import settings
+from core.http_cache import response_cache
+from db.executor import iterate_db, run_db
+from db.models.table import CountMode, ExportFormat, StandardName, TableName
 from db.repository import view
+from db.repository.pagination import InvalidCursor, decode_cursor
 from db.repository.view import locate_standard
 from db.session import get_knowledgebase, get_userdb
-from db.session import knowledgebase_engine as engine
-from fastapi import (APIRouter, Depends, HTTPException, Path, Request,
-                     responses, status)
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response, responses, status)
+from fastapi.responses import StreamingResponse
 from fastapi.security.utils import get_authorization_scheme_param
 from fastapi.templating import Jinja2Templates
+from schemas.concept import TermBatch
 from sqlalchemy.orm import Session
 
 templates = Jinja2Templates(directory="templates")
@@ -21,6 +31,98 @@ vi_term_path = Path(
 )
 
 
+async def ndjson_lines(batches: AsyncIterator[list]) -> AsyncIterator[str]:
+    """
+    One JSON value per line, one chunk per batch
+    """
+    async for batch in batches:
+        yield "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in batch)
+
+
+async def csv_lines(
+    batches: AsyncIterator[list], header: List[str]
+) -> AsyncIterator[str]:
+    """
+    CSV with a header row, one chunk per batch of single-column values
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    async for batch in batches:
+        writer.writerows([value] for value in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+# Tables the /concept and /std responses are read from
+CONCEPT_TABLES = [table.name for table in view.concept_tables]
+
+
+def concept_index_version() -> Optional[datetime]:
+    """
+    Build time of the concept index answering the lookups, if any: a new
+    index may answer differently for the same change tokens
+    """
+    index = view.concept_index.index
+    return index.built_at if index is not None else None
+
+
+async def cached_json(
+    request: Request,
+    table_names: List[str],
+    compute: Callable[[], Awaitable[Any]],
+    *version: Hashable,
+) -> Response:
+    """
+    Serve `await compute()` as JSON from the response cache for as long as
+    the change tokens of `table_names` (and `version`) stay the same, with
+    ETag and Last-Modified headers for conditional requests.
+
+    Errors raised by `compute` are not cached. Responses reading a table
+    without change token are never cached.
+    """
+    tokens = await run_db(view.change_tokens.get)
+    if any(table_name not in tokens for table_name in table_names):
+        return await compute()
+
+    table_tokens = tuple(tokens[table_name] for table_name in table_names)
+    version = (table_tokens, *version)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    entry = response_cache.get(key, version)
+    if entry is None:
+        content = await compute()
+        last_modified = max(
+            (day for token in table_tokens for day in token[:2] if day is not None),
+            default=None,
+        )
+        entry = response_cache.put(key, table_names, version, content, last_modified)
+    return response_cache.response(request, entry)
+
+
+def batch_result(terms: List[str], concepts: dict) -> dict:
+    """
+    Shape the output of locate_vn_terms/locate_en_terms like the single-term
+    routes, adding the queried term and a `found` marker to each item
+    """
+    results = []
+    for term in terms:
+        vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = concepts[term]
+        results.append(
+            {
+                "term": term,
+                "found": en_main is not None,
+                "vn_main": vn_main,
+                "en_main": en_main,
+                "vn_synonyms": vn_synonyms,
+                "en_synonyms": en_synonyms,
+                "en_main_vsrc": en_main_vsrc,
+            }
+        )
+    return {"results": results}
+
+
 @router.get("/table/names", response_model=List[str])
 async def get_table_names(
     request: Request,
@@ -30,7 +132,7 @@ async def get_table_names(
     """
     Get a list of available table names.
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
@@ -73,20 +175,23 @@ def view_detail(request: Request, id: int, userdb: Session = Depends(get_userdb)
 async def table_summary(
     request: Request,
     table_name: TableName,
+    count: CountMode = CountMode.EXACT,
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
     """
     Showing table information including number of rows, columns, PK, FK, etc.
+    `count=approx` reads the number of rows from the table statistics.
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    db_table = view.get_table(table_name.value)
-    return_dict = view.get_table_summary(db, db_table)
+    async def summary():
+        db_table = await run_db(view.get_table, table_name.value)
+        return await run_db(view.get_table_summary, db, db_table, count)
 
-    return return_dict
+    return await cached_json(request, [table_name.value], summary)
 
 
 @router.get("/concept/vi/{vi_term}")
@@ -102,60 +207,103 @@ async def discover_vi_term(
         else, return the details of the concept
 
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = view.locate_vn_term(
-        vi_term
-    )
-
-    if vn_main is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"{vi_term} not found in database",
+    async def concept():
+        vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = await run_db(
+            view.locate_vn_term, vi_term
         )
-    return {
-        "vn_main": vn_main,
-        "en_main": en_main,
-        "vn_synonyms": vn_synonyms,
-        "en_synonyms": en_synonyms,
-        "en_main_vsrc": en_main_vsrc,
-    }
+
+        if vn_main is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{vi_term} not found in database",
+            )
+        return {
+            "vn_main": vn_main,
+            "en_main": en_main,
+            "vn_synonyms": vn_synonyms,
+            "en_synonyms": en_synonyms,
+            "en_main_vsrc": en_main_vsrc,
+        }
+
+    return await cached_json(request, CONCEPT_TABLES, concept, concept_index_version())
+
+
+@router.post("/concept/vi/batch")
+async def discover_vi_terms(
+    request: Request,
+    batch: TermBatch,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Batch version of /concept/vi/{vi_term}: resolve a list of Vietnamese terms.
+    Unknown terms are returned with `found` set to false
+    """
+    response = await run_db(validate_login, request, userdb)
+    if response:
+        return response
+
+    return batch_result(batch.terms, await run_db(view.locate_vn_terms, batch.terms))
+
+
+async def editor_counts(
+    mode: str, since: Optional[date], until: Optional[date], incremental: bool
+) -> dict:
+    if incremental:
+        if since is not None or until is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="incremental counts cannot be restricted to a date window",
+            )
+        if mode == "insert":
+            return await run_db(view.editor_insert_contributions.counts)
+    return await run_db(view.rows_per_editors, mode, since, until)
 
 
 @router.get("/summary/editor/insert_count")
 async def editor_insert_counts(
     request: Request,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    incremental: bool = False,
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
     """
-    Show the number of inserted rows contributed per editor
+    Show the number of inserted rows contributed per editor, optionally only
+    those inserted in [since, until). `incremental=true` only counts the rows
+    inserted since the previous call and adds them to its result
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    result = view.rows_per_editors(mode="insert")
-    return result
+    return await editor_counts("insert", since, until, incremental)
 
 
 @router.get("/summary/editor/update_count")
 async def editor_update_counts(
     request: Request,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    incremental: bool = False,
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
     """
-    Show the number of updated rows contributed per editor
+    Show the number of updated rows contributed per editor, optionally only
+    those updated in [since, until). `incremental=true` is accepted for
+    symmetry with /summary/editor/insert_count but always counts in full: a
+    row updated again cannot be told from a newly updated one
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    result = view.rows_per_editors(mode="update")
-    return result
+    return await editor_counts("update", since, until, incremental)
 
 
 # The path parameter to be used in following routes
@@ -175,26 +323,46 @@ async def discover_en_term(
     If English term en_term is not a known en_main or en_synonym, return error
     else, return the details of the concept
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = view.locate_en_term(
-        en_term
-    )
-    if en_main is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"{en_term} not found in database",
+    async def concept():
+        vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = await run_db(
+            view.locate_en_term, en_term
         )
+        if en_main is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{en_term} not found in database",
+            )
+
+        return {
+            "vn_main": vn_main,
+            "en_main": en_main,
+            "vn_synonyms": vn_synonyms,
+            "en_synonyms": en_synonyms,
+            "en_main_vsrc": en_main_vsrc,
+        }
 
-    return {
-        "vn_main": vn_main,
-        "en_main": en_main,
-        "vn_synonyms": vn_synonyms,
-        "en_synonyms": en_synonyms,
-        "en_main_vsrc": en_main_vsrc,
-    }
+    return await cached_json(request, CONCEPT_TABLES, concept, concept_index_version())
+
+
+@router.post("/concept/en/batch")
+async def discover_en_terms(
+    request: Request,
+    batch: TermBatch,
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Batch version of /concept/en/{en_term}: resolve a list of English terms.
+    Unknown terms are returned with `found` set to false
+    """
+    response = await run_db(validate_login, request, userdb)
+    if response:
+        return response
+
+    return batch_result(batch.terms, await run_db(view.locate_en_terms, batch.terms))
 
 
 @router.get("/term/vi/{vi_term}")
@@ -207,18 +375,11 @@ async def check_vn_term_exist(
     """
     Check if Vietnamese term vn_term exists in the database
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    found = False
-    with engine.connect() as conn:
-        if view.vn_synonym_to_vn_main(conn, vi_term) or view.vn_main_in_dictionary(
-            conn, vi_term
-        ):
-            found = True
-
-    return found
+    return await run_db(view.vn_term_exists, vi_term)
 
 
 @router.get("/term/en/{en_term}")
@@ -231,18 +392,46 @@ async def check_en_term_exist(
     """
     Check if English term en_term exists in the database
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
+    if response:
+        return response
+
+    return await run_db(view.en_term_exists, en_term)
+
+
+@router.get("/suggest/vi")
+async def suggest_vi_terms(
+    request: Request,
+    q: str = Query(..., min_length=1, description="beginning of a Vietnamese term"),
+    limit: int = Query(settings.SUGGEST_LIMIT, ge=1, le=settings.SUGGEST_LIMIT_MAX),
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    Vietnamese terms starting with q, ignoring case and diacritics:
+    main terms first, then synonyms with their main term
+    """
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
-    found = False
-    with engine.connect() as conn:
-        if view.en_main_in_dictionary(conn, en_term) or view.en_synonym_to_en_main(
-            conn, en_term
-        ):
-            found = True
+    return await run_db(view.suggest_vn_terms, q, limit)
+
+
+@router.get("/suggest/en")
+async def suggest_en_terms(
+    request: Request,
+    q: str = Query(..., min_length=1, description="beginning of an English term"),
+    limit: int = Query(settings.SUGGEST_LIMIT, ge=1, le=settings.SUGGEST_LIMIT_MAX),
+    userdb: Session = Depends(get_userdb),
+):
+    """
+    English terms starting with q, see /suggest/vi
+    """
+    response = await run_db(validate_login, request, userdb)
+    if response:
+        return response
 
-    return found
+    return await run_db(view.suggest_en_terms, q, limit)
 
 
 @router.get("/status/validate")
@@ -255,27 +444,76 @@ async def validation_status(
     Showing validation status of the en_main values in the dictionary table
     """
 
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
-    return view.validated_en_main_statistics(view.en_vsrc_tables)
+
+    async def statistics():
+        return await run_db(view.validated_en_main_statistics, view.en_vsrc_tables)
+
+    return await cached_json(
+        request,
+        [view.dictionary_table.name, *[table.name for table in view.en_vsrc_tables]],
+        statistics,
+    )
 
 
 @router.get("/status/uncharted_en_main")
 async def uncharted_en_main(
     request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    output_format: ExportFormat = Query(ExportFormat.JSON, alias="format"),
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
     """
     Showing the en_main values in the dictionary that are not mapped to any validation sources
+
+    - `limit` / `cursor`: page through the values sorted by en_main; each page
+      returns the `next_cursor` to pass for the following one
+    - `format=ndjson|csv`: stream every value (after `cursor`, if given)
     """
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
-    return {
-        "uncharted_en_mains": view.calculate_non_validated_en_main(view.en_vsrc_tables)
-    }
+
+    try:
+        after = (
+            decode_cursor(cursor, *view.uncharted_en_main_cursor_types())
+            if cursor
+            else None
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    if output_format == ExportFormat.JSON:
+        if limit is None and after is None:
+            return {
+                "uncharted_en_mains": await run_db(
+                    view.calculate_non_validated_en_main, view.en_vsrc_tables
+                )
+            }
+        en_mains, next_cursor = await run_db(
+            view.uncharted_en_main_page,
+            view.en_vsrc_tables,
+            limit or settings.PAGE_SIZE,
+            after,
+        )
+        return {"uncharted_en_mains": en_mains, "next_cursor": next_cursor}
+
+    batches = iterate_db(view.iter_uncharted_en_main(view.en_vsrc_tables, after))
+    if output_format == ExportFormat.NDJSON:
+        return StreamingResponse(
+            ndjson_lines(batches), media_type="application/x-ndjson"
+        )
+    return StreamingResponse(
+        csv_lines(batches, header=["EN_main"]),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="uncharted_en_main.csv"'},
+    )
 
 
 @router.get("/daily_review")
@@ -284,7 +522,7 @@ async def review_home(
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
@@ -300,6 +538,8 @@ async def review_table_by_day(
     table_name: TableName,
     date: str = None,
     mode: str = "update",
+    page_size: int = Query(settings.PAGE_SIZE, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
@@ -311,25 +551,57 @@ async def review_table_by_day(
     - date (str, optional): Date in YMD format, e.g., "2023-12-31".
         If not provided, the latest date from the table will be used.
     - mode (str, optional): Operation mode, either "insert" or "update".
+    - page_size (int, optional): Number of records per page.
+    - cursor (str, optional): Position of the next page, as linked from the
+        previous one.
 
     Returns:
     - dict: A dictionary containing the result or {"msg": "empty"} if the result is None.
     """
 
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
 
     table_names = [table_name.value for table_name in TableName]
 
-    db_table = view.get_table(table_name.value)
+    db_table = await run_db(view.get_table, table_name.value)
 
-    result = view.review_per_day(db_table, date, mode)
+    try:
+        after = (
+            decode_cursor(cursor, *view.review_cursor_types(db_table))
+            if cursor
+            else None
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    if date:
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date"
+            )
+
+    result, next_cursor = await run_db(
+        view.review_per_day, db_table, date, mode, page_size, after
+    )
 
     if result:
+        next_url = None
+        if next_cursor:
+            url = request.url.include_query_params(cursor=next_cursor)
+            next_url = f"{url.path}?{url.query}"
         return templates.TemplateResponse(
             "view/review.html",
-            {"request": request, "data": result, "tableNames": table_names},
+            {
+                "request": request,
+                "data": result,
+                "tableNames": table_names,
+                "next_url": next_url,
+            },
         )
 
     else:
@@ -344,22 +616,26 @@ async def locate_standard_id(
     db: Session = Depends(get_knowledgebase),
     userdb: Session = Depends(get_userdb),
 ):
-    response = validate_login(request, userdb)
+    response = await run_db(validate_login, request, userdb)
     if response:
         return response
-    match = locate_standard(stdid, glossary)
-    if not match:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"{stdid} not found in database",
-        )
-    else:
-        vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = match
 
-        return {
-            "vn_main": vn_main,
-            "en_main": en_main,
-            "vn_synonyms": vn_synonyms,
-            "en_synonyms": en_synonyms,
-            "en_main_vsrc": en_main_vsrc,
-        }
+    async def concept():
+        match = await run_db(locate_standard, stdid, glossary)
+        if not match:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{stdid} not found in database",
+            )
+        else:
+            vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = match
+
+            return {
+                "vn_main": vn_main,
+                "en_main": en_main,
+                "vn_synonyms": vn_synonyms,
+                "en_synonyms": en_synonyms,
+                "en_main_vsrc": en_main_vsrc,
+            }
+
+    return await cached_json(request, CONCEPT_TABLES, concept, concept_index_version())
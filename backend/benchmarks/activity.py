@@ -0,0 +1,136 @@
+"""
+Editor activity series: time to turn the sparse (editor, day, count) rows of
+`editor_activity` into dense per-editor series, with the previous
+strptime/fill/sort implementation as baseline.
+
+Run from the backend directory:
+
+    python -m benchmarks.activity --years 3 --editors 50 --tables 6
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from core.series import activity_series
+from db.models.table import Resolution
+
+
+def synthetic_rows(start: date, n_days: int, n_editors: int, density: float):
+    """
+    (editor, day, count) rows as returned by the activity query: each editor
+    is active on about `density` of the days
+    """
+    rows = []
+    for editor in range(n_editors):
+        for offset in range(n_days):
+            if random.random() < density:
+                rows.append(
+                    (
+                        f"editor{editor}",
+                        start + timedelta(days=offset),
+                        random.randint(1, 50),
+                    )
+                )
+    return rows
+
+
+def legacy_series(rows, from_date: datetime, to_date: datetime):
+    """
+    The implementation this replaced, kept verbatim for comparison
+    """
+    df = [(a, b.strftime("%Y-%m-%d"), c) for (a, b, c) in rows]
+    editor_ids = set(item[0] for item in df)
+    editor_data = {editor_id: {"dates": [], "activity": []} for editor_id in editor_ids}
+    for editor_id, day, activity in df:
+        editor_data[editor_id]["dates"].append(day)
+        editor_data[editor_id]["activity"].append(activity)
+    for editor_id in editor_ids:
+        user_info = editor_data[editor_id]
+        existing_dates = set(
+            datetime.strptime(day, "%Y-%m-%d") for day in user_info["dates"]
+        )
+        all_dates = [
+            from_date + timedelta(days=x) for x in range((to_date - from_date).days + 1)
+        ]
+        for day in all_dates:
+            date_str = day.strftime("%Y-%m-%d")
+            if day not in existing_dates:
+                user_info["dates"].append(date_str)
+                user_info["activity"].append(0)
+        sorted_data = sorted(zip(user_info["dates"], user_info["activity"]))
+        user_info["dates"], user_info["activity"] = zip(*sorted_data)
+    return editor_data
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(args):
+    random.seed(args.seed)
+    from_date = datetime(2021, 1, 1)
+    n_days = 365 * args.years + 1
+    to_date = from_date + timedelta(days=n_days - 1)
+    tables = [
+        synthetic_rows(from_date.date(), n_days, args.editors, args.density)
+        for _ in range(args.tables)
+    ]
+    n_rows = sum(len(rows) for rows in tables)
+    print(
+        f"{args.tables} tables x {args.editors} editors x {n_days} days, "
+        f"{n_rows} rows"
+    )
+
+    # Same output as before at day resolution
+    for rows in tables:
+        legacy = legacy_series(rows, from_date, to_date)
+        dense = activity_series(rows, from_date, to_date)
+        assert legacy.keys() == dense.keys()
+        for editor, series in legacy.items():
+            assert tuple(series["dates"]) == dense[editor]["dates"]
+            assert tuple(series["activity"]) == dense[editor]["activity"]
+
+    results = {
+        "tables": args.tables,
+        "editors": args.editors,
+        "days": n_days,
+        "rows": n_rows,
+        "seconds": {},
+    }
+    runs = [("legacy", lambda rows: legacy_series(rows, from_date, to_date))]
+    for resolution in Resolution:
+        runs.append(
+            (
+                f"dense_{resolution.value}",
+                lambda rows, resolution=resolution: activity_series(
+                    rows, from_date, to_date, resolution
+                ),
+            )
+        )
+    for name, series in runs:
+        seconds = best_of(args.repeat, lambda: [series(rows) for rows in tables])
+        results["seconds"][name] = round(seconds, 4)
+        print(f"{name:<12} {seconds * 1000:9.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--editors", type=int, default=50)
+    parser.add_argument("--tables", type=int, default=6)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,56 @@
+"""
+Compare two JSON results of a benchmark (e.g. benchmarks.repository) and
+fail if a case got slower by more than --threshold.
+
+Run from the backend directory:
+
+    python -m benchmarks.compare before.json after.json --threshold 1.2
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(args) -> int:
+    base, new = load(args.base), load(args.new)
+    print(
+        f"base {base['meta'].get('commit', '?')}  new {new['meta'].get('commit', '?')}"
+        f"  ({args.metric})"
+    )
+
+    regressions = []
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        before = base["results"].get(name, {}).get(args.metric)
+        after = new["results"].get(name, {}).get(args.metric)
+        if before is None or after is None:
+            print(f"{name:<32} {before!s:>10} {after!s:>10}")
+            continue
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 / args.threshold:
+            flag = "  faster"
+        print(f"{name:<32} {before:10.2f} {after:10.2f}  x{ratio:5.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--metric", default="median_ms")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio counted as a regression",
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Requests/second of an async route as the number of in-flight requests grows,
+comparing a handler that calls a blocking repository function directly with
+one that awaits it through `db.executor.run_db`.
+
+The repository call is simulated by sleeping for `--latency-ms`, i.e. one
+MSSQL round trip, so no database is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.concurrency --latency-ms 20 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("TIMEOUT", "30")
+
+import httpx  # noqa: E402
+from db.executor import run_db  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    def repository_call():
+        time.sleep(latency)
+        return {"ok": True}
+
+    @app.get("/blocking")
+    async def blocking():
+        return repository_call()
+
+    @app.get("/executor")
+    async def executor():
+        return await run_db(repository_call)
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, in_flight: int, n_requests: int) -> float:
+    """
+    Fire `n_requests` at `path`, keeping `in_flight` of them outstanding.
+    Return requests per second
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        queue = asyncio.Queue()
+        for _ in range(n_requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(in_flight)])
+        return n_requests / (time.perf_counter() - start)
+
+
+async def main(args):
+    app = build_app(args.latency_ms / 1000)
+    results = []
+    for in_flight in args.in_flight:
+        row = {"in_flight": in_flight}
+        for path in ("/blocking", "/executor"):
+            row[path.strip("/")] = round(
+                await measure(app, path, in_flight, args.requests), 1
+            )
+        results.append(row)
+        print(
+            f"in_flight={in_flight:>3}  blocking={row['blocking']:>8} req/s  "
+            f"executor={row['executor']:>8} req/s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--in-flight", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32]
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+Login throughput: password verifications per second at several bcrypt cost
+factors, with `--concurrency` logins in flight through
+`Hasher.verify_password_async`, as login_post does.
+
+The application reads BCRYPT_ROUNDS and HASHING_WORKERS once at import, so
+every cost factor is measured in its own process with BCRYPT_ROUNDS set.
+Run from the backend directory:
+
+    python -m benchmarks.hashing --rounds 10 11 12 --logins 40 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("TIMEOUT", "30")
+
+from core.config import settings  # noqa: E402
+from core.hashing import Hasher  # noqa: E402
+
+PASSWORD = "supersecret1234"
+
+
+async def logins_per_second(n_logins: int, concurrency: int) -> dict:
+    """
+    Verify `n_logins` passwords against a hash made by `Hasher`, at most
+    `concurrency` at a time
+    """
+    hashed = await Hasher.get_password_hash_async(PASSWORD)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            assert await Hasher.verify_password_async(PASSWORD, hashed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[login() for _ in range(n_logins)])
+    rate = n_logins / (time.perf_counter() - start)
+    # "$2b$<rounds>$...": the cost factor the application actually used
+    return {"rounds": int(hashed.split("$")[2]), "logins_per_second": round(rate, 2)}
+
+
+def measure(rounds: int, args) -> dict:
+    """
+    Run the benchmark in a child process with BCRYPT_ROUNDS=`rounds`
+    """
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.hashing",
+            "--logins",
+            str(args.logins),
+            "--concurrency",
+            str(args.concurrency),
+            "--json",
+        ],
+        env={**os.environ, "BCRYPT_ROUNDS": str(rounds)},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main(args):
+    if args.json:
+        result = asyncio.run(logins_per_second(args.logins, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    print(f"HASHING_WORKERS={settings.HASHING_WORKERS}, cpus={os.cpu_count()}")
+    results = []
+    for rounds in args.rounds or [settings.BCRYPT_ROUNDS]:
+        result = measure(rounds, args)
+        results.append(result)
+        print(
+            f"rounds={result['rounds']:>2}  {result['logins_per_second']:8.2f} logins/s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "workers": settings.HASHING_WORKERS,
+                    "concurrency": args.concurrency,
+                    "cpu_count": os.cpu_count(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        nargs="+",
+        help="cost factors to measure (default: BCRYPT_ROUNDS)",
+    )
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help=argparse.SUPPRESS,  # one measurement in this process, used by measure
+    )
+    main(parser.parse_args())
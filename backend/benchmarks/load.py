@@ -0,0 +1,414 @@
+"""
+HTTP load test of the whole application: log in, replay a weighted mix of
+routes and report throughput, p50/p95/p99 latency and errors per route.
+
+Closed loop (`--concurrency` users each sending their next request when
+the previous one is answered) or open loop (`--rate` requests per second
+arriving independently of the responses, latency counted from the
+intended send time).
+
+With --serve, create a SQLite stand-in knowledge base and user database
+and start gunicorn with `--workers` UvicornWorker processes on them.
+Run from the backend directory:
+
+    python -m benchmarks.load --serve --workers 4 --concurrency 32 --duration 30
+    python -m benchmarks.load --serve --workers 2 --rate 200 --output load.json
+
+Against an instance already running on the stand-in at --db:
+
+    python -m benchmarks.load --url http://127.0.0.1:8009 --db standin.sqlite \\
+        --email bench@example.com --password ... --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+os.environ.setdefault("TIMEOUT", "60")
+
+DEFAULT_MIX = (
+    "concept_vi=35,concept_en=25,term_vi=10,term_en=10,std=5,"
+    "status=5,review=5,activity=5"
+)
+
+
+class Terms:
+    """
+    Route arguments sampled from the stand-in database the server reads
+    """
+
+    def __init__(self, path: str, rng: random.Random, k: int = 2000):
+        def sample(query: str) -> list:
+            values = [row[0] for row in conn.execute(query) if row[0] is not None]
+            return rng.sample(values, min(k, len(values)))
+
+        with sqlite3.connect(path) as conn:
+            self.vn = sample("SELECT VN_main FROM CID_LCIN_DICTIONARY") + sample(
+                "SELECT VN_synonym FROM CID_LCIN_VN_SYNONYM"
+            )
+            self.en = sample("SELECT EN_main FROM CID_LCIN_DICTIONARY") + sample(
+                "SELECT EN_synonym FROM CID_LCIN_EN_DO_SYNONYM"
+            )
+            self.stdids = sample("SELECT DO_ID FROM CID_LCIN_EN_DO") + sample(
+                "SELECT CUI FROM CID_LCIN_EN_UMLS"
+            )
+            self.days = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT DISTINCT date(Update_Date) FROM CID_LCIN_DICTIONARY "
+                    "ORDER BY 1 DESC LIMIT 30"
+                )
+            ]
+
+
+def route_builders(terms: Terms, rng: random.Random) -> Dict[str, Callable[[], str]]:
+    """
+    Route name -> function returning the path of a request to it
+    """
+    return {
+        "concept_vi": lambda: f"/concept/vi/{quote(rng.choice(terms.vn))}",
+        "concept_en": lambda: f"/concept/en/{quote(rng.choice(terms.en))}",
+        "term_vi": lambda: f"/term/vi/{quote(rng.choice(terms.vn))}",
+        "term_en": lambda: f"/term/en/{quote(rng.choice(terms.en))}",
+        "std": lambda: f"/std/{quote(rng.choice(terms.stdids))}",
+        "status": lambda: "/status/validate",
+        "review": lambda: (
+            f"/review/CID_LCIN_DICTIONARY?date={rng.choice(terms.days)}&page_size=100"
+        ),
+        "activity": lambda: "/summary/editor/activity",
+        "suggest_vi": lambda: f"/suggest/vi?q={quote(rng.choice(terms.vn)[:3])}",
+    }
+
+
+def parse_mix(text: str, routes: Dict[str, Callable]) -> Dict[str, float]:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in routes:
+            raise SystemExit(f"Unknown route {name!r}, choose from {sorted(routes)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.recording = True
+
+    def record(self, route: str, seconds: float, status: Optional[int], error=None):
+        if not self.recording:
+            return
+        self.latencies[route].append(seconds)
+        if status is not None:
+            self.statuses[route][status] += 1
+        if error is not None:
+            self.errors[route][type(error).__name__] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        def percentile(values: List[float], p: float) -> float:
+            return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+        report = {}
+        for route in sorted(self.latencies) + ["all"]:
+            if route == "all":
+                latencies = sorted(sum(self.latencies.values(), []))
+                statuses = sum(self.statuses.values(), Counter())
+                errors = sum(self.errors.values(), Counter())
+            else:
+                latencies = sorted(self.latencies[route])
+                statuses, errors = self.statuses[route], self.errors[route]
+            if not latencies:
+                continue
+            failed = sum(errors.values()) + sum(
+                n for status, n in statuses.items() if status >= 500
+            )
+            report[route] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1] * 1000, 2),
+                "error_rate": round(failed / len(latencies), 4),
+                "statuses": {str(status): n for status, n in sorted(statuses.items())},
+                "errors": dict(errors),
+            }
+        return report
+
+
+async def send(
+    client: httpx.AsyncClient, recorder: Recorder, route: str, path: str, since: float
+):
+    """
+    GET `path` and record its latency counted from `since`
+    """
+    try:
+        response = await client.get(path)
+        recorder.record(route, time.perf_counter() - since, response.status_code)
+    except httpx.HTTPError as e:
+        recorder.record(route, time.perf_counter() - since, None, e)
+
+
+async def closed_loop(client, recorder, pick, concurrency: int, duration: float):
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            route, path = pick()
+            await send(client, recorder, route, path, time.perf_counter())
+
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+
+
+class Dropped(Exception):
+    pass
+
+
+async def open_loop(
+    client, recorder, pick, rate: float, duration: float, max_in_flight: int, rng
+):
+    """
+    Poisson arrivals at `rate` per second. Arrivals finding `max_in_flight`
+    requests outstanding are recorded as "Dropped" errors
+    """
+    start = time.perf_counter()
+    scheduled = start
+    in_flight = set()
+    while scheduled - start < duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route, path = pick()
+        if len(in_flight) >= max_in_flight:
+            recorder.record(route, 0.0, None, Dropped())
+        else:
+            task = asyncio.create_task(send(client, recorder, route, path, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        scheduled += rng.expovariate(rate)
+    await asyncio.gather(*in_flight)
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str):
+    response = await client.post(
+        "/auth/login", data={"email": email, "password": password}
+    )
+    if "access_token" not in client.cookies:
+        raise SystemExit(f"Login as {email} failed ({response.status_code})")
+
+
+async def run(args, base_url: str, terms: Terms) -> dict:
+    rng = random.Random(args.seed)
+    routes = route_builders(terms, rng)
+    mix = parse_mix(args.mix, routes)
+    names, weights = list(mix), list(mix.values())
+
+    def pick():
+        route = rng.choices(names, weights)[0]
+        return route, routes[route]()
+
+    connections = args.concurrency if args.rate is None else args.max_in_flight
+    limits = httpx.Limits(
+        max_connections=connections, max_keepalive_connections=connections
+    )
+    recorder = Recorder()
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        await login(client, args.email, args.password)
+
+        async def load(duration: float):
+            if args.rate is None:
+                await closed_loop(client, recorder, pick, args.concurrency, duration)
+            else:
+                await open_loop(
+                    client, recorder, pick, args.rate, duration, args.max_in_flight, rng
+                )
+
+        if args.warmup > 0:
+            recorder.recording = False
+            await load(args.warmup)
+            recorder.recording = True
+        start = time.perf_counter()
+        await load(args.duration)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "meta": {
+            "mode": "closed" if args.rate is None else "open",
+            "concurrency": args.concurrency if args.rate is None else None,
+            "rate": args.rate,
+            "duration": round(elapsed, 2),
+            "workers": args.workers if args.serve else None,
+            "mix": mix,
+        },
+        "routes": recorder.summary(elapsed),
+    }
+
+
+def print_report(result: dict):
+    meta = result["meta"]
+    if meta["rate"] is None:
+        load = f"concurrency {meta['concurrency']}"
+    else:
+        load = f"rate {meta['rate']}/s"
+    print(f"{meta['mode']} loop, {meta['duration']} s, {load}")
+    header = ["reqs", "req/s", "p50", "p95", "p99", "errors"]
+    print(f"{'route':<12}" + "".join(f"{name:>10}" for name in header))
+    for route, stats in result["routes"].items():
+        print(
+            f"{route:<12}{stats['requests']:>10}{stats['rps']:>10}"
+            f"{stats['p50_ms']:>8.1f}ms{stats['p95_ms']:>8.1f}ms"
+            f"{stats['p99_ms']:>8.1f}ms{stats['error_rate']:>10.2%}"
+        )
+
+
+def serve(args, workdir: str) -> subprocess.Popen:
+    """
+    Create the stand-in and a user, and start gunicorn on them
+    """
+    from db.standin import prepare_standin
+
+    prepare_standin(
+        args.db, n_concepts=args.concepts, n_editors=args.editors, days=args.days
+    )
+    env = {
+        **os.environ,
+        "KNOWLEDGE_DB_URL": f"sqlite:///{os.path.abspath(args.db)}",
+        "USERNAME_DB_URL": f"sqlite:///{os.path.join(workdir, 'users.sqlite')}",
+        "SCHEMA_SNAPSHOT_PATH": os.path.join(workdir, "schema_snapshot.pickle"),
+        "CHANGE_FEED_PATH": os.path.join(workdir, "change_feed.sqlite"),
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "load-test"),
+        "FAMILY": os.environ.get("FAMILY", args.email.split("@")[0]),
+    }
+    # The user is created before the workers start so that they do not race
+    # to create the user tables
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.load",
+            "--create-user",
+            args.email,
+            args.password,
+        ],
+        env=env,
+        check=True,
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "main:app",
+            "--workers", str(args.workers),
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--bind", f"127.0.0.1:{args.port}",
+            "--log-level", "warning",
+        ],
+        env=env,
+    )  # fmt: skip
+
+
+def create_user(email: str, password: str):
+    from core.hashing import Hasher
+    from db.base import Base
+    from db.models.user import User
+    from db.session import UserdbSessionLocal, userdb_engine
+
+    Base.metadata.create_all(bind=userdb_engine)
+    db = UserdbSessionLocal()
+    try:
+        if not db.query(User).filter(User.email == email).first():
+            hashed_password = Hasher.get_password_hash(password)
+            db.add(User(email=email, password=hashed_password, is_active=True))
+            db.commit()
+    finally:
+        db.close()
+
+
+def wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/auth/login", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit("Server did not start")
+
+
+def main(args):
+    if args.create_user:
+        create_user(*args.create_user)
+        return
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.serve:
+            args.db = args.db or os.path.join(workdir, "standin.sqlite")
+            base_url = f"http://127.0.0.1:{args.port}"
+            server = serve(args, workdir)
+        elif not args.db:
+            raise SystemExit(
+                "--db (the stand-in the server reads) is required without --serve"
+            )
+        else:
+            base_url = args.url
+
+        try:
+            if server is not None:
+                wait_until_up(base_url, server)
+            terms = Terms(args.db, random.Random(args.seed))
+            result = asyncio.run(run(args, base_url, terms))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8009")
+    parser.add_argument("--db", help="SQLite stand-in knowledge base the server reads")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="load-test-password")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route=weight,...")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16, help="closed loop")
+    parser.add_argument("--rate", type=float, help="open loop, requests per second")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="open loop")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--serve", action="store_true", help="start gunicorn on a stand-in"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8019)
+    parser.add_argument("--concepts", type=int, default=20000)
+    parser.add_argument("--editors", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument(
+        "--create-user", nargs=2, metavar=("EMAIL", "PASSWORD"), help=argparse.SUPPRESS
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,243 @@
+"""
+Repository functions of db/repository/view.py and chart.py timed against a
+SQLite stand-in knowledge base (db/standin.py), with results written as
+JSON to compare commits with benchmarks.compare.
+
+Run from the backend directory:
+
+    python -m benchmarks.repository --concepts 20000 --output before.json
+    git checkout other-branch
+    python -m benchmarks.repository --concepts 20000 --output after.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+os.environ.setdefault("TIMEOUT", "30")
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable
+    # Argument tuples cycled through, one per call
+    args: List[tuple]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def sample(conn, query, rng: random.Random, k: int) -> list:
+    values = [row[0] for row in conn.execute(query)]
+    return rng.sample(values, min(k, len(values)))
+
+
+def benchmark_cases(rng: random.Random, k: int) -> List[Case]:
+    """
+    The timed calls, with arguments sampled from the stand-in so that
+    lookups hit
+    """
+    from db.models.table import Resolution
+    from db.repository import chart, view
+    from sqlalchemy import func, select
+
+    with view.engine.connect() as conn:
+        vn_mains = sample(conn, select(view.dictionary_table.c.VN_main), rng, k)
+        en_mains = sample(conn, select(view.dictionary_table.c.EN_main), rng, k)
+        vn_synonyms = sample(conn, select(view.vn_synonym_table.c.VN_synonym), rng, k)
+        synonym_table = view.en_vsrc_synonym_tables[0]
+        en_synonyms = sample(conn, select(synonym_table.c.EN_synonym), rng, k)
+        source = view.en_vsrc_tables[0]
+        source_key = list(source.primary_key.columns)[0]
+        stdids = sample(conn, select(source_key), rng, k)
+        latest = conn.execute(
+            select(func.max(view.dictionary_table.c.Update_Date))
+        ).scalar()
+
+    day = latest.strftime("%Y-%m-%d")
+    month_ago = latest - timedelta(days=30)
+
+    def single(*args):
+        return [args]
+
+    return [
+        Case("locate_vn_term(VN_main)", view.locate_vn_term, [(t,) for t in vn_mains]),
+        Case(
+            "locate_vn_term(VN_synonym)",
+            view.locate_vn_term,
+            [(t,) for t in vn_synonyms],
+        ),
+        Case("locate_vn_term(miss)", view.locate_vn_term, single("không có")),
+        Case("locate_en_term(EN_main)", view.locate_en_term, [(t,) for t in en_mains]),
+        Case(
+            "locate_en_term(EN_synonym)",
+            view.locate_en_term,
+            [(t,) for t in en_synonyms],
+        ),
+        Case("locate_standard(any)", view.locate_standard, [(s, None) for s in stdids]),
+        Case(
+            "locate_standard(source)",
+            view.locate_standard,
+            [(s, source.name) for s in stdids],
+        ),
+        Case(
+            "validated_en_main_statistics",
+            view.validated_en_main_statistics,
+            single(view.en_vsrc_tables),
+        ),
+        Case("rows_per_editors(update)", view.rows_per_editors, single("update")),
+        Case("rows_per_editors(insert)", view.rows_per_editors, single("insert")),
+        Case(
+            "rows_per_editors(30 days)",
+            view.rows_per_editors,
+            single("update", month_ago, latest),
+        ),
+        Case(
+            "review_per_day",
+            view.review_per_day,
+            single(view.dictionary_table, day),
+        ),
+        Case("editor_activity(all)", chart.editor_activity, single()),
+        Case(
+            "editor_activity(30 days)",
+            chart.editor_activity,
+            single(month_ago, latest),
+        ),
+        Case(
+            "editor_activity(all, month)",
+            chart.editor_activity,
+            single(None, None, Resolution.MONTH),
+        ),
+    ]
+
+
+def time_case(case: Case, repeat: int, warmup: int) -> Dict[str, float]:
+    for i in range(warmup):
+        case.run(*case.args[i % len(case.args)])
+    timings = []
+    for i in range(repeat):
+        args = case.args[i % len(case.args)]
+        start = time.perf_counter()
+        case.run(*args)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "calls": repeat,
+        "min_ms": round(timings[0] * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[min(repeat - 1, int(repeat * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+    }
+
+
+def table_sizes(path: str) -> Dict[str, int]:
+    from db.standin import metadata
+
+    sizes = {}
+    with sqlite3.connect(path) as conn:
+        for table in metadata.sorted_tables:
+            query = f'SELECT COUNT(*) FROM "{table.name}"'
+            sizes[table.name] = conn.execute(query).fetchone()[0]
+    return sizes
+
+
+def main(args):
+    from db.standin import prepare_standin
+
+    if args.reuse and os.path.exists(args.db):
+        os.environ["KNOWLEDGE_DB_URL"] = f"sqlite:///{args.db}"
+        os.environ.setdefault("USERNAME_DB_URL", "sqlite://")
+        os.environ["SCHEMA_SNAPSHOT_PATH"] = ""
+    else:
+        start = time.perf_counter()
+        prepare_standin(
+            args.db,
+            migrate=not args.no_migrate,
+            n_concepts=args.concepts,
+            n_editors=args.editors,
+            days=args.days,
+            seed=args.seed,
+        )
+        print(f"stand-in created in {time.perf_counter() - start:.1f} s")
+
+    from db.repository import view
+
+    if args.concept_index:
+        view.concept_index.rebuild()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "concepts": args.concepts,
+            "editors": args.editors,
+            "days": args.days,
+            "seed": args.seed,
+            "migrated": not args.no_migrate,
+            "concept_index": args.concept_index,
+            "rows": table_sizes(args.db),
+        },
+        "results": {},
+    }
+    print(", ".join(f"{name} {n}" for name, n in results["meta"]["rows"].items()))
+
+    rng = random.Random(args.seed)
+    for case in benchmark_cases(rng, args.repeat):
+        if args.only and not any(name in case.name for name in args.only):
+            continue
+        result = time_case(case, args.repeat, args.warmup)
+        results["results"][case.name] = result
+        print(
+            f"{case.name:<32} median {result['median_ms']:9.2f} ms"
+            f"  p95 {result['p95_ms']:9.2f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default="benchmark_standin.sqlite")
+    parser.add_argument(
+        "--reuse", action="store_true", help="use the stand-in at --db if it exists"
+    )
+    parser.add_argument("--concepts", type=int, default=20000)
+    parser.add_argument("--editors", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--no-migrate", action="store_true", help="time without the lookup indexes"
+    )
+    parser.add_argument(
+        "--concept-index",
+        action="store_true",
+        help="build the in-memory concept index first",
+    )
+    parser.add_argument(
+        "--only", nargs="*", help="only cases whose name contains these"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Type-ahead suggestions: build time of a SuggestIndex over a synthetic
+vocabulary and latency of `suggest` for prefixes of 1 to 6 characters.
+
+Run from the backend directory:
+
+    python -m benchmarks.suggest --mains 100000 --synonyms 300000
+"""
+import argparse
+import json
+import random
+import time
+
+from db.repository.suggest import SuggestIndex
+
+SYLLABLES = [
+    "bệnh", "viêm", "đau", "phổi", "gan", "thận", "tim", "mạch", "nhiễm",
+    "trùng", "ung", "thư", "sốt", "ho", "khó", "thở", "xuất", "huyết",
+    "disease", "syndrome", "acute", "chronic", "infection", "of", "the",
+    "lung", "liver", "kidney", "heart", "failure", "pain", "fever",
+]  # fmt: skip
+
+
+def synthetic_term(rng: random.Random) -> str:
+    words = rng.choices(SYLLABLES, k=rng.randint(2, 5))
+    return " ".join(words) + f" {rng.randrange(10**6)}"
+
+
+def percentile(timings, p: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * p))]
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    mains = [synthetic_term(rng) for _ in range(args.mains)]
+    synonyms = [(synthetic_term(rng), rng.choice(mains)) for _ in range(args.synonyms)]
+
+    start = time.perf_counter()
+    index = SuggestIndex(mains, synonyms)
+    build_seconds = time.perf_counter() - start
+    print(f"{len(index)} terms, built in {build_seconds:.2f} s")
+
+    results = {
+        "terms": len(index),
+        "build_seconds": round(build_seconds, 3),
+        "limit": args.limit,
+        "microseconds": {},
+    }
+    for length in range(1, 7):
+        prefixes = [rng.choice(mains)[:length] for _ in range(args.queries)]
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            timings.append((time.perf_counter() - start) * 1e6)
+        p50, p99 = percentile(timings, 0.5), percentile(timings, 0.99)
+        results["microseconds"][length] = {"p50": round(p50, 1), "p99": round(p99, 1)}
+        print(f"prefix of {length}: p50 {p50:7.1f} us  p99 {p99:7.1f} us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mains", type=int, default=100000)
+    parser.add_argument("--synonyms", type=int, default=300000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
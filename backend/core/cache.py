@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A thread-safe, bounded mapping evicting the least recently used entry
+    first, with optional per-entry time-to-live.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries. 0 disables the cache.
+    ttl : float, optional
+        Default time-to-live of an entry in seconds. None means no expiry.
+    maxbytes : int, optional
+        Maximum total of the `nbytes` given to `set`. None means no limit.
+
+    Example:
+    --------
+    >>> cache = LRUCache(maxsize=2, ttl=60)
+    >>> cache.set("a", 1)
+    >>> cache.get("a")
+    1
+    >>> cache.get("b", "missing")
+    'missing'
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: Optional[float] = None, maxbytes: Optional[int] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None, nbytes: int = 0
+    ):
+        """
+        Store `value` under `key` for `ttl` seconds (default: the cache's ttl).
+        `nbytes` is the size of `value` counted against `maxbytes`; a value
+        larger than `maxbytes` is not stored
+        """
+        if self.maxsize <= 0:
+            return
+        if self.maxbytes is not None and nbytes > self.maxbytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, expires_at, nbytes)
+            self.nbytes += nbytes
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes
+            ):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is None else entry[0]
+
+    def _remove(self, key: Hashable) -> Optional[tuple]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+        return entry
+
+    def evict(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove every entry for which `predicate(key, value)` is true.
+        Return the number of removed entries
+        """
+        with self._lock:
+            keys = [
+                key for key, (value, *_) in self._data.items() if predicate(key, value)
+            ]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
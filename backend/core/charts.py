@@ -0,0 +1,170 @@
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import matplotlib
+import matplotlib.pyplot as plt
+from core.config import settings
+
+# Render to files only, never to a display
+matplotlib.use("Agg")
+
+logger = logging.getLogger(__name__)
+
+CHART_DIR = "static/chart"
+
+
+def render_activity_chart(data: dict, table_name: str, save_to: str):
+    """
+    Draw one line per editor of `data` (see `chart.editor_activity`) and save
+    the figure as PNG to `save_to`. Runs in the chart process pool
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        for editor_id, user_info in (data or {}).items():
+            ax.plot(
+                user_info["dates"],
+                user_info["activity"],
+                label=f"User {editor_id}",
+                alpha=0.6,
+            )
+
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Activity")
+        ax.set_title(f"User Activity {table_name}")
+        ax.tick_params(axis="x", rotation=45)
+        if data:
+            ax.legend()
+
+        # Write then rename so that a half-written file is never served
+        tmp_path = f"{save_to}.{os.getpid()}.tmp"
+        fig.savefig(tmp_path, format="png")
+        os.replace(tmp_path, save_to)
+    finally:
+        plt.close(fig)
+
+
+def chart_key(table_name: str, data, **params) -> str:
+    """
+    Hash of everything a chart is drawn from
+    """
+    payload = json.dumps(
+        [table_name, data, params], sort_keys=True, default=str, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        # Removed meanwhile by another worker
+        return 0.0
+
+
+class ChartRenderer:
+    """
+    Render charts in a process pool and keep them as static files named after
+    the hash of their data.
+
+    A chart is only rendered if no file exists for its data yet, and viewers
+    asking for a chart that is being rendered wait for the same render.
+
+    The directory is shared by the workers. Each of them keeps the chart it
+    last served per table, and touches a chart file whenever it serves it,
+    so that pruning down to the `keep` most recently served files of a table
+    does not remove a chart another worker still links to.
+    """
+
+    def __init__(self, directory: str, workers: int, keep: int):
+        self.directory = directory
+        self.workers = workers
+        self.keep = keep
+        self.renders = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._rendering: Dict[str, asyncio.Future] = {}
+        # Table name -> path of the chart last served by this worker
+        self.current: Dict[str, str] = {}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process running threads and holding
+            # connections is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def path(self, table_name: str, key: str) -> str:
+        return os.path.join(self.directory, f"activity_{table_name}_{key}.png")
+
+    async def activity_chart(self, data: dict, table_name: str, key: str) -> str:
+        """
+        Path of the chart of `data`, rendering it first if needed
+        """
+        path = self.path(table_name, key)
+        self.current[table_name] = path
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        future = self._rendering.get(path)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self.executor, render_activity_chart, data, table_name, path
+            )
+            self._rendering[path] = future
+            future.add_done_callback(
+                lambda future: self._rendered(future, path, table_name)
+            )
+        # A viewer going away must not cancel the render others wait for
+        await asyncio.shield(future)
+        return path
+
+    def _rendered(self, future: asyncio.Future, path: str, table_name: str):
+        self._rendering.pop(path, None)
+        if future.cancelled():
+            # Pool shut down before the render ran
+            logger.warning("Rendering %s was cancelled", path)
+            return
+        if future.exception() is not None:
+            logger.error("Rendering %s failed: %r", path, future.exception())
+            return
+        self.renders += 1
+        self.prune(table_name)
+
+    def prune(self, table_name: str):
+        """
+        Remove the charts of `table_name` but the `keep` most recently served
+        ones and the one this worker serves
+        """
+        pattern = os.path.join(self.directory, f"activity_{table_name}_*.png")
+        paths = sorted(glob.glob(pattern), key=_mtime, reverse=True)
+        for path in paths[self.keep :]:
+            if path == self.current.get(table_name):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+chart_renderer = ChartRenderer(
+    CHART_DIR, workers=settings.CHART_RENDER_WORKERS, keep=settings.CHART_CACHE_KEEP
+)
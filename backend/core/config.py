@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from string import Template
+from typing import Optional
 
 from dotenv import load_dotenv
 
@@ -24,14 +25,118 @@ class Settings:
         f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}:{DB_PORT}/$DB_NAME?driver=ODBC+Driver+17+for+SQL+Server"
     )
 
-    # Use the string template to substitute values and generate database URLs
-    USERNAME_DB_URL = BASE_DB_URL_TEMPLATE.substitute(DB_NAME=USERNAME_DB)
-    KNOWLEDGE_DB_URL = BASE_DB_URL_TEMPLATE.substitute(DB_NAME=KNOWLEDGE_DB)
+    # Use the string template to substitute values and generate database URLs,
+    # unless given in full, e.g. to use a SQLite stand-in (see db/standin.py)
+    USERNAME_DB_URL = os.getenv("USERNAME_DB_URL") or BASE_DB_URL_TEMPLATE.substitute(
+        DB_NAME=USERNAME_DB
+    )
+    KNOWLEDGE_DB_URL = os.getenv("KNOWLEDGE_DB_URL") or BASE_DB_URL_TEMPLATE.substitute(
+        DB_NAME=KNOWLEDGE_DB
+    )
+
+    # Connection pool of each engine (per gunicorn worker)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))  # in secs
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))  # in secs
+    # pyodbc only
+    DB_FAST_EXECUTEMANY: bool = os.getenv("DB_FAST_EXECUTEMANY", "1") == "1"
+    DB_CONNECT_TIMEOUT: Optional[int] = (
+        int(os.getenv("DB_CONNECT_TIMEOUT"))
+        if os.getenv("DB_CONNECT_TIMEOUT")
+        else None
+    )  # in secs
+
+    # Reflected knowledge-base schema cached on disk; empty to always reflect
+    SCHEMA_SNAPSHOT_PATH: str = os.getenv(
+        "SCHEMA_SNAPSHOT_PATH", "schema_snapshot.pickle"
+    )
+    # How often cached table metadata is checked against the catalog, in secs
+    SCHEMA_VERSION_CHECK_SECONDS: int = int(
+        os.getenv("SCHEMA_VERSION_CHECK_SECONDS", 60)
+    )
+    # Row counts of the table summary are cached for this many seconds
+    ROW_COUNT_TTL_SECONDS: int = int(os.getenv("ROW_COUNT_TTL_SECONDS", 30))
+    # Table change tokens invalidating cached responses are re-read this often
+    CHANGE_TOKEN_TTL_SECONDS: int = int(os.getenv("CHANGE_TOKEN_TTL_SECONDS", 5))
+    # Change feed sharing the change tokens between worker processes: one
+    # worker polls the knowledge base, all read the events from this file
+    CHANGE_FEED_ENABLED: bool = os.getenv("CHANGE_FEED_ENABLED", "1") == "1"
+    CHANGE_FEED_PATH: str = os.getenv("CHANGE_FEED_PATH", "change_feed.sqlite")
+    CHANGE_FEED_POLL_SECONDS: int = int(os.getenv("CHANGE_FEED_POLL_SECONDS", 2))
+    CHANGE_FEED_LEASE_SECONDS: int = int(os.getenv("CHANGE_FEED_LEASE_SECONDS", 10))
+    # In-process cache of /concept, /std, /status/validate and /table/summary
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 10000)
+    )
+    RESPONSE_CACHE_MAX_BYTES: int = int(
+        os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    )
+    # Incremental editor counts are recounted from scratch this often, in secs
+    EDITOR_COUNTS_FULL_REFRESH_SECONDS: int = int(
+        os.getenv("EDITOR_COUNTS_FULL_REFRESH_SECONDS", 3600)
+    )
+
+    # Chart rendering processes, and charts kept on disk per table
+    CHART_RENDER_WORKERS: int = int(os.getenv("CHART_RENDER_WORKERS", 1))
+    CHART_CACHE_KEEP: int = int(os.getenv("CHART_CACHE_KEEP", 3))
 
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("TIMEOUT"))  # in mins
     FAMILY = os.getenv("FAMILY")
 
+    # Password hashing: bcrypt cost factor and size of its worker pool
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    HASHING_WORKERS: int = int(os.getenv("HASHING_WORKERS", 2))
+
+    # Verified access tokens kept in memory to skip JWT decoding and user lookup
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(
+        os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 300)
+    )
+
+    # In-memory glossary index for /concept lookups
+    CONCEPT_INDEX_ENABLED: bool = os.getenv("CONCEPT_INDEX_ENABLED", "0") == "1"
+    CONCEPT_INDEX_REFRESH_SECONDS: int = int(
+        os.getenv("CONCEPT_INDEX_REFRESH_SECONDS", 600)
+    )
+
+    # Per-request SQL statement counts and timings, reported in a
+    # Server-Timing header and as per-route histograms on /metrics
+    SQL_INSTRUMENTATION_ENABLED: bool = (
+        os.getenv("SQL_INSTRUMENTATION_ENABLED", "1") == "1"
+    )
+    # Log requests running the same statement shape more than this many
+    # times, the sign of an N+1 query loop; 0 disables the check
+    SQL_REPEAT_THRESHOLD: int = int(os.getenv("SQL_REPEAT_THRESHOLD", 0))
+    # Bearer token letting Prometheus scrape /metrics without logging in
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN") or None
+
+    # Sampling profiles of single requests, for superusers sending
+    # `X-Profile: 1` or `?profile=1`; the newest PROFILE_KEEP are kept
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "1") == "1"
+    PROFILER_INTERVAL_MS: float = float(os.getenv("PROFILER_INTERVAL_MS", 5))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_KEEP: int = int(os.getenv("PROFILE_KEEP", 50))
+
+    # Thread pool running blocking database calls for async route handlers
+    DB_EXECUTOR_WORKERS: int = int(os.getenv("DB_EXECUTOR_WORKERS", 8))
+
+    # Batch lookups
+    CONCEPT_BATCH_MAX_TERMS: int = int(os.getenv("CONCEPT_BATCH_MAX_TERMS", 10000))
+
+    # Keyset pagination and streamed exports
+    PAGE_SIZE: int = int(os.getenv("PAGE_SIZE", 1000))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", 10000))
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", 1000))
+    SQL_IN_CHUNK_SIZE: int = int(os.getenv("SQL_IN_CHUNK_SIZE", 2000))
+
+    # Type-ahead suggestions (/suggest/vi, /suggest/en)
+    SUGGEST_LIMIT: int = int(os.getenv("SUGGEST_LIMIT", 10))
+    SUGGEST_LIMIT_MAX: int = int(os.getenv("SUGGEST_LIMIT_MAX", 50))
+    SUGGEST_REFRESH_SECONDS: int = int(os.getenv("SUGGEST_REFRESH_SECONDS", 600))
+
 
 settings = Settings()
@@ -1,6 +1,27 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import settings
 from passlib.context import CryptContext
 
 
+def make_context(rounds: int = settings.BCRYPT_ROUNDS) -> CryptContext:
+    """
+    Build the bcrypt context with cost factor `rounds` (2**rounds iterations)
+    """
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Built once: creating a CryptContext is not free and it is safe to share
+pwd_context = make_context()
+
+# bcrypt is CPU bound and releases the GIL; run it in its own bounded pool so
+# a burst of logins neither blocks the event loop nor starves other requests
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.HASHING_WORKERS, thread_name_prefix="bcrypt"
+)
+
+
 class Hasher:
     """
     A class providing static methods for password hashing and verification using bcrypt.
@@ -12,6 +33,10 @@ class Hasher:
         get_password_hash(password):
             Generate a hashed password for a given plain password.
 
+        verify_password_async(plain_password, hashed_password):
+        get_password_hash_async(password):
+            Same as above, run in the bcrypt worker pool.
+
     Example:
     --------
     >>> Hasher.get_password_hash("supersecret1234")
@@ -23,10 +48,20 @@ class Hasher:
 
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        return CryptContext(schemes=["bcrypt"], deprecated="auto").verify(
-            plain_password, hashed_password
-        )
+        return pwd_context.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password):
-        return CryptContext(schemes=["bcrypt"], deprecated="auto").hash(password)
+        return pwd_context.hash(password)
+
+    @staticmethod
+    async def verify_password_async(plain_password, hashed_password):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            hashing_executor, pwd_context.verify, plain_password, hashed_password
+        )
+
+    @staticmethod
+    async def get_password_hash_async(password):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(hashing_executor, pwd_context.hash, password)
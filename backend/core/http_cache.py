@@ -0,0 +1,147 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+from core.cache import LRUCache
+from core.config import settings
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Browsers and the gateway may store responses but must revalidate them
+CACHE_CONTROL = "private, no-cache"
+
+
+class CachedResponse(NamedTuple):
+    table_names: Tuple[str, ...]
+    version: Hashable
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def http_date(moment: datetime) -> str:
+    """
+    HTTP-date of `moment`; naive datetimes (database timestamps) are taken
+    as UTC
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime]
+) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when there is no
+    If-None-Match, as RFC 9110 section 13.2.2 does for GET
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" matches "x"
+        return "*" in tags or etag in [tag.replace("W/", "", 1) for tag in tags]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have a resolution of one second
+    modified = parsedate_to_datetime(http_date(last_modified))
+    return modified <= since
+
+
+class ResponseCache:
+    """
+    JSON responses kept in memory until the data they were computed from
+    changes, bounded in number of entries and in bytes.
+
+    Each entry is stored with the tables it was read from and the version
+    of their data (their change tokens). A lookup with another version is a
+    miss and the entry is recomputed; `invalidate` drops the entries of a
+    changed table right away. Responses carry an ETag (hash of the body) and
+    a Last-Modified date so that clients can revalidate with a 304.
+    """
+
+    def __init__(self, maxsize: int, maxbytes: int):
+        self.entries = LRUCache(maxsize, maxbytes=maxbytes)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.version != version:
+            self.stale += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: Hashable,
+        table_names: Iterable[str],
+        version: Hashable,
+        content: Any,
+        last_modified: Optional[datetime] = None,
+    ) -> CachedResponse:
+        body = JSONResponse(jsonable_encoder(content)).body
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        entry = CachedResponse(tuple(table_names), version, body, etag, last_modified)
+        self.entries.set(key, entry, nbytes=len(body))
+        return entry
+
+    def response(self, request: Request, entry: CachedResponse) -> Response:
+        """
+        `entry` as a 200 response, or a bodiless 304 if the client's copy is
+        still current
+        """
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if entry.last_modified is not None:
+            headers["Last-Modified"] = http_date(entry.last_modified)
+
+        if is_not_modified(request, entry.etag, entry.last_modified):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, table_name: str, *_):
+        """
+        Drop the entries read from `table_name`. Subscriber of the change feed
+        """
+        self.invalidations += self.entries.evict(
+            lambda key, entry: table_name in entry.table_names
+        )
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.entries.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "stale": self.stale,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES
+)
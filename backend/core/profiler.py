@@ -0,0 +1,271 @@
+import asyncio
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from core.config import settings
+from core.request_metrics import route_label
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{12}$")
+
+
+def folded_stack(frame) -> str:
+    """
+    Stack of `frame`, outermost call first, as "module:function;..." the way
+    flamegraph.pl and speedscope read folded stacks
+    """
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profile:
+    """
+    Stacks sampled every `interval` seconds from the threads working for one
+    request: the event loop while the request's task runs, and the database
+    threads while they run its `run_db` calls.
+
+    Charts are drawn in the chart process pool and appear only as the wait
+    for the pool.
+    """
+
+    def __init__(self, meta: Dict[str, Any], interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.meta = meta
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.n_samples = 0
+        self.seconds = 0.0
+        self._threads: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    def traced(self, func: Callable) -> Callable:
+        """
+        `func`, sampled while it runs in whichever thread calls it
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ident = threading.get_ident()
+            with self._lock:
+                self._threads[ident] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._threads[ident] -= 1
+                    if not self._threads[ident]:
+                        del self._threads[ident]
+
+        return wrapper
+
+    def start(self):
+        """
+        Start sampling. Call from the task handling the request
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        loop_thread = threading.get_ident()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._run, args=(loop, task, loop_thread), daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self._start
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def _run(self, loop, task, loop_thread: int):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            if asyncio.current_task(loop) is task:
+                threads.append(loop_thread)
+            frames = sys._current_frames()
+            self.n_samples += 1
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[folded_stack(frame)] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            **self.meta,
+            "seconds": round(self.seconds, 4),
+            "interval_ms": self.interval * 1000,
+            "samples": self.n_samples,
+            "stacks": len(self.samples),
+        }
+
+
+# Profile of the request being handled, None unless it asked for one
+current_profile: ContextVar[Optional[Profile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class ProfileStore:
+    """
+    The newest `keep` profiles, as a JSON summary and a folded-stacks file
+    each in `directory`, so that any worker can list and serve them
+    """
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, profile_id: str, extension: str) -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profile: Profile):
+        os.makedirs(self.directory, exist_ok=True)
+        for extension, content in (
+            ("folded", profile.folded()),
+            ("json", json.dumps(profile.summary(), default=str)),
+        ):
+            path = self.path(profile.id, extension)
+            # Write then rename so that a half-written file is never served
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        for summary in self.list()[self.keep :]:
+            for extension in ("json", "folded"):
+                try:
+                    os.remove(self.path(summary["id"], extension))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        Summaries of the stored profiles, newest first
+        """
+        summaries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    summaries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(summaries, key=lambda s: s["started_at"], reverse=True)
+
+    def folded(self, profile_id: str) -> Optional[str]:
+        path = self.path(profile_id, "folded")
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read()
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+
+
+def profile_requested(scope: Scope) -> bool:
+    """
+    Whether the request carries `profile=1` in its query string or an
+    `X-Profile: 1` header. Parameters merely containing "profile=1", such as
+    `q=profile=1` or `profile=10`, do not count
+    """
+    query = parse_qs(scope["query_string"].decode("latin-1"))
+    if query.get("profile") == ["1"]:
+        return True
+    return any(
+        name == b"x-profile" and value == b"1" for name, value in scope["headers"]
+    )
+
+
+class ProfilerMiddleware:
+    """
+    Profile the requests of superusers sending `X-Profile: 1` or
+    `?profile=1` and store the profile, whose id the response carries in
+    an X-Profile-Id header. Other requests only pay for the check of the
+    flag. `authorize(request)` returns the user allowed to profile, or None
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        authorize: Callable[[Request], Any],
+        store: ProfileStore,
+        interval: float,
+    ):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        request = Request(scope)
+        user = await loop.run_in_executor(None, self.authorize, request)
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+
+        params = {k: v for k, v in request.query_params.items() if k != "profile"}
+        profile = Profile(
+            {
+                "started_at": datetime.now().isoformat(timespec="milliseconds"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "params": params,
+                "user": user.email,
+            },
+            self.interval,
+        )
+        status_code = 500
+
+        async def send_with_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            current_profile.reset(token)
+            profile.meta.update(route=route_label(scope), status=status_code)
+            await loop.run_in_executor(None, self.store.save, profile)
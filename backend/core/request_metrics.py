@@ -0,0 +1,123 @@
+import logging
+import time
+from typing import Dict
+
+from core.config import settings
+from core.metrics import COUNT_BUCKETS, ROW_BUCKETS, registry
+from db.instrumentation import QueryStats, current_query_stats
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+requests_total = registry.counter(
+    "http_requests_total", "Requests handled", ("method", "route", "status")
+)
+request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time to handle a request", ("method", "route")
+)
+db_statements = registry.histogram(
+    "http_request_db_statements",
+    "SQL statements run per request",
+    ("route",),
+    COUNT_BUCKETS,
+)
+db_seconds = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ("route",)
+)
+db_slowest_seconds = registry.histogram(
+    "http_request_db_slowest_statement_seconds",
+    "Duration of the slowest SQL statement of a request",
+    ("route",),
+)
+db_rows = registry.histogram(
+    "http_request_db_rows", "Rows fetched per request", ("route",), ROW_BUCKETS
+)
+repeated_statements = registry.counter(
+    "http_request_db_repeated_statements_total",
+    "Requests running a statement shape more than SQL_REPEAT_THRESHOLD times",
+    ("route",),
+)
+
+
+def route_label(scope: Scope) -> str:
+    """
+    Path template of the route that handled `scope`, e.g. /concept/vi/{vi_term},
+    so that the metrics have one series per route rather than per URL
+    """
+    app = scope.get("app")
+    endpoint = scope.get("endpoint")
+    if app is None or endpoint is None:
+        return "unmatched"
+    paths: Dict = getattr(app.state, "route_paths", None)
+    if paths is None:
+        paths = app.state.route_paths = {
+            getattr(route, "endpoint", getattr(route, "app", None)): route.path
+            for route in app.routes
+        }
+    return paths.get(endpoint, "unmatched")
+
+
+class RequestMetricsMiddleware:
+    """
+    Count the SQL statements of every request (see db.instrumentation),
+    report them in a Server-Timing header and record per-route histograms
+    for /metrics.
+
+    Statements run after the headers are sent, e.g. by streamed exports,
+    are in the histograms but not in the header.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 0):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", stats.server_timing(time.perf_counter() - start)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self.record(scope, stats, status_code, time.perf_counter() - start)
+
+    def record(self, scope: Scope, stats: QueryStats, status_code: int, seconds: float):
+        route = route_label(scope)
+        requests_total.inc(scope["method"], route, str(status_code))
+        request_seconds.observe(seconds, scope["method"], route)
+        db_statements.observe(stats.statements, route)
+        db_seconds.observe(stats.seconds, route)
+        db_slowest_seconds.observe(stats.slowest_seconds, route)
+        db_rows.observe(stats.rows, route)
+
+        if self.repeat_threshold > 0:
+            repeated = stats.repeated(self.repeat_threshold)
+            if repeated:
+                repeated_statements.inc(route)
+                shape, n = repeated[0]
+                logger.warning(
+                    "%s %s ran the same statement %d times (%d statements in "
+                    "total): %.300s",
+                    scope["method"],
+                    scope["path"],
+                    n,
+                    stats.statements,
+                    shape,
+                )
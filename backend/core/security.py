@@ -1,9 +1,31 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 
+from core.cache import LRUCache
+from core.config import settings
 from jose import jwt
 
-from core.config import settings
+
+class Principal(NamedTuple):
+    """
+    What requests need to know about the user owning an access token.
+    Immutable, so that one cached principal can serve concurrent requests
+    """
+
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def of(cls, user) -> "Principal":
+        return cls(user.email, bool(user.is_active), bool(user.is_superuser))
+
+
+# Principals already verified from their access token, keyed by token.
+# Entries never outlive the token's `exp`
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -28,3 +50,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
+
+
+def invalidate_principal(email: str) -> int:
+    """
+    Forget every cached token of the user `email`, e.g. after deactivation,
+    so their next request is verified against the user database again.
+    """
+    return principal_cache.evict(lambda token, principal: principal.email == email)
@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+from db.models.table import Resolution
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def activity_series(
+    rows: Iterable[tuple],
+    from_date: date,
+    to_date: date,
+    resolution: Resolution = Resolution.DAY,
+) -> Dict[str, dict]:
+    """
+    Turn sparse (editor, day, activity) rows into one dense series per editor
+    covering `from_date` to `to_date`:
+    {editor: {"dates": (label, ...), "activity": (count, ...)}}
+    """
+    rows = list(rows)
+    if not rows:
+        return {}
+    editor_ids, days, counts = zip(*rows)
+
+    # One row of the (editor x bin) grid per editor, filled in a single pass
+    editors = {}
+    editor_index = np.fromiter(
+        (editors.setdefault(editor_id, len(editors)) for editor_id in editor_ids),
+        np.int64,
+        len(editor_ids),
+    )
+    labels, edges = date_bins(from_date, to_date, resolution)
+    n_bins = len(edges) - 1
+
+    bin_index = bin_of(days, edges)
+    inside = (bin_index >= 0) & (bin_index < n_bins)
+    grid = np.zeros(len(editors) * n_bins, dtype=np.int64)
+    np.add.at(
+        grid,
+        editor_index[inside] * n_bins + bin_index[inside],
+        np.asarray(counts, dtype=np.int64)[inside],
+    )
+    grid = grid.reshape(len(editors), n_bins)
+
+    return {
+        editor_id: {"dates": labels, "activity": tuple(activity)}
+        for editor_id, activity in zip(editors, grid.tolist())
+    }
+
+
+def date_bins(
+    from_date: date, to_date: date, resolution: Resolution = Resolution.DAY
+) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    Labels of the consecutive bins covering `from_date` to `to_date` (both
+    included) and their edges as datetime64[D]: bin i is [edges[i], edges[i + 1])
+    """
+    start = np.datetime64(from_date, "D")
+    end = np.datetime64(to_date, "D")
+
+    if resolution == Resolution.MONTH:
+        months = np.arange(
+            start.astype("datetime64[M]"), end.astype("datetime64[M]") + 2
+        )
+        return tuple(months[:-1].astype(str).tolist()), months.astype("datetime64[D]")
+
+    step = 1
+    if resolution == Resolution.WEEK:
+        # 1970-01-01 was a Thursday: move back to the Monday of the week
+        start = start - (start.astype(np.int64) + 3) % 7
+        step = 7
+
+    edges = np.arange(start, end + step + 1, step)
+    return tuple(edges[:-1].astype(str).tolist()), edges
+
+
+def as_days(days: Sequence) -> np.ndarray:
+    """
+    datetime64[D] array of dates, datetimes or "%Y-%m-%d" strings
+    """
+    if len(days) and isinstance(days[0], date):
+        # Much faster than letting numpy convert each date object
+        ordinals = np.fromiter((day.toordinal() for day in days), np.int64, len(days))
+        return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+    return np.asarray(days, dtype="datetime64[D]")
+
+
+def bin_of(days: Sequence, edges: np.ndarray) -> np.ndarray:
+    """
+    Index of the bin of `edges` each day falls into, -1 or len(edges) - 1
+    when outside
+    """
+    return np.searchsorted(edges, as_days(days), side="right") - 1
+
+
+def dense_counts(
+    days: Sequence, counts: Sequence[int], edges: np.ndarray
+) -> np.ndarray:
+    """
+    Sum `counts` into the bins of `edges` their `days` fall into; days
+    outside the bins are ignored
+    """
+    index = bin_of(days, edges)
+    inside = (index >= 0) & (index < len(edges) - 1)
+    dense = np.zeros(len(edges) - 1, dtype=np.int64)
+    np.add.at(dense, index[inside], np.asarray(counts, dtype=np.int64)[inside])
+    return dense
@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (max Update_Date, max Insert_Date, row count or None), see
+# view.change_tokens_query
+Token = Tuple[Optional[datetime], Optional[datetime], Optional[int]]
+Subscriber = Callable[[str, Token], None]
+
+FEED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermark (
+    table_name TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    token TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def encode_token(token: Token) -> str:
+    updated, inserted, n_rows = token
+    return json.dumps(
+        [
+            updated.isoformat() if updated else None,
+            inserted.isoformat() if inserted else None,
+            n_rows,
+        ]
+    )
+
+
+def decode_token(text: str) -> Token:
+    updated, inserted, n_rows = json.loads(text)
+    return (
+        datetime.fromisoformat(updated) if updated else None,
+        datetime.fromisoformat(inserted) if inserted else None,
+        n_rows,
+    )
+
+
+class ChangeFeed:
+    """
+    Tell every worker process which knowledge-base tables changed, through
+    a SQLite file they all share.
+
+    One worker at a time holds the lease and polls the change tokens of the
+    knowledge base (`fetch_tokens`). When the token of a table differs from
+    its last watermark, it appends a "table changed at T" event. Every
+    worker reads the events it has not seen yet and passes them to its
+    subscribers, which evict what depends on that table. A worker that
+    stops renewing the lease is replaced after `lease_seconds`.
+
+    The knowledge base is thus polled once per `poll_seconds` for all
+    workers, and caches stay valid between edits instead of expiring.
+    `fetch_tokens` runs that often and must stay cheap: index seeks and
+    catalog lookups, never a scan of the tables.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch_tokens: Callable[[], Dict[str, Token]],
+        poll_seconds: float,
+        lease_seconds: float,
+        keep_events: int = 1000,
+    ):
+        self.path = path
+        self.fetch_tokens = fetch_tokens
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.keep_events = keep_events
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.tokens: Dict[str, Token] = {}
+        self.is_leader = False
+        self.last_event_id = 0
+        self.events_seen = 0
+        self.polled_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._subscribers: List[Subscriber] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Subscriber):
+        """
+        Call `callback(table_name, token)` whenever `table_name` changes
+        """
+        self._subscribers.append(callback)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(FEED_SCHEMA)
+        return conn
+
+    def acquire_lease(self, conn: sqlite3.Connection) -> bool:
+        """
+        Take or renew the lease unless another live worker holds it
+        """
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM lease").fetchone()
+            if row is None or row[0] == self.owner or row[1] < now:
+                conn.execute(
+                    "INSERT OR REPLACE INTO lease (id, owner, expires_at) "
+                    "VALUES (1, ?, ?)",
+                    (self.owner, now + self.lease_seconds),
+                )
+                leader = True
+            else:
+                leader = False
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return leader
+
+    def publish(self, conn: sqlite3.Connection, tokens: Dict[str, Token]) -> int:
+        """
+        Append an event for every table whose token differs from its
+        watermark. Return the number of events
+        """
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            watermarks = dict(conn.execute("SELECT table_name, token FROM watermark"))
+            changed = [
+                (table_name, encode_token(token))
+                for table_name, token in tokens.items()
+                if watermarks.get(table_name) != encode_token(token)
+            ]
+            for table_name, token in changed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO watermark (table_name, token, changed_at) "
+                    "VALUES (?, ?, ?)",
+                    (table_name, token, now),
+                )
+                conn.execute(
+                    "INSERT INTO event (table_name, token, changed_at) VALUES (?, ?, ?)",
+                    (table_name, token, now),
+                )
+            if changed:
+                conn.execute(
+                    "DELETE FROM event WHERE id <= (SELECT MAX(id) FROM event) - ?",
+                    (self.keep_events,),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(changed)
+
+    def catch_up(self, conn: sqlite3.Connection):
+        """
+        Start from the current watermarks without replaying past events
+        """
+        self.tokens = {
+            table_name: decode_token(token)
+            for table_name, token in conn.execute(
+                "SELECT table_name, token FROM watermark"
+            )
+        }
+        self.last_event_id = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM event"
+        ).fetchone()[0]
+
+    def consume(self, conn: sqlite3.Connection):
+        """
+        Pass the events published since the last call to the subscribers
+        """
+        events = conn.execute(
+            "SELECT id, table_name, token FROM event WHERE id > ? ORDER BY id",
+            (self.last_event_id,),
+        ).fetchall()
+        for event_id, table_name, token in events:
+            token = decode_token(token)
+            self.tokens[table_name] = token
+            self.last_event_id = event_id
+            self.events_seen += 1
+            for callback in self._subscribers:
+                try:
+                    callback(table_name, token)
+                except Exception:
+                    logger.exception("Change feed subscriber failed on %s", table_name)
+
+    def poll(self, conn: sqlite3.Connection):
+        self.is_leader = self.acquire_lease(conn)
+        if self.is_leader:
+            self.publish(conn, self.fetch_tokens())
+        self.consume(conn)
+        self.polled_at = time.monotonic()
+
+    def start(self):
+        """
+        Poll every `poll_seconds` in a background thread
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="change-feed", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self.connect()
+                    self.catch_up(conn)
+                self.poll(conn)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+                logger.exception("Change feed poll failed")
+            self._stop.wait(self.poll_seconds)
+        if conn is not None:
+            conn.close()
+
+    @property
+    def fresh(self) -> bool:
+        """
+        Whether the feed was read recently enough for its tokens to be
+        trusted
+        """
+        return (
+            self.polled_at is not None
+            and time.monotonic() - self.polled_at < self.lease_seconds
+        )
+
+    def status(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "path": self.path,
+            "owner": self.owner,
+            "leader": self.is_leader,
+            "fresh": self.fresh,
+            "poll_seconds": self.poll_seconds,
+            "last_event_id": self.last_event_id,
+            "events_seen": self.events_seen,
+            "last_error": self.last_error,
+        }
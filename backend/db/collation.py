@@ -0,0 +1,18 @@
+from typing import Optional
+
+
+def collation_key(term: Optional[str]) -> Optional[str]:
+    """
+    Key under which the knowledge-base collation (SQL Server's default
+    *_CI_AS) considers strings equal: case-insensitive, and blind to the
+    trailing spaces `=` ignores. Key Python dicts on it wherever they are
+    matched against values the database compared for us
+
+    Example:
+    --------
+    >>> collation_key("Fever  ") == collation_key("fever")
+    True
+    """
+    if term is None:
+        return None
+    return term.rstrip(" ").casefold()
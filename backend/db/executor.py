@@ -0,0 +1,53 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from core.config import settings
+from core.profiler import current_profile
+
+# Bounded pool for the blocking repository functions. Keep it no larger than
+# the engines' connection pools so threads don't just queue for a connection
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+)
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run the blocking function `func(*args, **kwargs)` in the database thread
+    pool and wait for it without blocking the event loop.
+
+    Context variables of the caller are visible inside `func`, which is
+    sampled too when the request is being profiled.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    profile = current_profile.get()
+    if profile is not None:
+        func = profile.traced(func)
+    return await loop.run_in_executor(
+        db_executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def iterate_db(iterator: Iterator) -> AsyncIterator:
+    """
+    Consume the blocking `iterator` (e.g. a generator streaming a result set)
+    in the database thread pool, one item at a time.
+
+    The iterator is closed, releasing its connection, when the consumer
+    stops early, e.g. because the client of a streaming response went away.
+    """
+    done = object()
+    try:
+        while True:
+            item = await run_db(next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await run_db(close)
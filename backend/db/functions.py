@@ -0,0 +1,26 @@
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class day_of(FunctionElement):
+    """
+    Calendar day of a datetime expression, e.g. for GROUP BY.
+
+    CAST(x AS DATE) on SQL Server, date(x) on SQLite (which has no DATE type
+    to cast to)
+    """
+
+    type = Date()
+    name = "day_of"
+    inherit_cache = True
+
+
+@compiles(day_of)
+def compile_day_of(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_of, "sqlite")
+def compile_day_of_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    `statement` with literals replaced by ? and parameter lists collapsed, so
+    that the same query with other values has the same shape.
+
+    >>> statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?) AND b = 'x'")
+    'SELECT a FROM t WHERE id IN (?) AND b = ?'
+    """
+    shape = _LITERALS.sub("?", statement)
+    shape = _PARAMETER_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """
+    Statements run on behalf of one request: how many, their total and
+    slowest duration, rows fetched and how often each statement shape ran.
+
+    Updated from the database threads of the request, hence the lock.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements_by_text: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add_statement(self, statement: str, seconds: float):
+        with self._lock:
+            self.statements += 1
+            self.seconds += seconds
+            self.statements_by_text[statement] += 1
+            if seconds > self.slowest_seconds:
+                self.slowest_seconds = seconds
+                self.slowest_statement = statement
+
+    def add_rows(self, n: int):
+        with self._lock:
+            self.rows += n
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statement shapes run more than `threshold` times, most repeated first
+        """
+        with self._lock:
+            texts = list(self.statements_by_text.items())
+        shapes: Counter = Counter()
+        for statement, n in texts:
+            shapes[statement_shape(statement)] += n
+        return [(shape, n) for shape, n in shapes.most_common() if n > threshold]
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        Value of the Server-Timing header, durations in milliseconds
+        """
+        with self._lock:
+            return (
+                f'db;dur={self.seconds * 1000:.1f};desc="{self.statements} '
+                f'statements, {self.rows} rows", '
+                f"db-slowest;dur={self.slowest_seconds * 1000:.1f}, "
+                f"total;dur={total_seconds * 1000:.1f}"
+            )
+
+
+# Statistics of the request being handled, None outside requests. Database
+# threads see it because run_db copies the context of the caller
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class _RowCountingCursor:
+    """
+    DBAPI cursor counting the rows fetched through it
+    """
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: QueryStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.add_rows(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.add_rows(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.add_rows(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_query_stats.get() is not None:
+        context._instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    start = getattr(context, "_instrumentation_start", None)
+    if stats is None or start is None:
+        return
+    stats.add_statement(statement, time.perf_counter() - start)
+    # The result reads its rows from context.cursor, created after this hook
+    if cursor.description is not None:
+        context.cursor = _RowCountingCursor(cursor, stats)
+
+
+def instrument(engine: Engine):
+    """
+    Record the statements `engine` runs while a request is handled into
+    `current_query_stats`. Costs a context variable lookup per statement
+    outside requests
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -19,3 +19,20 @@ class TableName(str, Enum):
 class StandardName(str, Enum):
     EN_UMLS = TableName.EN_UMLS.value
     EN_DO = TableName.EN_DO.value
+
+
+class CountMode(str, Enum):
+    APPROX = "approx"
+    EXACT = "exact"
+
+
+class ExportFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class Resolution(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
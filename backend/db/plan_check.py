@@ -0,0 +1,219 @@
+"""
+Plan check: run the lookup queries of db/repository/view.py and fail if the
+database answers any of them by scanning a knowledge-base table instead of
+seeking an index.
+
+Against the database of KNOWLEDGE_DB_URL (SQL Server: SHOWPLAN_XML):
+
+    python -m db.plan_check
+
+Against a fresh SQLite stand-in with the knowledge-base migrations applied
+(EXPLAIN QUERY PLAN):
+
+    python -m db.plan_check --standin /tmp/standin.sqlite
+
+Exits with 1 if a query scans, and with 2 if the plans of the database's
+dialect cannot be read.
+"""
+import argparse
+import re
+import sys
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# Tiny tables that may always be scanned
+ALLOWED_SCANS = {"CID_LCIN_EDITOR"}
+
+SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+MSSQL_SCANS = {"Table Scan", "Index Scan", "Clustered Index Scan"}
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+class Check(NamedTuple):
+    name: str
+    run: Callable
+
+
+@contextmanager
+def captured_statements(engine: Engine):
+    """
+    Collect the (statement, parameters) sent to the database meanwhile
+    """
+    statements: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def sqlite_scans(conn: Connection, statement: str, parameters) -> List[str]:
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    # SEARCH is a seek; SCAN reads the whole table or a whole index
+    matches = [SQLITE_SCAN.match(row[-1]) for row in plan]
+    return [match.group(1) for match in matches if match]
+
+
+def showplan_scans(xml_plan: str) -> List[str]:
+    """
+    Tables a SQL Server SHOWPLAN_XML plan reads with a scan operator
+    """
+    tables = []
+    for rel_op in ET.fromstring(xml_plan).iter(f"{SHOWPLAN_NS}RelOp"):
+        if rel_op.get("PhysicalOp") not in MSSQL_SCANS:
+            continue
+        for obj in rel_op.iter(f"{SHOWPLAN_NS}Object"):
+            tables.append(obj.get("Table", "").strip("[]"))
+            break
+    return tables
+
+
+def mssql_scans(conn: Connection, statement: str, parameters) -> List[str]:
+    conn.exec_driver_sql("SET SHOWPLAN_XML ON")
+    try:
+        xml_plan = conn.exec_driver_sql(statement, parameters).scalar()
+    finally:
+        conn.exec_driver_sql("SET SHOWPLAN_XML OFF")
+    return showplan_scans(xml_plan)
+
+
+# Dialect name -> reader of the tables the plan of a statement scans
+PLAN_READERS: Dict[str, Callable[[Connection, str, Any], List[str]]] = {
+    "sqlite": sqlite_scans,
+    "mssql": mssql_scans,
+}
+
+
+def scanned_tables(conn: Connection, statement: str, parameters) -> List[str]:
+    """
+    Knowledge-base tables the plan of `statement` scans. The dialect of
+    `conn` must be one of PLAN_READERS
+    """
+    tables = PLAN_READERS[conn.dialect.name](conn, statement, parameters)
+    return [table for table in tables if table.startswith("CID_LCIN")]
+
+
+def check_scans(engine: Engine, check: Check) -> Tuple[int, List[str]]:
+    """
+    Run `check`; number of statements it sent, and the knowledge-base tables
+    their plans scan beyond ALLOWED_SCANS
+    """
+    with captured_statements(engine) as statements:
+        check.run()
+
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            scans += scanned_tables(conn, statement, parameters)
+    return len(statements), sorted(set(scans) - ALLOWED_SCANS)
+
+
+def lookup_checks() -> List[Check]:
+    """
+    The repository calls whose queries must only seek, with arguments taken
+    from the database so that the lookups hit
+    """
+    from db.repository import chart, view
+    from sqlalchemy import func, select
+
+    with view.engine.connect() as conn:
+        vn_main, en_main, day = conn.execute(
+            select(
+                view.dictionary_table.c.VN_main,
+                view.dictionary_table.c.EN_main,
+                view.dictionary_table.c.Update_Date,
+            ).limit(1)
+        ).one()
+        vn_synonym = conn.execute(
+            select(view.vn_synonym_table.c.VN_synonym).limit(1)
+        ).scalar()
+        source, source_synonym = view.en_vsrc_tables[0], view.en_vsrc_synonym_tables[0]
+        source_key = list(source.primary_key.columns)[0]
+        stdid = conn.execute(select(source_key).limit(1)).scalar()
+        en_synonym = conn.execute(select(source_synonym.c.EN_synonym).limit(1)).scalar()
+        latest = conn.execute(
+            select(func.max(view.dictionary_table.c.Update_Date))
+        ).scalar()
+
+    since = datetime.combine(latest.date(), datetime.min.time())
+    return [
+        Check("locate_vn_term(VN_main)", lambda: view.locate_vn_term(vn_main)),
+        Check("locate_vn_term(VN_synonym)", lambda: view.locate_vn_term(vn_synonym)),
+        Check("locate_en_term(EN_main)", lambda: view.locate_en_term(en_main)),
+        Check("locate_en_term(EN_synonym)", lambda: view.locate_en_term(en_synonym)),
+        Check("vn_term_exists", lambda: view.vn_term_exists(vn_synonym)),
+        Check("en_term_exists", lambda: view.en_term_exists(en_synonym)),
+        Check("locate_standard", lambda: view.locate_standard(stdid, None)),
+        Check(
+            "locate_vn_terms",
+            lambda: view.locate_vn_terms([vn_main, vn_synonym, "?"]),
+        ),
+        Check(
+            "locate_en_terms",
+            lambda: view.locate_en_terms([en_main, en_synonym, "?"]),
+        ),
+        Check(
+            "review_per_day",
+            lambda: view.review_per_day(
+                view.dictionary_table, day.strftime("%Y-%m-%d"), page_size=50
+            ),
+        ),
+        Check(
+            "rows_per_editors(window)",
+            lambda: view.rows_per_editors("update", since, since + timedelta(days=1)),
+        ),
+        Check(
+            "editor_activity(window)",
+            lambda: chart.editor_activity(since, since + timedelta(days=1)),
+        ),
+        Check("change_tokens", view.change_tokens.fetch),
+    ]
+
+
+def run_checks(engine: Engine, checks: List[Check]) -> Optional[bool]:
+    """
+    Print the result of every check; whether none of them scans, or None if
+    plans of the dialect of `engine` cannot be read
+    """
+    if engine.dialect.name not in PLAN_READERS:
+        print(f"skipped: no plan check for the {engine.dialect.name} dialect")
+        return None
+
+    ok = True
+    for check in checks:
+        n_statements, scans = check_scans(engine, check)
+        status = "ok" if not scans else "SCAN " + ", ".join(scans)
+        print(f"{check.name:<30} {n_statements} statement(s)  {status}")
+        ok &= not scans
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--standin", help="create and check a SQLite stand-in here")
+    parser.add_argument(
+        "--no-migrate",
+        action="store_true",
+        help="with --standin, skip the migrations (to see the plans without indexes)",
+    )
+    args = parser.parse_args()
+
+    if args.standin:
+        from db.standin import prepare_standin
+
+        prepare_standin(args.standin, migrate=not args.no_migrate, n_concepts=2000)
+
+    from db.repository import view
+
+    ok = run_checks(view.engine, lookup_checks())
+    # 2: nothing was checked
+    sys.exit({True: 0, False: 1, None: 2}[ok])
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class MonitoredQueuePool(QueuePool):
+    """
+    A QueuePool that also records how long checkouts wait for a connection.
+
+    The wait covers queueing for a pooled connection and, when the pool has
+    to grow into its overflow, opening the new connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def pool_status(engine: Engine) -> dict:
+    """
+    Snapshot of the connection pool of `engine`: checked-out, idle and
+    overflow connections and, for a MonitoredQueuePool, checkout wait times
+    """
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # QueuePool counts overflow from -size while the pool fills up
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+
+    if isinstance(pool, MonitoredQueuePool):
+        with pool._stats_lock:
+            status.update(
+                {
+                    "checkouts": pool.checkouts,
+                    "timeouts": pool.timeouts,
+                    "wait_seconds_total": round(pool.wait_seconds_total, 6),
+                    "wait_seconds_avg": round(
+                        pool.wait_seconds_total / pool.checkouts, 6
+                    )
+                    if pool.checkouts
+                    else 0.0,
+                    "wait_seconds_max": round(pool.wait_seconds_max, 6),
+                }
+            )
+
+    return status
@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
-import matplotlib.pyplot as plt
-from db.repository.view import (dictionary_table, editor_table,
-                                en_vsrc_synonym_tables, en_vsrc_tables, engine,
-                                vn_synonym_table)
+from core.series import activity_series, date_bins, dense_counts
+from db.functions import day_of
+from db.models.table import Resolution
+from db.repository.view import contribution_tables, editor_table, engine
 from pydantic import BaseModel, validator
-from sqlalchemy import Date, Table, cast, column, func, select
+from sqlalchemy import DateTime, Table, func, literal, select, union_all
+from sqlalchemy.sql.selectable import Select
 
 
 class DateModel(BaseModel):
@@ -24,136 +25,109 @@ class DateModel(BaseModel):
 
 
 def editor_activity(
-    from_date: Optional[DateModel] = None, to_date: Optional[DateModel] = None
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    resolution: Resolution = Resolution.DAY,
 ):
     """
     Editor activity count (based on update_date) each day for across tables (not aggregated)
+
+    The window defaults to the first and last Update_Date of each table. With
+    `resolution` WEEK or MONTH, days are summed per week (labelled by its
+    Monday) or per month (labelled YYYY-MM)
     """
-    tables = (
-        [dictionary_table, vn_synonym_table] + en_vsrc_tables + en_vsrc_synonym_tables
-    )
+    tables = contribution_tables()
+    if from_date and to_date and to_date < from_date:
+        # from_date must be smaller than to_date
+        return {table.name: [] for table in tables}
 
-    dfs = []
-    for table in tables:
-        try:
-            df = editor_activity_per_table(table, from_date, to_date)
-            dfs.append(df)
-        except ValueError:
-            dfs.append([])
-    return dict(zip([table.name for table in tables], dfs))
+    with engine.connect() as conn:
+        rows = conn.execute(activity_query(tables, from_date, to_date)).fetchall()
+
+    table_rows = {table.name: [] for table in tables}
+    windows = {}
+    for table_name, user_name, day, activity, lower, upper in rows:
+        table_rows[table_name].append((user_name, day, activity))
+        windows[table_name] = (lower, upper)
+
+    return {
+        table_name: (
+            activity_series(activity, *windows[table_name], resolution)
+            if activity
+            else {}
+        )
+        for table_name, activity in table_rows.items()
+    }
 
 
-def editor_activity_per_table(
-    table: Table, from_date: Optional[datetime], to_date: Optional[datetime]
-):
+def activity_query(
+    tables: List[Table],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> Select:
     """
-    Acitivity of each editor for `table` from from_date to `to_date`
+    One statement returning (table name, editor name, day, number of rows
+    updated, window start, window end) for all `tables`.
+
+    Each table is aggregated in its own UNION ALL branch. A missing bound of
+    the window is the MIN / MAX of the table's Update_Date, computed by a
+    scalar subquery of the same statement. `to_date` is the last day of the
+    window (a day at midnight), included entirely. The window is applied to
+    the bare Update_Date column so that an index on it can be used; only the
+    grouping truncates to the day.
     """
-    with engine.connect() as conn:
-        if not from_date:
-            from_date = conn.execute(select(func.min(table.c.Update_Date))).scalar()
-        if not to_date:
-            to_date = conn.execute(select(func.max(table.c.Update_Date))).scalar()
-
-    try:
-        assert to_date >= from_date
-    except AssertionError:
-        raise ValueError("from_date must be smaller than to_date")
-
-    user_col = "Update_User"
-
-    with engine.connect() as conn:
+    branches = []
+    for table in tables:
         date_col = table.c.Update_Date
-
-        temp_table = (
+        lower = (
+            literal(from_date, DateTime)
+            if from_date
+            else select(func.min(date_col)).correlate(None).scalar_subquery()
+        )
+        upper = (
+            literal(to_date, DateTime)
+            if to_date
+            else select(func.max(date_col)).correlate(None).scalar_subquery()
+        )
+        conditions = [
+            date_col >= from_date if from_date else date_col.is_not(None),
+        ]
+        if to_date:
+            # Half-open, so that rows later on the last day are included
+            conditions.append(date_col < to_date + timedelta(days=1))
+
+        branches.append(
             select(
-                table.c[user_col].label("user_col"),
-                cast(table.c["Update_Date"], Date).label("Just_Date"),
+                literal(table.name).label("table_name"),
+                table.c.Update_User.label("user_id"),
+                day_of(date_col).label("day"),
                 func.count().label("activity"),
+                lower.label("from_date"),
+                upper.label("to_date"),
             )
-            .filter((date_col <= to_date) & (date_col >= from_date))
-            .group_by(table.c[user_col], cast(table.c["Update_Date"], Date))
+            .where(*conditions)
+            .group_by(table.c.Update_User, day_of(date_col))
         )
+    activity = union_all(*branches).subquery("activity")
 
-        temp_alias = temp_table.alias()
-
-        # Get editor name
-        query = select(
-            editor_table.c.User_Name, column("Just_Date"), column("activity")
-        ).select_from(
-            temp_alias.join(
-                editor_table, temp_alias.c.user_col == editor_table.c.User_Id
-            )
-        )
-
-        df = conn.execute(query).fetchall()
-
-        df = [(a, b.strftime("%Y-%m-%d"), c) for (a, b, c) in df]
-
-        # Extract unique user IDs
-        editor_ids = set(item[0] for item in df)
-        # Organize data into dictionaries for each user
-        editor_data = {
-            editor_id: {"dates": [], "activity": []} for editor_id in editor_ids
-        }
-
-        for editor_id, date, activity in df:
-            editor_data[editor_id]["dates"].append(date)
-            editor_data[editor_id]["activity"].append(activity)
-
-        for editor_id in editor_ids:
-            editor_data[editor_id] = fill_missing_dates(
-                from_date, to_date, editor_data[editor_id]
-            )
-
-        return editor_data
+    # Get editor name
+    return select(
+        activity.c.table_name,
+        editor_table.c.User_Name,
+        activity.c.day,
+        activity.c.activity,
+        activity.c.from_date,
+        activity.c.to_date,
+    ).join_from(activity, editor_table, activity.c.user_id == editor_table.c.User_Id)
 
 
 def fill_missing_dates(start_date, end_date, user_info):
-    # Create a set of existing dates
-    existing_dates = set(
-        datetime.strptime(date, "%Y-%m-%d") for date in user_info["dates"]
-    )
-
-    # Generate a list of consecutive dates within the specified range
-    all_dates = [
-        start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)
-    ]
-
-    # Fill in missing dates with activity 0
-    for date in all_dates:
-        date_str = date.strftime("%Y-%m-%d")
-        if date not in existing_dates:
-            user_info["dates"].append(date_str)
-            user_info["activity"].append(0)
-
-    # Sort the data based on dates
-    sorted_data = sorted(zip(user_info["dates"], user_info["activity"]))
-    user_info["dates"], user_info["activity"] = zip(*sorted_data)
-
+    """
+    Complete the daily series `user_info` ({"dates": ["%Y-%m-%d", ...],
+    "activity": [...]}) with 0 for every missing day from start_date to
+    end_date, in date order
+    """
+    labels, edges = date_bins(start_date, end_date)
+    activity = dense_counts(user_info["dates"], user_info["activity"], edges)
+    user_info["dates"], user_info["activity"] = labels, tuple(activity.tolist())
     return user_info
-
-
-def create_activity_chart(data, table_name, save_to):
-    # Create a figure and axes
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    # Plotting on the axes
-    for editor_id, user_info in data.items():
-        ax.plot(
-            user_info["dates"],
-            user_info["activity"],
-            label=f"User {editor_id}",
-            alpha=0.6,
-        )
-        print(user_info)
-        print()
-
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Activity")
-    ax.set_title(f"User Activity {table_name}")
-    ax.tick_params(axis="x", rotation=45)
-    ax.legend()
-
-    # Save the plot to a PNG file
-    fig.savefig(save_to)
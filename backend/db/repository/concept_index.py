@@ -0,0 +1,395 @@
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from db.collation import collation_key
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def _primary_key(table: Table) -> str:
+    return [i.name for i in table.primary_key.columns.values()][0]
+
+
+# Dictionary row: (rank in primary key order, VN_main, EN_main)
+DictionaryRow = Tuple[int, str, str]
+
+
+class ConceptIndex:
+    """
+    Read-only, in-process snapshot of the glossary.
+
+    Built from one bulk scan per table and answers the same questions as
+    `locate_vn_term` / `locate_en_term` in `db.repository.view` without any
+    database round trip. Terms are looked up by their `collation_key`, as the
+    database compares them, and when a key maps to several rows the one with
+    the lowest primary key wins, as with the ORDER BY of the SQL
+    implementation.
+
+    Attributes:
+        vn_to_en: VN_main -> first dictionary row
+        en_to_vn: EN_main -> first dictionary row
+        vn_synonym_to_main: VN_synonym -> VN_main of its first row
+        vn_main_to_synonyms: VN_main -> VN_synonyms
+        src_en_main_to_id: per validation source, EN_main -> lowest vsource id
+        src_id_to_en_main: per validation source, vsource id -> EN_main
+        src_id_to_synonyms: per validation source, vsource id -> EN_synonyms
+        src_synonym_to_ids: per validation source, EN_synonym -> vsource ids
+    Keys are collation keys, values hold the terms as stored.
+    """
+
+    def __init__(self, source_names: List[str]):
+        self.source_names = tuple(source_names)
+        self.vn_to_en: Dict[str, DictionaryRow] = {}
+        self.en_to_vn: Dict[str, DictionaryRow] = {}
+        self.vn_synonym_to_main: Dict[str, str] = {}
+        self.vn_main_to_synonyms: Dict[str, Tuple[str, ...]] = {}
+        self.src_en_main_to_id: List[Dict] = [{} for _ in source_names]
+        self.src_id_to_en_main: List[Dict] = [{} for _ in source_names]
+        self.src_id_to_synonyms: List[Dict] = [{} for _ in source_names]
+        self.src_synonym_to_ids: List[Dict] = [{} for _ in source_names]
+        self.built_at: Optional[datetime] = None
+        self.build_seconds: float = 0.0
+        self.approx_bytes: int = 0
+
+    @classmethod
+    def build(
+        cls,
+        engine: Engine,
+        dictionary_table: Table,
+        vn_synonym_table: Table,
+        en_vsrc_tables: List[Table],
+        en_vsrc_synonym_tables: List[Table],
+    ) -> "ConceptIndex":
+        """
+        Scan every glossary table once, in primary key order, and return a
+        fully populated index
+        """
+        start = time.perf_counter()
+        index = cls([src.name for src in en_vsrc_tables])
+        intern = _interner()
+
+        def key(term):
+            return intern(collation_key(term))
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(dictionary_table.c.VN_main, dictionary_table.c.EN_main).order_by(
+                    *dictionary_table.primary_key.columns
+                )
+            )
+            for rank, (vn_main, en_main) in enumerate(rows):
+                row = (rank, intern(vn_main), intern(en_main))
+                index.vn_to_en.setdefault(key(vn_main), row)
+                index.en_to_vn.setdefault(key(en_main), row)
+
+            vn_synonyms: Dict[str, List[str]] = {}
+            rows = conn.execute(
+                select(
+                    vn_synonym_table.c.VN_synonym, vn_synonym_table.c.VN_main
+                ).order_by(*vn_synonym_table.primary_key.columns)
+            )
+            for vn_synonym, vn_main in rows:
+                vn_synonym, vn_main = intern(vn_synonym), intern(vn_main)
+                index.vn_synonym_to_main.setdefault(key(vn_synonym), vn_main)
+                vn_synonyms.setdefault(key(vn_main), []).append(vn_synonym)
+            index.vn_main_to_synonyms = {
+                key: tuple(value) for key, value in vn_synonyms.items()
+            }
+
+            for i, (src, src_synonym) in enumerate(
+                zip(en_vsrc_tables, en_vsrc_synonym_tables)
+            ):
+                primary_key = _primary_key(src)
+
+                rows = conn.execute(
+                    select(src.c[primary_key], src.c.EN_main).order_by(
+                        src.c[primary_key]
+                    )
+                )
+                for src_id, en_main in rows:
+                    src_id, en_main = intern(src_id), intern(en_main)
+                    index.src_en_main_to_id[i].setdefault(key(en_main), src_id)
+                    index.src_id_to_en_main[i].setdefault(key(src_id), en_main)
+
+                en_synonyms: Dict[str, List[str]] = {}
+                synonym_ids: Dict[str, List[str]] = {}
+                rows = conn.execute(
+                    select(
+                        src_synonym.c[primary_key], src_synonym.c.EN_synonym
+                    ).order_by(*src_synonym.primary_key.columns)
+                )
+                for src_id, en_synonym in rows:
+                    src_id, en_synonym = intern(src_id), intern(en_synonym)
+                    synonym_ids.setdefault(key(en_synonym), []).append(src_id)
+                    en_synonyms.setdefault(key(src_id), []).append(en_synonym)
+                index.src_synonym_to_ids[i] = {
+                    key: tuple(value) for key, value in synonym_ids.items()
+                }
+                index.src_id_to_synonyms[i] = {
+                    key: tuple(value) for key, value in en_synonyms.items()
+                }
+
+        index.built_at = datetime.now()
+        index.build_seconds = time.perf_counter() - start
+        index.approx_bytes = index._approx_bytes(intern.seen)
+        return index
+
+    def locate_vn_term(self, term: str):
+        """
+        Same contract as `db.repository.view.locate_vn_term`
+        """
+        row = self.vn_term_row(term)
+        if row is None:
+            return None, None, None, None, None
+        return self._concept(row)
+
+    def locate_en_term(self, term: str):
+        """
+        Same contract as `db.repository.view.locate_en_term`
+        """
+        row = self.en_term_row(term)
+        if row is None:
+            return None, None, None, None, None
+        return self._concept(row)
+
+    def vn_term_row(self, term: str) -> Optional[DictionaryRow]:
+        """
+        Dictionary row whose VN_main is `term`, or else the one of the VN_main
+        of the synonym `term`
+        """
+        key = collation_key(term)
+        row = self.vn_to_en.get(key)
+        if row is None:
+            vn_main = self.vn_synonym_to_main.get(key)
+            if vn_main is not None:
+                row = self.vn_to_en.get(collation_key(vn_main))
+        return row
+
+    def en_term_row(self, term: str) -> Optional[DictionaryRow]:
+        """
+        Dictionary row whose EN_main is `term`, or else the first one whose
+        EN_main has the synonym `term` in the first validation source
+        listing it with such a row
+        """
+        key = collation_key(term)
+        row = self.en_to_vn.get(key)
+        if row is not None:
+            return row
+
+        for i in range(len(self.source_names)):
+            rows = []
+            for src_id in self.src_synonym_to_ids[i].get(key, ()):
+                en_main = self.src_id_to_en_main[i].get(collation_key(src_id))
+                row = self.en_to_vn.get(collation_key(en_main))
+                if row is not None:
+                    rows.append(row)
+            if rows:
+                return min(rows)
+        return None
+
+    def vn_term_exists(self, term: str) -> bool:
+        key = collation_key(term)
+        return key in self.vn_to_en or key in self.vn_synonym_to_main
+
+    def en_term_exists(self, term: str) -> bool:
+        key = collation_key(term)
+        return key in self.en_to_vn or any(
+            key in synonym_to_ids for synonym_to_ids in self.src_synonym_to_ids
+        )
+
+    def _concept(self, row: DictionaryRow):
+        _, vn_main, en_main = row
+        vn_synonyms = list(self.vn_main_to_synonyms.get(collation_key(vn_main), ()))
+
+        en_synonyms = []
+        en_main_vsrc = {}
+        for i, name in enumerate(self.source_names):
+            src_id = self.src_en_main_to_id[i].get(collation_key(en_main))
+            en_main_vsrc[name] = src_id
+            if src_id is not None:
+                en_synonyms += self.src_id_to_synonyms[i].get(collation_key(src_id), ())
+
+        return vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc
+
+    def size(self) -> Dict[str, int]:
+        return {
+            "vn_main": len(self.vn_to_en),
+            "en_main": len(self.en_to_vn),
+            "vn_synonym": len(self.vn_synonym_to_main),
+            "en_synonym": sum(len(i) for i in self.src_synonym_to_ids),
+            "vsource_id": sum(len(i) for i in self.src_id_to_en_main),
+            "approx_bytes": self.approx_bytes,
+        }
+
+    def _approx_bytes(self, strings) -> int:
+        maps = [
+            self.vn_to_en,
+            self.en_to_vn,
+            self.vn_synonym_to_main,
+            self.vn_main_to_synonyms,
+            *self.src_en_main_to_id,
+            *self.src_id_to_en_main,
+            *self.src_id_to_synonyms,
+            *self.src_synonym_to_ids,
+        ]
+        total = sum(sys.getsizeof(i) for i in maps)
+        # Most rows are shared by vn_to_en and en_to_vn
+        rows = {id(row): row for row in self.vn_to_en.values()}
+        rows.update((id(row), row) for row in self.en_to_vn.values())
+        total += sum(sys.getsizeof(i) for i in rows.values())
+        total += sum(sys.getsizeof(i) for i in self.vn_main_to_synonyms.values())
+        for src_maps in (self.src_id_to_synonyms, self.src_synonym_to_ids):
+            for src_map in src_maps:
+                total += sum(sys.getsizeof(i) for i in src_map.values())
+        total += sum(sys.getsizeof(i) for i in strings.values())
+        return total
+
+
+class _interner:
+    """
+    Deduplicate values across tables so that a term shared by the dictionary
+    and a synonym table is stored once
+    """
+
+    def __init__(self):
+        self.seen = {}
+
+    def __call__(self, value):
+        return self.seen.setdefault(value, value)
+
+
+class ConceptIndexManager:
+    """
+    Owns the current `ConceptIndex` and rebuilds it in the background.
+
+    Readers only ever see a complete index: a rebuild produces a new object
+    which then replaces the old one with a single reference assignment, so
+    requests are never blocked by a refresh. Subclasses manage other indexes
+    of the same tables by overriding `name` and `_build`.
+    """
+
+    name = "concept-index"
+
+    def __init__(
+        self,
+        engine: Engine,
+        dictionary_table: Table,
+        vn_synonym_table: Table,
+        en_vsrc_tables: List[Table],
+        en_vsrc_synonym_tables: List[Table],
+        refresh_seconds: int,
+    ):
+        self._engine = engine
+        self._tables = (
+            dictionary_table,
+            vn_synonym_table,
+            en_vsrc_tables,
+            en_vsrc_synonym_tables,
+        )
+        self.table_names = {
+            table.name
+            for table in [
+                dictionary_table,
+                vn_synonym_table,
+                *en_vsrc_tables,
+                *en_vsrc_synonym_tables,
+            ]
+        }
+        self.refresh_seconds = refresh_seconds
+        self.index: Optional[ConceptIndex] = None
+        self.last_error: Optional[str] = None
+        self._build_lock = threading.Lock()
+        # A refresh was asked for while building: the new index may be stale
+        self._stale = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _build(self):
+        return ConceptIndex.build(self._engine, *self._tables)
+
+    @property
+    def building(self) -> bool:
+        return self._build_lock.locked()
+
+    def rebuild(self) -> bool:
+        """
+        Build a new index in the calling thread and swap it in.
+        Return False if another rebuild is already running
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return False
+        try:
+            self.index = self._build()
+            self.last_error = None
+            logger.info(
+                "%s built in %.2fs: %s",
+                self.name,
+                self.index.build_seconds,
+                self.index.size(),
+            )
+        except Exception as e:
+            # Keep serving the previous index (or the database) on failure
+            self.last_error = repr(e)
+            logger.exception("%s build failed", self.name)
+        finally:
+            self._build_lock.release()
+        if self._stale:
+            self.refresh()
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Trigger a rebuild in a background thread and return immediately.
+        Return False if a rebuild is already running; another one then
+        follows it
+        """
+        if self.building:
+            self._stale = True
+            return False
+        self._stale = False
+        threading.Thread(
+            target=self.rebuild, name=f"{self.name}-refresh", daemon=True
+        ).start()
+        return True
+
+    def start(self):
+        """
+        Build the index now and keep rebuilding it every `refresh_seconds`
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.rebuild()
+            if self.refresh_seconds <= 0:
+                return
+            self._stop.wait(self.refresh_seconds)
+
+    def status(self) -> dict:
+        index = self.index
+        return {
+            "ready": index is not None,
+            "building": self.building,
+            "refresh_seconds": self.refresh_seconds,
+            "built_at": index.built_at if index else None,
+            "age_seconds": (
+                (datetime.now() - index.built_at).total_seconds() if index else None
+            ),
+            "build_seconds": index.build_seconds if index else None,
+            "size": index.size() if index else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,72 @@
+import base64
+import json
+from typing import Any, Callable, List, Sequence, Union
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque, URL-safe cursor holding the sort key of the last row of a page
+
+    Example:
+    --------
+    >>> decode_cursor(encode_cursor(["fever", 42]), str, int)
+    ['fever', 42]
+    """
+    data = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+class InvalidCursor(ValueError):
+    """
+    A cursor that `encode_cursor` did not produce for the sort key at hand
+    """
+
+
+def decode_cursor(cursor: str, *types: Union[type, Callable[[Any], Any]]) -> List[Any]:
+    """
+    Inverse of `encode_cursor`, checking one value per entry of `types`: a
+    type the value must be an instance of, or a function parsing the value
+    (and raising ValueError or TypeError if it cannot).
+    Raise InvalidCursor on a malformed cursor
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor {cursor!r}") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor(f"Invalid cursor {cursor!r}")
+
+    decoded = []
+    for value, expected in zip(values, types):
+        if isinstance(expected, type):
+            # isinstance(True, int) holds, yet no sort key is a bool
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise InvalidCursor(f"Invalid cursor {cursor!r}")
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(expected(value))
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(f"Invalid cursor {cursor!r}") from e
+    return decoded
+
+
+def keyset_after(columns: Sequence[ColumnElement], values: Sequence[Any]):
+    """
+    Condition selecting the rows sorted after `values` by `columns`
+    (ascending), i.e. (c0, c1, ...) > (v0, v1, ...).
+
+    Spelled out as OR of ANDs because SQL Server has no row value
+    comparison; the leading column still bounds an index seek.
+    """
+    if len(columns) != len(values):
+        raise ValueError("Cursor does not match the sort key")
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        conditions.append(and_(*equal, column > value))
+    return or_(*conditions)
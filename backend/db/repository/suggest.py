@@ -0,0 +1,207 @@
+import sys
+import time
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.collation import collation_key
+from db.repository.concept_index import (ConceptIndexManager, _interner,
+                                         _primary_key)
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+
+# Sorts after any folded term sharing the prefix
+_PREFIX_END = "\U0010ffff"
+
+
+def fold(term: str) -> str:
+    """
+    Matching key of `term`: case-folded, without diacritics and with single
+    spaces, so that "Viêm  Phổi" and "viem phoi" fold to the same key.
+    đ is not a combining mark and is mapped to d explicitly
+    """
+    decomposed = unicodedata.normalize("NFD", term.replace("đ", "d").replace("Đ", "D"))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class SuggestIndex:
+    """
+    Sorted arrays of folded terms answering prefix queries with two binary
+    searches.
+
+    Main terms and synonyms are kept in separate arrays so that all matching
+    main terms rank before any matching synonym without scanning the whole
+    prefix range: a query costs O(log n + limit).
+    """
+
+    def __init__(
+        self, mains: Iterable[str], synonyms: Iterable[Tuple[str, Optional[str]]]
+    ):
+        """
+        Parameters
+        ----------
+        mains : Iterable[str]
+            Main terms.
+        synonyms : Iterable[Tuple[str, Optional[str]]]
+            (synonym, main term it belongs to) pairs.
+        """
+        self._mains = self._sorted((term, term) for term in mains)
+        self._synonyms = self._sorted(synonyms)
+
+    @staticmethod
+    def _sorted(entries: Iterable[Tuple[str, Optional[str]]]):
+        rows = sorted(
+            {(fold(term), term, main) for term, main in entries if term},
+            key=lambda row: (row[0], row[1]),
+        )
+        keys = [row[0] for row in rows]
+        return keys, [(term, main) for _, term, main in rows]
+
+    def suggest(self, prefix: str, limit: int) -> List[Dict[str, str]]:
+        """
+        Up to `limit` terms starting with `prefix` (diacritic and case
+        insensitive): main terms first, then synonyms, each in folded
+        alphabetical order
+        """
+        key = fold(prefix)
+        if not key:
+            return []
+
+        results: List[Dict[str, str]] = []
+        seen = set()
+        for kind, (keys, entries) in (
+            ("main", self._mains),
+            ("synonym", self._synonyms),
+        ):
+            start = bisect_left(keys, key)
+            stop = bisect_left(keys, key + _PREFIX_END, lo=start)
+            # Index instead of slicing: a short prefix may match most terms
+            for i in range(start, stop):
+                term, main = entries[i]
+                if len(results) == limit:
+                    return results
+                if term in seen:
+                    continue
+                seen.add(term)
+                results.append({"term": term, "main": main, "kind": kind})
+        return results
+
+    def __len__(self) -> int:
+        return len(self._mains[0]) + len(self._synonyms[0])
+
+    def approx_bytes(self) -> int:
+        total = 0
+        for keys, entries in (self._mains, self._synonyms):
+            total += sys.getsizeof(keys) + sys.getsizeof(entries)
+            total += sum(sys.getsizeof(key) for key in keys)
+            total += sum(sys.getsizeof(entry) for entry in entries)
+        return total
+
+
+class Suggestions:
+    """
+    Prefix search over the Vietnamese and the English terms of the glossary,
+    built independently of the concept index.
+
+    Attributes:
+        vn: VN_main and VN_synonym, synonyms with their VN_main
+        en: EN_main and EN_synonym, synonyms with the EN_main of their
+            vsource row
+    """
+
+    def __init__(self, vn: SuggestIndex, en: SuggestIndex):
+        self.vn = vn
+        self.en = en
+        self.built_at: Optional[datetime] = None
+        self.build_seconds: float = 0.0
+        self.approx_bytes: int = 0
+
+    @classmethod
+    def build(
+        cls,
+        engine: Engine,
+        dictionary_table: Table,
+        vn_synonym_table: Table,
+        en_vsrc_tables: List[Table],
+        en_vsrc_synonym_tables: List[Table],
+    ) -> "Suggestions":
+        """
+        Scan the term columns of every glossary table once, in primary key
+        order. Main terms equal under the database collation are suggested
+        once, as stored in their first row
+        """
+        start = time.perf_counter()
+        intern = _interner()
+        vn_mains: Dict[str, str] = {}
+        en_mains: Dict[str, str] = {}
+        en_synonyms = []
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(dictionary_table.c.VN_main, dictionary_table.c.EN_main).order_by(
+                    *dictionary_table.primary_key.columns
+                )
+            )
+            for vn_main, en_main in rows:
+                vn_mains.setdefault(collation_key(vn_main), intern(vn_main))
+                en_mains.setdefault(collation_key(en_main), intern(en_main))
+
+            rows = conn.execute(
+                select(
+                    vn_synonym_table.c.VN_synonym, vn_synonym_table.c.VN_main
+                ).order_by(*vn_synonym_table.primary_key.columns)
+            )
+            vn_synonyms = [(intern(term), intern(main)) for term, main in rows]
+
+            for src, src_synonym in zip(en_vsrc_tables, en_vsrc_synonym_tables):
+                primary_key = _primary_key(src)
+                src_en_main: Dict[str, str] = {}
+                rows = conn.execute(
+                    select(src.c[primary_key], src.c.EN_main).order_by(
+                        src.c[primary_key]
+                    )
+                )
+                for src_id, en_main in rows:
+                    src_en_main.setdefault(collation_key(src_id), intern(en_main))
+
+                rows = conn.execute(
+                    select(
+                        src_synonym.c[primary_key], src_synonym.c.EN_synonym
+                    ).order_by(*src_synonym.primary_key.columns)
+                )
+                en_synonyms += [
+                    (intern(en_synonym), src_en_main.get(collation_key(src_id)))
+                    for src_id, en_synonym in rows
+                ]
+
+        suggestions = cls(
+            SuggestIndex(vn_mains.values(), vn_synonyms),
+            SuggestIndex(en_mains.values(), en_synonyms),
+        )
+        suggestions.built_at = datetime.now()
+        suggestions.build_seconds = time.perf_counter() - start
+        suggestions.approx_bytes = (
+            suggestions.vn.approx_bytes() + suggestions.en.approx_bytes()
+        )
+        return suggestions
+
+    def size(self) -> Dict[str, int]:
+        return {
+            "vn_terms": len(self.vn),
+            "en_terms": len(self.en),
+            "approx_bytes": self.approx_bytes,
+        }
+
+
+class SuggestionsManager(ConceptIndexManager):
+    """
+    Owns the current `Suggestions` and rebuilds them in the background, see
+    `ConceptIndexManager`
+    """
+
+    name = "suggestions"
+
+    def _build(self) -> Suggestions:
+        return Suggestions.build(self._engine, *self._tables)
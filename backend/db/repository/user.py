@@ -1,5 +1,8 @@
+from typing import Optional
+
 from core.config import settings
 from core.hashing import Hasher
+from core.security import invalidate_principal
 from db.models.user import User
 from pydantic.error_wrappers import ErrorWrapper, ValidationError
 from schemas.user import UserCreate
@@ -45,15 +48,18 @@ def reject_familiar_name(email: str, db: Session):
                 )
 
 
-def create_new_user(user: UserCreate, db: Session):
+def create_new_user(
+    user: UserCreate, db: Session, hashed_password: Optional[str] = None
+):
     """
     Create a new user
 
-    If username already exist, raise ValidationError
+    `hashed_password` lets callers hash the password beforehand, e.g. in the
+    bcrypt worker pool. If username already exist, raise ValidationError
     """
     user = User(
         email=user.email,
-        password=Hasher.get_password_hash(user.password),
+        password=hashed_password or Hasher.get_password_hash(user.password),
         is_active=True,
         is_superuser=False,
     )
@@ -77,3 +83,22 @@ def create_new_user(user: UserCreate, db: Session):
 
     db.refresh(user)
     return user
+
+
+def deactivate_user(email: str, db: Session):
+    """
+    Deactivate the user `email` and drop their cached access tokens so that
+    the change applies to their very next request.
+
+    Return the user, or None if not found
+    """
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        return None
+
+    user.is_active = False
+    db.commit()
+    invalidate_principal(email)
+
+    db.refresh(user)
+    return user
@@ -1,35 +1,116 @@
-from typing import List, Optional, Union
-
-from db.models.table import TableName
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.cache import LRUCache
+from core.config import settings
+from db.change_feed import ChangeFeed
+from db.collation import collation_key
+from db.models.table import CountMode, TableName
+from db.repository.concept_index import ConceptIndexManager
+from db.repository.pagination import encode_cursor, keyset_after
+from db.repository.suggest import SuggestionsManager
+from db.schema import SchemaCache, SchemaSnapshot
 from db.session import knowledgebase_engine as engine
 from schemas.table import TableModel
-from sqlalchemy import Date, MetaData, Table, and_, cast, func, select
+from sqlalchemy import (BigInteger, DateTime, MetaData, Table, and_, case,
+                        cast, func, literal, literal_column, null, or_, select,
+                        union_all)
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.engine.row import Row
-from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import expression
+from sqlalchemy.sql.selectable import CTE, CompoundSelect, Select
+
+logger = logging.getLogger(__name__)
+
+# Reflected once and cached in a local file, see db/schema.py
+schema_snapshot = SchemaSnapshot(
+    engine,
+    path=settings.SCHEMA_SNAPSHOT_PATH,
+    table_names=[
+        TableName.TRANSLATION.value,
+        TableName.VN_SYNONYM.value,
+        TableName.EN_DO.value,
+        TableName.EN_UMLS.value,
+        TableName.DO_SYNONYM.value,
+        TableName.UMLS_SYNONYM.value,
+        TableName.EDITOR.value,
+    ],
+    optional_table_names=[table_name.value for table_name in TableName],
+)
+metadata = schema_snapshot.load()
+
+# Tables and catalog information for get_table / get_table_summary
+schema_cache = SchemaCache(
+    engine,
+    metadata,
+    schema_snapshot.version,
+    table_names=schema_snapshot.all_table_names,
+    check_seconds=settings.SCHEMA_VERSION_CHECK_SECONDS,
+)
 
-metadata = MetaData()
 # Loading the database as global vars
-dictionary_table = Table(TableName.TRANSLATION.value, metadata, autoload_with=engine)
-vn_synonym_table = Table(TableName.VN_SYNONYM.value, metadata, autoload_with=engine)
+dictionary_table = metadata.tables[TableName.TRANSLATION.value]
+vn_synonym_table = metadata.tables[TableName.VN_SYNONYM.value]
 
 en_vsrc_tables = [
-    Table(TableName.EN_DO.value, metadata, autoload_with=engine),
-    Table(TableName.EN_UMLS.value, metadata, autoload_with=engine),
+    metadata.tables[TableName.EN_DO.value],
+    metadata.tables[TableName.EN_UMLS.value],
 ]
 
 en_vsrc_synonym_tables = [
-    Table(TableName.DO_SYNONYM.value, metadata, autoload_with=engine),
-    Table(TableName.UMLS_SYNONYM.value, metadata, autoload_with=engine),
+    metadata.tables[TableName.DO_SYNONYM.value],
+    metadata.tables[TableName.UMLS_SYNONYM.value],
 ]
 
-editor_table = Table(TableName.EDITOR.value, metadata, autoload_with=engine)
+editor_table = metadata.tables[TableName.EDITOR.value]
+
+# In-process glossary index, only consulted once built (see main.py)
+concept_index = ConceptIndexManager(
+    engine,
+    dictionary_table,
+    vn_synonym_table,
+    en_vsrc_tables,
+    en_vsrc_synonym_tables,
+    refresh_seconds=settings.CONCEPT_INDEX_REFRESH_SECONDS,
+)
+
+# Type-ahead suggestions, always built at startup (see main.py)
+suggestions = SuggestionsManager(
+    engine,
+    dictionary_table,
+    vn_synonym_table,
+    en_vsrc_tables,
+    en_vsrc_synonym_tables,
+    refresh_seconds=settings.SUGGEST_REFRESH_SECONDS,
+)
+
+# (table name, CountMode) -> number of rows
+row_count_cache = LRUCache(maxsize=64, ttl=settings.ROW_COUNT_TTL_SECONDS)
+
+# Tables the concept lookups read from
+concept_tables = [
+    dictionary_table,
+    vn_synonym_table,
+    *en_vsrc_tables,
+    *en_vsrc_synonym_tables,
+]
 
+# Tables whose change tokens invalidate caches, see ChangeTokens
+change_token_tables = [
+    metadata.tables[table_name.value]
+    for table_name in TableName
+    if table_name.value in metadata.tables
+]
 
-def get_count(db: Session, table: Table) -> int:
+
+def get_count(db: Session, table: Table, mode: CountMode = CountMode.EXACT) -> int:
     """
-    Count the number of rows in the given table.
+    Count the number of rows in the given table. Results are cached for
+    ROW_COUNT_TTL_SECONDS.
 
     Parameters
     ----------
@@ -37,13 +118,211 @@ def get_count(db: Session, table: Table) -> int:
         SQLAlchemy Session.
     table : Table
         SQLAlchemy Table object.
+    mode : CountMode
+        EXACT scans the table (or its smallest index); APPROX reads the row
+        count SQL Server keeps in the partition statistics, which is not
+        transactionally consistent but costs a catalog lookup. Other dialects
+        fall back to an exact count.
 
     Returns
     -------
     int
         Number of rows in the table.
     """
-    return db.query(table).count()
+    key = (table.fullname, mode)
+    n_rows = row_count_cache.get(key)
+    if n_rows is None:
+        if mode == CountMode.APPROX:
+            n_rows = approx_count(db, table)
+        if n_rows is None:
+            n_rows = exact_count(db, table)
+        row_count_cache.set(key, n_rows)
+    return n_rows
+
+
+def exact_count(db: Session, table: Table) -> int:
+    """
+    SELECT COUNT_BIG(*) on SQL Server, SELECT count(*) elsewhere, without the
+    subquery `Query.count()` wraps around the table
+    """
+    if db.get_bind().dialect.name == "mssql":
+        count = func.count_big(literal_column("*"))
+    else:
+        count = func.count()
+    return db.execute(select(count).select_from(table)).scalar_one()
+
+
+# SQL Server catalog view of the partitions of every table and index
+sys_partitions = expression.table(
+    "partitions",
+    expression.column("object_id"),
+    expression.column("index_id"),
+    expression.column("rows"),
+    schema="sys",
+)
+
+
+def partition_rows(table: Table) -> Select:
+    """
+    SQL Server row count of `table` from sys.partitions (heap or clustered
+    index only, so that rows are not counted once per index)
+    """
+    return select(func.sum(sys_partitions.c.rows)).where(
+        sys_partitions.c.object_id == func.object_id(table.fullname),
+        sys_partitions.c.index_id.in_([0, 1]),
+    )
+
+
+def approx_count(db: Session, table: Table) -> Optional[int]:
+    """
+    Row count from sys.partitions. None if unavailable
+    """
+    if db.get_bind().dialect.name != "mssql":
+        return None
+    n_rows = db.execute(partition_rows(table)).scalar()
+    return int(n_rows) if n_rows is not None else None
+
+
+def change_tokens_query(tables: List[Table]) -> CompoundSelect:
+    """
+    One UNION ALL of (table_name, max Update_Date, max Insert_Date, row count)
+    per table. Both maxima are index seeks with the knowledge-base indexes.
+    The row count is the catalog's (see `partition_rows`) on SQL Server and
+    NULL elsewhere: counting the rows would scan every table
+    """
+
+    def latest(table: Table, column: str):
+        if column in table.c:
+            return select(func.max(table.c[column])).scalar_subquery()
+        return cast(null(), DateTime)
+
+    def n_rows(table: Table):
+        if engine.dialect.name == "mssql":
+            return partition_rows(table).scalar_subquery()
+        return cast(null(), BigInteger)
+
+    # Scalar subqueries rather than aggregates over the table, so that each
+    # column is its own seek or catalog lookup
+    return union_all(
+        *[
+            select(
+                literal(table.name).label("table_name"),
+                latest(table, "Update_Date").label("updated"),
+                latest(table, "Insert_Date").label("inserted"),
+                n_rows(table).label("n_rows"),
+            )
+            for table in tables
+        ]
+    )
+
+
+class ChangeTokens:
+    """
+    Table name -> (max Update_Date, max Insert_Date, row count) of
+    `change_token_tables`. Any write by an editor changes the token of the
+    table written to; on SQL Server, deletions change the row count. Other
+    dialects have no row count and miss deletions until the dates move.
+
+    Taken from the change feed while it is running and fresh, otherwise
+    fetched by this process at most every `ttl` seconds. Once there are
+    tokens, expired ones are still served while a background thread fetches
+    new ones, so requests never wait for the fetch. Cached row counts of the
+    tables whose token changed are dropped, so that a table summary computed
+    for a new token does not report an old count.
+    """
+
+    def __init__(self, tables: List[Table], ttl: float):
+        self.tables = tables
+        self.ttl = ttl
+        self.tokens: Dict[str, tuple] = {}
+        self.fetched_at: Optional[float] = None
+        self.feed: Optional[ChangeFeed] = None
+        self._lock = threading.Lock()
+
+    def fetch(self) -> Dict[str, tuple]:
+        with engine.connect() as conn:
+            rows = conn.execute(change_tokens_query(self.tables)).fetchall()
+        return {
+            table_name: (updated, inserted, n_rows)
+            for table_name, updated, inserted, n_rows in rows
+        }
+
+    @property
+    def expired(self) -> bool:
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > self.ttl
+
+    def get(self) -> Dict[str, tuple]:
+        if self.feed is not None and self.feed.fresh:
+            return self.feed.tokens
+
+        if self.fetched_at is None:
+            # Nothing to serve yet: wait for the first fetch
+            with self._lock:
+                if self.fetched_at is None:
+                    self.refresh()
+        elif self.expired and self._lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._refresh_and_release, name="change-tokens", daemon=True
+            ).start()
+        return self.tokens
+
+    def refresh(self):
+        """
+        Fetch the tokens and swap them in. Call with the lock held
+        """
+        tokens = self.fetch()
+        for table_name, token in tokens.items():
+            if self.tokens.get(table_name) != token:
+                self.changed(table_name, token)
+        self.tokens, self.fetched_at = tokens, time.monotonic()
+
+    def _refresh_and_release(self):
+        try:
+            self.refresh()
+        except Exception:
+            # Keep serving the current tokens; the next get tries again
+            logger.exception("Change token fetch failed")
+        finally:
+            self._lock.release()
+
+    def changed(self, table_name: str, token: tuple):
+        row_count_cache.evict(lambda key, _: key[0] == table_name)
+
+    def status(self) -> dict:
+        if self.feed is not None and self.feed.fresh:
+            return {"source": "feed", "tokens": self.feed.tokens}
+        return {
+            "source": "poll",
+            "ttl": self.ttl,
+            "age_seconds": (
+                time.monotonic() - self.fetched_at if self.fetched_at else None
+            ),
+            "tokens": self.tokens,
+        }
+
+
+def refresh_concept_index(table_name: str, token: tuple):
+    """
+    Rebuild the concept index, if in use, and the suggestions when a
+    glossary table changed
+    """
+    for manager in (concept_index, suggestions):
+        if manager.index is not None and table_name in manager.table_names:
+            manager.refresh()
+
+
+change_tokens = ChangeTokens(change_token_tables, settings.CHANGE_TOKEN_TTL_SECONDS)
+
+# Shares change tokens between the worker processes, see main.py
+change_feed = ChangeFeed(
+    settings.CHANGE_FEED_PATH,
+    change_tokens.fetch,
+    poll_seconds=settings.CHANGE_FEED_POLL_SECONDS,
+    lease_seconds=settings.CHANGE_FEED_LEASE_SECONDS,
+)
+change_tokens.feed = change_feed
+change_feed.subscribe(change_tokens.changed)
+change_feed.subscribe(refresh_concept_index)
 
 
 def get_table(table_name) -> Table:
@@ -64,10 +343,12 @@ def get_table(table_name) -> Table:
     Table
         SQLAlchemy Table object.
     """
-    return Table(table_name, metadata, autoload_with=engine)
+    return schema_cache.table(getattr(table_name, "value", table_name))
 
 
-def get_table_summary(db: Session, table: Table) -> TableModel:
+def get_table_summary(
+    db: Session, table: Table, count: CountMode = CountMode.EXACT
+) -> TableModel:
     """
     Given the table, return the TableModel object.
 
@@ -77,6 +358,8 @@ def get_table_summary(db: Session, table: Table) -> TableModel:
         SQLAlchemy Session.
     table : Table
         SQLAlchemy Table object.
+    count : CountMode
+        How `n_rows` is counted, see `get_count`.
     engine : Engine
         SQLAlchemy Engine object.
 
@@ -87,15 +370,12 @@ def get_table_summary(db: Session, table: Table) -> TableModel:
     """
 
     name = table.name
-    n_rows = get_count(db, table)
-    columns = list(table.columns.keys())
+    n_rows = get_count(db, table, count)
 
-    inspector = inspect(engine)
-
-    primary_key = [key.name for key in table.primary_key]
-
-    foreign_key = inspector.get_foreign_keys(table.name)
-    columns = inspector.get_columns(table.name)
+    description = schema_cache.describe(table.name)
+    primary_key = description["primary_key"]
+    foreign_key = description["foreign_key"]
+    columns = description["columns"]
 
     return {
         "name": name,
@@ -107,6 +387,189 @@ def get_table_summary(db: Session, table: Table) -> TableModel:
     }
 
 
+def concept_query(hit: CTE) -> CompoundSelect:
+    """
+    Build one UNION ALL statement returning everything about the concept
+    selected by `hit`, a CTE of at most one (VN_main, EN_main) dictionary row.
+
+    Every row has the columns (kind, vn_term, en_term, key_0 .. key_n) where
+    key_i holds ids of the i-th validation source:
+        - kind "main": vn_term = VN_main, en_term = EN_main
+        - kind "vn_synonym": vn_term = VN_synonym
+        - kind "vsource": key_i = lowest vsource id of EN_main, or NULL
+        - kind "en_synonym": en_term = EN_synonym, key_i = its vsource id
+    """
+    vn_type = dictionary_table.c.VN_main.type
+    en_type = dictionary_table.c.EN_main.type
+    key_types = [
+        src.c[[i.name for i in src.primary_key.columns.values()][0]].type
+        for src in en_vsrc_tables
+    ]
+
+    def row(kind: str, vn_term=None, en_term=None, key=None, key_index=None):
+        keys = [
+            key if i == key_index else cast(null(), key_type)
+            for i, key_type in enumerate(key_types)
+        ]
+        return [
+            literal_column(f"'{kind}'").label("kind"),
+            (vn_term if vn_term is not None else cast(null(), vn_type)).label(
+                "vn_term"
+            ),
+            (en_term if en_term is not None else cast(null(), en_type)).label(
+                "en_term"
+            ),
+            *[key.label(f"key_{i}") for i, key in enumerate(keys)],
+        ]
+
+    queries = [
+        select(*row("main", vn_term=hit.c.VN_main, en_term=hit.c.EN_main)),
+        select(*row("vn_synonym", vn_term=vn_synonym_table.c.VN_synonym)).join_from(
+            vn_synonym_table, hit, vn_synonym_table.c.VN_main == hit.c.VN_main
+        ),
+    ]
+
+    for i, (src, src_synonym) in enumerate(zip(en_vsrc_tables, en_vsrc_synonym_tables)):
+        primary_key = [i.name for i in src.primary_key.columns.values()][0]
+        queries.append(
+            select(
+                *row("vsource", key=func.min(src.c[primary_key]), key_index=i)
+            ).join_from(src, hit, src.c.EN_main == hit.c.EN_main)
+        )
+        queries.append(
+            select(
+                *row(
+                    "en_synonym",
+                    en_term=src_synonym.c.EN_synonym,
+                    key=src_synonym.c[primary_key],
+                    key_index=i,
+                )
+            )
+            .join_from(
+                src_synonym, src, src_synonym.c[primary_key] == src.c[primary_key]
+            )
+            .join(hit, src.c.EN_main == hit.c.EN_main)
+        )
+
+    return union_all(*queries)
+
+
+def fetch_concept(
+    conn: Connection, hit: CTE
+) -> Union[None, str, str, List[str], List[str]]:
+    """
+    Run `concept_query(hit)` and fold its rows into
+    (vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc),
+    or a tuple of None if `hit` is empty
+    """
+    rows = conn.execute(concept_query(hit)).fetchall()
+
+    main = next((row for row in rows if row.kind == "main"), None)
+    if main is None:
+        return None, None, None, None, None
+
+    vn_synonyms = [row.vn_term for row in rows if row.kind == "vn_synonym"]
+
+    en_synonyms = []
+    en_main_vsrc = {}
+    for i, src in enumerate(en_vsrc_tables):
+        key = f"key_{i}"
+        # One vsource row per source, NULL when EN_main is not charted
+        src_id = next(
+            (
+                row._mapping[key]
+                for row in rows
+                if row.kind == "vsource" and row._mapping[key] is not None
+            ),
+            None,
+        )
+        en_main_vsrc[src.name] = src_id
+        if src_id is not None:
+            # The synonyms were joined on their vsource id by the collation
+            en_synonyms += [
+                row.en_term
+                for row in rows
+                if row.kind == "en_synonym"
+                and collation_key(row._mapping[key]) == collation_key(src_id)
+            ]
+
+    return main.vn_term, main.en_term, vn_synonyms, en_synonyms, en_main_vsrc
+
+
+def vn_term_hit(term: str) -> CTE:
+    """
+    Dictionary row whose VN_main is `term`, or else the VN_main of the
+    synonym `term`
+    """
+    synonym_main = (
+        select(vn_synonym_table.c.VN_main)
+        .where(vn_synonym_table.c.VN_synonym == term)
+        .order_by(*vn_synonym_table.primary_key.columns)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return ordered_hit(
+        [dictionary_table.c.VN_main == term, dictionary_table.c.VN_main == synonym_main]
+    )
+
+
+def en_term_hit(en_term: str) -> CTE:
+    """
+    Dictionary row whose EN_main is `en_term`, or else the EN_main of the
+    synonym `en_term` in the first validation source listing it
+    """
+    conditions = [dictionary_table.c.EN_main == en_term]
+    for src, src_synonym in zip(en_vsrc_tables, en_vsrc_synonym_tables):
+        primary_key = [i.name for i in src.primary_key.columns.values()][0]
+        conditions.append(
+            dictionary_table.c.EN_main.in_(
+                select(src.c.EN_main)
+                .join_from(
+                    src_synonym,
+                    src,
+                    src_synonym.c[primary_key] == src.c[primary_key],
+                )
+                .where(src_synonym.c.EN_synonym == en_term)
+            )
+        )
+    return ordered_hit(conditions)
+
+
+def standard_hit(stdid: str, sources: List[Table]) -> CTE:
+    """
+    Dictionary row whose EN_main has id `stdid` in the first of `sources`
+    """
+    conditions = []
+    for src in sources:
+        primary_key = [i.name for i in src.primary_key.columns.values()][0]
+        conditions.append(
+            dictionary_table.c.EN_main.in_(
+                select(src.c.EN_main).where(src.c[primary_key] == stdid)
+            )
+        )
+    return ordered_hit(conditions)
+
+
+def ordered_hit(conditions: list) -> CTE:
+    """
+    First dictionary row matching any of `conditions`, earlier conditions
+    taking priority, then the lowest primary key
+    """
+    return (
+        select(dictionary_table.c.VN_main, dictionary_table.c.EN_main)
+        .where(or_(*conditions))
+        .order_by(
+            case(
+                *[(condition, i) for i, condition in enumerate(conditions)],
+                else_=len(conditions),
+            ),
+            *dictionary_table.primary_key.columns,
+        )
+        .limit(1)
+        .cte("hit")
+    )
+
+
 def locate_vn_term(term: str) -> Union[None, str, str, List[str], List[str]]:
     """
     Locate the Vietnamese term in the database.
@@ -121,35 +584,12 @@ def locate_vn_term(term: str) -> Union[None, str, str, List[str], List[str]]:
     Union[None, str, str, List[str], List[str]]
         Tuple containing Vietnamese main, English main, Vietnamese synonyms, and English synonyms.
     """
+    index = concept_index.index
+    if index is not None:
+        return index.locate_vn_term(term)
 
     with engine.connect() as conn:
-        # Search in tungdev_DICTIONARY for a match
-        dictionary_match = vn_main_in_dictionary(conn, term)
-
-        if dictionary_match:
-            vn_main = dictionary_match.VN_main
-            en_main = dictionary_match.EN_main
-        else:
-            # If not found in tungdev_DICTIONARY, search in tungdev_VN_SYNONYM
-            vn_main = vn_synonym_to_vn_main(conn, term)
-
-            if vn_main:
-                en_main = vn_main_in_dictionary(conn, vn_main).EN_main
-
-            else:
-                # If no matches found for vn_main
-                return None, None, None, None, None
-
-        vn_synonyms = vn_main_to_synonyms(conn, vn_synonym_table, vn_main)
-        en_synonyms = en_main_to_synonyms(
-            conn, en_vsrc_tables, en_vsrc_synonym_tables, en_main
-        )
-        en_main_vsrc = {
-            vsource.name: en_main_to_vsource_id(conn, vsource, en_main)
-            for vsource in en_vsrc_tables
-        }
-
-        return vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc
+        return fetch_concept(conn, vn_term_hit(term))
 
 
 def vn_synonym_to_vn_main(conn: Connection, vn_term: str) -> Union[str, None]:
@@ -169,6 +609,118 @@ def vn_synonym_to_vn_main(conn: Connection, vn_term: str) -> Union[str, None]:
         return None
 
 
+def vn_term_exists(vn_term: str) -> bool:
+    """
+    Check if vn_term is a known vn_main or vn_synonym
+    """
+    index = concept_index.index
+    if index is not None:
+        return index.vn_term_exists(vn_term)
+
+    with engine.connect() as conn:
+        return bool(
+            vn_synonym_to_vn_main(conn, vn_term) or vn_main_in_dictionary(conn, vn_term)
+        )
+
+
+def en_term_exists(en_term: str) -> bool:
+    """
+    Check if en_term is a known en_main or en_synonym
+    """
+    index = concept_index.index
+    if index is not None:
+        return index.en_term_exists(en_term)
+
+    with engine.connect() as conn:
+        return bool(
+            en_main_in_dictionary(conn, en_term) or en_synonym_to_en_main(conn, en_term)
+        )
+
+
+def suggest_from_db(
+    conn: Connection, mains: Select, synonyms: List[Select], limit: int
+) -> List[Dict[str, str]]:
+    """
+    Run prefix queries returning (term, main) rows, main terms first, and
+    fold them into the result of `SuggestIndex.suggest`
+    """
+    results = []
+    seen = set()
+    for kind, queries in (("main", [mains]), ("synonym", synonyms)):
+        rows = []
+        for query in queries:
+            rows += conn.execute(query.limit(limit)).fetchall()
+        for term, main in sorted(rows, key=lambda row: row[0]):
+            if len(results) == limit:
+                return results
+            if term in seen:
+                continue
+            seen.add(term)
+            results.append({"term": term, "main": main, "kind": kind})
+    return results
+
+
+def suggest_vn_terms(prefix: str, limit: int) -> List[Dict[str, str]]:
+    """
+    Up to `limit` VN_main and VN_synonym starting with `prefix`, main terms
+    first.
+
+    Diacritic insensitive once the suggestions are built; until then the
+    database fallback only matches the exact prefix.
+    """
+    index = suggestions.index
+    if index is not None:
+        return index.vn.suggest(prefix, limit)
+
+    main = dictionary_table.c.VN_main
+    synonym = vn_synonym_table.c
+    with engine.connect() as conn:
+        return suggest_from_db(
+            conn,
+            select(main.label("term"), main.label("main"))
+            .where(main.startswith(prefix, autoescape=True))
+            .order_by(main),
+            [
+                select(synonym.VN_synonym, synonym.VN_main)
+                .where(synonym.VN_synonym.startswith(prefix, autoescape=True))
+                .order_by(synonym.VN_synonym)
+            ],
+            limit,
+        )
+
+
+def suggest_en_terms(prefix: str, limit: int) -> List[Dict[str, str]]:
+    """
+    Up to `limit` EN_main and EN_synonym starting with `prefix`, main terms
+    first. See `suggest_vn_terms`
+    """
+    index = suggestions.index
+    if index is not None:
+        return index.en.suggest(prefix, limit)
+
+    main = dictionary_table.c.EN_main
+    synonyms = []
+    for src, src_synonym in zip(en_vsrc_tables, en_vsrc_synonym_tables):
+        primary_key = [i.name for i in src.primary_key.columns.values()][0]
+        synonyms.append(
+            select(src_synonym.c.EN_synonym, src.c.EN_main)
+            .join_from(
+                src_synonym, src, src_synonym.c[primary_key] == src.c[primary_key]
+            )
+            .where(src_synonym.c.EN_synonym.startswith(prefix, autoescape=True))
+            .order_by(src_synonym.c.EN_synonym)
+        )
+    with engine.connect() as conn:
+        return suggest_from_db(
+            conn,
+            select(main.label("term"), main.label("main"))
+            .where(main.startswith(prefix, autoescape=True))
+            .order_by(main),
+            synonyms,
+            limit,
+        )
+
+
 def vn_main_in_dictionary(conn: Connection, vn_main: str) -> Row:
     """
     Assuming vn_main 1:1 en_main. Find rows in
@@ -316,32 +868,275 @@ def locate_en_term(en_term: str) -> Union[None, str, str, List[str], List[str]]:
     Union[None, str, str, List[str], List[str]]
         Tuple containing Vietnamese main, English main, Vietnamese synonyms, and English synonyms.
     """
+    index = concept_index.index
+    if index is not None:
+        return index.locate_en_term(en_term)
 
     with engine.connect() as conn:
-        dictionary_match = en_main_in_dictionary(conn, en_term)
+        return fetch_concept(conn, en_term_hit(en_term))
 
-        if dictionary_match:
-            en_main = dictionary_match.EN_main
-            vn_main = dictionary_match.VN_main
 
-        else:
-            en_main = en_synonym_to_en_main(conn, en_term)
-            if en_main:
-                vn_main = en_main_in_dictionary(conn, en_main).VN_main
-            else:
-                return None, None, None, None, None
-
-        vn_synonyms = vn_main_to_synonyms(conn, vn_synonym_table, vn_main)
-        en_synonyms = en_main_to_synonyms(
-            conn, en_vsrc_tables, en_vsrc_synonym_tables, en_main
+def fetch_in(
+    conn: Connection, columns: list, key_column, values: Iterable, order_by=()
+) -> List[Row]:
+    """
+    Select `columns` where `key_column` is in `values`, using one IN query per
+    chunk of SQL_IN_CHUNK_SIZE values (SQL Server caps a statement at 2100
+    parameters). Rows are sorted by `order_by` within each chunk
+    """
+    values = list(values)
+    size = settings.SQL_IN_CHUNK_SIZE
+    rows = []
+    for i in range(0, len(values), size):
+        query = (
+            select(*columns)
+            .where(key_column.in_(values[i : i + size]))
+            .order_by(*order_by)
         )
+        rows += conn.execute(query).fetchall()
+    return rows
 
-        en_main_vsrc = {
-            vsource.name: en_main_to_vsource_id(conn, vsource, en_main)
-            for vsource in en_vsrc_tables
-        }
 
-        return vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc
+def resolve_concepts(
+    conn: Connection, mains: Iterable[Tuple[str, str]]
+) -> Dict[Tuple[str, str], tuple]:
+    """
+    Given (vn_main, en_main) pairs, fetch synonyms and vsource ids of every
+    concept at once. Map each pair to
+    (vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc)
+
+    The database matches the pairs by its collation, so fetched rows are
+    grouped by `collation_key` rather than by their exact spelling.
+    """
+    mains = set(mains)
+    vn_synonyms = {collation_key(vn_main): [] for vn_main, _ in mains}
+    for vn_synonym, vn_main in fetch_in(
+        conn,
+        [vn_synonym_table.c.VN_synonym, vn_synonym_table.c.VN_main],
+        vn_synonym_table.c.VN_main,
+        set(vn_main for vn_main, _ in mains),
+        order_by=vn_synonym_table.primary_key.columns,
+    ):
+        vn_synonyms.setdefault(collation_key(vn_main), []).append(vn_synonym)
+
+    en_mains = set(en_main for _, en_main in mains)
+    src_ids = []
+    src_synonyms = []
+    for src, src_synonym in zip(en_vsrc_tables, en_vsrc_synonym_tables):
+        primary_key = [i.name for i in src.primary_key.columns.values()][0]
+
+        # Like fetch_concept, keep the first vsource row of EN_main
+        ids = {}
+        for src_id, en_main in fetch_in(
+            conn,
+            [src.c[primary_key], src.c.EN_main],
+            src.c.EN_main,
+            en_mains,
+            order_by=[src.c[primary_key]],
+        ):
+            ids.setdefault(collation_key(en_main), src_id)
+
+        synonyms = {collation_key(src_id): [] for src_id in ids.values()}
+        for src_id, en_synonym in fetch_in(
+            conn,
+            [src_synonym.c[primary_key], src_synonym.c.EN_synonym],
+            src_synonym.c[primary_key],
+            set(ids.values()),
+            order_by=src_synonym.primary_key.columns,
+        ):
+            synonyms.setdefault(collation_key(src_id), []).append(en_synonym)
+
+        src_ids.append(ids)
+        src_synonyms.append(synonyms)
+
+    concepts = dict()
+    for vn_main, en_main in mains:
+        en_synonyms = []
+        en_main_vsrc = {}
+        for src, ids, synonyms in zip(en_vsrc_tables, src_ids, src_synonyms):
+            src_id = ids.get(collation_key(en_main))
+            en_main_vsrc[src.name] = src_id
+            if src_id is not None:
+                en_synonyms += synonyms[collation_key(src_id)]
+
+        concepts[(vn_main, en_main)] = (
+            vn_main,
+            en_main,
+            list(vn_synonyms[collation_key(vn_main)]),
+            en_synonyms,
+            en_main_vsrc,
+        )
+    return concepts
+
+
+def locate_vn_terms(terms: List[str]) -> Dict[str, tuple]:
+    """
+    Batch version of `locate_vn_term`.
+
+    Resolve every term with a fixed number of IN queries per chunk of terms,
+    instead of several round trips per term.
+
+    Returns
+    -------
+    Dict[str, tuple]
+        Maps each term to the same tuple `locate_vn_term` returns.
+    """
+    terms = list(dict.fromkeys(terms))
+    index = concept_index.index
+    if index is not None:
+        return {term: index.locate_vn_term(term) for term in terms}
+
+    not_found = (None, None, None, None, None)
+    dictionary_id = list(dictionary_table.primary_key.columns)[0]
+
+    with engine.connect() as conn:
+        # collation_key(VN_main) -> (VN_main, EN_main) of its first row
+        mains = dict()
+
+        def fetch_mains(vn_mains: Iterable[str]):
+            for vn_main, en_main in fetch_in(
+                conn,
+                [dictionary_table.c.VN_main, dictionary_table.c.EN_main],
+                dictionary_table.c.VN_main,
+                vn_mains,
+                order_by=[dictionary_id],
+            ):
+                mains.setdefault(collation_key(vn_main), (vn_main, en_main))
+
+        fetch_mains(terms)
+
+        # collation_key(VN_synonym) -> VN_main of its first row
+        synonym_to_main = dict()
+        for vn_synonym, vn_main in fetch_in(
+            conn,
+            [vn_synonym_table.c.VN_synonym, vn_synonym_table.c.VN_main],
+            vn_synonym_table.c.VN_synonym,
+            [term for term in terms if collation_key(term) not in mains],
+            order_by=vn_synonym_table.primary_key.columns,
+        ):
+            synonym_to_main.setdefault(collation_key(vn_synonym), vn_main)
+
+        fetch_mains(
+            set(
+                vn_main
+                for vn_main in synonym_to_main.values()
+                if collation_key(vn_main) not in mains
+            )
+        )
+
+        term_to_main = dict()
+        for term in terms:
+            key = collation_key(term)
+            if key not in mains:
+                key = collation_key(synonym_to_main.get(key))
+            if key in mains:
+                term_to_main[term] = mains[key]
+        concepts = resolve_concepts(conn, term_to_main.values())
+
+    return {
+        term: concepts[term_to_main[term]] if term in term_to_main else not_found
+        for term in terms
+    }
+
+
+def locate_en_terms(en_terms: List[str]) -> Dict[str, tuple]:
+    """
+    Batch version of `locate_en_term`.
+
+    Resolve every term with a fixed number of IN queries per chunk of terms,
+    instead of several round trips per term.
+
+    Returns
+    -------
+    Dict[str, tuple]
+        Maps each term to the same tuple `locate_en_term` returns.
+    """
+    en_terms = list(dict.fromkeys(en_terms))
+    index = concept_index.index
+    if index is not None:
+        return {term: index.locate_en_term(term) for term in en_terms}
+
+    not_found = (None, None, None, None, None)
+    dictionary_id = list(dictionary_table.primary_key.columns)[0]
+
+    with engine.connect() as conn:
+        # collation_key(EN_main) -> (id, VN_main, EN_main) of its first row
+        mains = dict()
+
+        def fetch_mains(en_mains: Iterable[str]):
+            for row in fetch_in(
+                conn,
+                [dictionary_id, dictionary_table.c.VN_main, dictionary_table.c.EN_main],
+                dictionary_table.c.EN_main,
+                en_mains,
+                order_by=[dictionary_id],
+            ):
+                mains.setdefault(collation_key(row[2]), tuple(row))
+
+        fetch_mains(en_terms)
+        term_to_main = dict()
+        for term in en_terms:
+            if collation_key(term) in mains:
+                term_to_main[term] = mains[collation_key(term)]
+
+        # Like en_term_hit, the first validation source listing the synonym
+        # for a dictionary EN_main wins, then the first dictionary row
+        for src, src_synonym in zip(en_vsrc_tables, en_vsrc_synonym_tables):
+            remaining = [term for term in en_terms if term not in term_to_main]
+            if not remaining:
+                break
+            primary_key = [i.name for i in src.primary_key.columns.values()][0]
+
+            synonym_to_ids = dict()
+            for en_synonym, src_id in fetch_in(
+                conn,
+                [src_synonym.c.EN_synonym, src_synonym.c[primary_key]],
+                src_synonym.c.EN_synonym,
+                remaining,
+            ):
+                synonym_to_ids.setdefault(collation_key(en_synonym), set()).add(src_id)
+
+            id_to_main = dict()
+            for src_id, en_main in fetch_in(
+                conn,
+                [src.c[primary_key], src.c.EN_main],
+                src.c[primary_key],
+                set().union(*synonym_to_ids.values()),
+            ):
+                id_to_main.setdefault(collation_key(src_id), en_main)
+
+            fetch_mains(
+                set(
+                    en_main
+                    for en_main in id_to_main.values()
+                    if collation_key(en_main) not in mains
+                )
+            )
+
+            for term in remaining:
+                candidates = [
+                    mains[key]
+                    for key in (
+                        collation_key(id_to_main.get(collation_key(src_id)))
+                        for src_id in synonym_to_ids.get(collation_key(term), ())
+                    )
+                    if key in mains
+                ]
+                if candidates:
+                    term_to_main[term] = min(candidates)
+
+        concepts = resolve_concepts(
+            conn, [(vn_main, en_main) for _, vn_main, en_main in term_to_main.values()]
+        )
+
+    result = dict()
+    for term in en_terms:
+        if term in term_to_main:
+            _, vn_main, en_main = term_to_main[term]
+            result[term] = concepts[(vn_main, en_main)]
+        else:
+            result[term] = not_found
+    return result
 
 
 def calculate_validated_en_main(en_vsrc_tables: List[Table]) -> int:
@@ -383,69 +1178,291 @@ def calculate_non_validated_en_main(en_vsrc_tables: List[Table]) -> int:
             return []
 
 
+def uncharted_en_main_query(
+    en_vsrc_tables: List[Table], after: Optional[list] = None
+) -> Select:
+    """
+    (EN_main, dictionary key) of the dictionary rows whose EN_main is in none
+    of `en_vsrc_tables`, sorted by the pair, starting after the pair `after`.
+
+    Unlike `calculate_non_validated_en_main`, NULL EN_mains are left out
+    since they cannot be paged through.
+    """
+    en_main = dictionary_table.c.EN_main
+    key = list(dictionary_table.primary_key.columns)[0]
+
+    query = (
+        select(en_main, key)
+        .where(
+            en_main.is_not(None),
+            *[
+                ~select(src.c.EN_main).where(src.c.EN_main == en_main).exists()
+                for src in en_vsrc_tables
+            ],
+        )
+        .order_by(en_main, key)
+    )
+    if after is not None:
+        query = query.where(keyset_after([en_main, key], after))
+    return query
+
+
+def uncharted_en_main_cursor_types() -> tuple:
+    """
+    Types of the values of an `uncharted_en_main_page` cursor, for
+    `decode_cursor`
+    """
+    key = list(dictionary_table.primary_key.columns)[0]
+    return str, key.type.python_type
+
+
+def uncharted_en_main_page(
+    en_vsrc_tables: List[Table], limit: int, after: Optional[list] = None
+) -> Tuple[List[str], Optional[str]]:
+    """
+    One page of uncharted EN_mains and the cursor of the next page, None on
+    the last page
+    """
+    query = uncharted_en_main_query(en_vsrc_tables, after).limit(limit + 1)
+    with engine.connect() as conn:
+        rows = conn.execute(query).fetchall()
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [row[0] for row in rows[:limit]], next_cursor
+
+
+def iter_uncharted_en_main(
+    en_vsrc_tables: List[Table],
+    after: Optional[list] = None,
+    batch_size: int = settings.STREAM_BATCH_SIZE,
+) -> Iterator[List[str]]:
+    """
+    Yield every uncharted EN_main in batches of `batch_size`, reading the
+    result set through a server-side cursor so memory stays constant
+    """
+    query = uncharted_en_main_query(en_vsrc_tables, after)
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(query)
+        for rows in result.partitions():
+            yield [row[0] for row in rows]
+
+
 def validated_en_main_statistics(en_vsrc_tables: List[Table]):
     """
     Count the number of en_main in dictionary table that are:
         - mapped to each validation source
         - mapped to all
         - mapped to none
+
+    Computed by a single aggregate query: the dictionary is outer joined to
+    the number of rows per EN_main of each validation source, so the counts
+    equal the row counts of the joins in `calculate_validated_en_main` /
+    `calculate_non_validated_en_main` without transferring any EN_main.
     """
-    result = dict()
+    matches = [
+        select(src.c.EN_main, func.count().label("n"))
+        .group_by(src.c.EN_main)
+        .subquery(f"src_{i}")
+        for i, src in enumerate(en_vsrc_tables)
+    ]
+
+    joined = dictionary_table
+    for match in matches:
+        joined = joined.outerjoin(match, dictionary_table.c.EN_main == match.c.EN_main)
+
+    all_n = matches[0].c.n
+    for match in matches[1:]:
+        all_n = all_n * match.c.n
+
+    query = select(
+        func.count().label("dictionary_size"),
+        func.count(case((and_(*[match.c.n.is_(None) for match in matches]), 1))).label(
+            "count_uncharted_en_mains"
+        ),
+        func.coalesce(func.sum(all_n), 0).label("count_charted_to_all_vsources"),
+        *[
+            func.coalesce(func.sum(match.c.n), 0).label(f"count_charted_{i}")
+            for i, match in enumerate(matches)
+        ],
+    ).select_from(joined)
 
     with engine.connect() as conn:
-        result["dictionary_size"] = len(
-            conn.execute(select(dictionary_table.c.EN_main)).fetchall()
-        )
+        row = conn.execute(query).one()._mapping
 
-    result["count_uncharted_en_mains"] = len(
-        calculate_non_validated_en_main(en_vsrc_tables)
-    )
-    result["count_charted"] = dict()
-    for table in en_vsrc_tables:
-        result["count_charted"][table.name] = len(calculate_validated_en_main([table]))
-
-    result["count_charted_to_all_vsources"] = len(
-        calculate_validated_en_main(en_vsrc_tables)
-    )
-
-    return result
+    return {
+        "dictionary_size": row["dictionary_size"],
+        "count_uncharted_en_mains": row["count_uncharted_en_mains"],
+        "count_charted": {
+            src.name: row[f"count_charted_{i}"] for i, src in enumerate(en_vsrc_tables)
+        },
+        "count_charted_to_all_vsources": row["count_charted_to_all_vsources"],
+    }
 
 
-def rows_per_editors(mode: str):
-    f"""
-    Count the number of {mode} rows per editor across all tables
+def contribution_columns(mode: str) -> Tuple[str, str]:
+    """
+    (editor column, date column) of the insert or update audit trail
     """
     if mode == "insert":
-        user_col = "Insert_User"
-    else:
-        user_col = "Update_User"
+        return "Insert_User", "Insert_Date"
+    return "Update_User", "Update_Date"
 
-    tables = (
+
+def contribution_tables() -> List[Table]:
+    return (
         [dictionary_table, vn_synonym_table] + en_vsrc_tables + en_vsrc_synonym_tables
     )
 
-    contribution = dict()
-    with engine.connect() as conn:
-        for table in tables:
-            subquery = (
-                select(
-                    editor_table.c.User_Name,
-                    func.count().label("n_rows"),
-                )
-                .select_from(
-                    editor_table.outerjoin(
-                        table,
-                        editor_table.c.User_Id == table.c[user_col],
-                    )
-                )
-                .group_by(editor_table.c.User_Id, editor_table.c.User_Name)
+
+def editor_counts_query(
+    mode: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    watermarks: Optional[Dict[str, datetime]] = None,
+) -> Select:
+    """
+    One statement returning (User_Id, User_Name, table name, n_rows, last date)
+    for every editor and every table they contributed to.
+
+    Each table is aggregated per editor in its own UNION ALL branch, so the
+    join with the editor table only sees a handful of rows. Editors without
+    any contribution come back once, with a NULL table name.
+
+    Parameters
+    ----------
+    mode : str
+        "insert" or "update".
+    since, until : datetime, optional
+        Only count rows dated in [since, until).
+    watermarks : Dict[str, datetime], optional
+        Per table name, only count rows dated after the watermark.
+    """
+    user_col, date_col = contribution_columns(mode)
+    watermarks = watermarks or {}
+
+    branches = []
+    for table in contribution_tables():
+        date = table.c[date_col]
+        conditions = []
+        if since is not None:
+            conditions.append(date >= since)
+        if until is not None:
+            conditions.append(date < until)
+        if watermarks.get(table.name) is not None:
+            conditions.append(date > watermarks[table.name])
+
+        branches.append(
+            select(
+                literal(table.name).label("table_name"),
+                table.c[user_col].label("user_id"),
+                func.count().label("n_rows"),
+                func.max(date).label("last_date"),
             )
+            .where(*conditions)
+            .group_by(table.c[user_col])
+        )
+    counts = union_all(*branches).subquery("counts")
+
+    return select(
+        editor_table.c.User_Id,
+        editor_table.c.User_Name,
+        counts.c.table_name,
+        counts.c.n_rows,
+        counts.c.last_date,
+    ).select_from(
+        editor_table.outerjoin(counts, editor_table.c.User_Id == counts.c.user_id)
+    )
 
-            result = conn.execute(subquery)
-            rows = result.fetchall()
-            contribution[table.name] = dict(rows)
 
-        return contribution
+def add_editor_counts(
+    contribution: Dict[str, Dict[str, int]],
+    watermarks: Dict[str, datetime],
+    rows: Iterable[Row],
+):
+    """
+    Add the rows of `editor_counts_query` to `contribution` (table name ->
+    editor name -> n_rows) and move the per-table `watermarks` forward.
+    Every editor gets an entry in every table, 0 if they contributed nothing
+    """
+    editors = set()
+    for _, user_name, table_name, n_rows, last_date in rows:
+        editors.add(user_name)
+        if table_name is None:
+            continue
+        counts = contribution.setdefault(table_name, {})
+        counts[user_name] = counts.get(user_name, 0) + n_rows
+        if last_date is not None and (
+            watermarks.get(table_name) is None or last_date > watermarks[table_name]
+        ):
+            watermarks[table_name] = last_date
+
+    for table in contribution_tables():
+        counts = contribution.setdefault(table.name, {})
+        for user_name in editors:
+            counts.setdefault(user_name, 0)
+
+
+def rows_per_editors(
+    mode: str, since: Optional[datetime] = None, until: Optional[datetime] = None
+):
+    """
+    Count the number of inserted or updated rows per editor across all
+    tables, optionally only the rows dated in [since, until)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(editor_counts_query(mode, since, until)).fetchall()
+
+    contribution = dict()
+    add_editor_counts(contribution, {}, rows)
+    return contribution
+
+
+class EditorContributions:
+    """
+    Running result of `rows_per_editors("insert")`, kept up to date by
+    counting only the rows inserted after the last seen Insert_Date of each
+    table.
+
+    Only inserts can be counted this way: a row is inserted once, by one
+    editor. An update moves the row's Update_Date past the watermark again
+    and would count it twice, so update counts are always full counts.
+    Incremental counts cannot see deletions either, so everything is
+    recounted from scratch every `full_refresh_seconds`.
+    """
+
+    mode = "insert"
+
+    def __init__(self, full_refresh_seconds: float):
+        self.full_refresh_seconds = full_refresh_seconds
+        self.contribution: Optional[Dict[str, Dict[str, int]]] = None
+        self.watermarks: Dict[str, datetime] = {}
+        self.counted_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            if (
+                self.contribution is None
+                or time.monotonic() - self.counted_at > self.full_refresh_seconds
+            ):
+                self.contribution, self.watermarks = {}, {}
+                self.counted_at = time.monotonic()
+            query = editor_counts_query(self.mode, watermarks=self.watermarks)
+            with engine.connect() as conn:
+                rows = conn.execute(query).fetchall()
+            add_editor_counts(self.contribution, self.watermarks, rows)
+
+            return {
+                table_name: dict(counts)
+                for table_name, counts in self.contribution.items()
+            }
+
+
+editor_insert_contributions = EditorContributions(
+    settings.EDITOR_COUNTS_FULL_REFRESH_SECONDS
+)
 
 
 def standard_to_en_main(stdid: str, en_vsrc_table: Table, conn: Connection):
@@ -471,51 +1488,91 @@ def standard_to_en_main_optional_source(stdid: str, en_vsrc_table: Optional[Tabl
                     return match
 
 
-def locate_standard(stdid: str, en_vsrc_table: Optional[Table]):
-    en_main = standard_to_en_main_optional_source(stdid, en_vsrc_table)
-    if en_main:
-        en_main = en_main[0]
-        with engine.connect() as conn:
-            en_synonyms = en_main_to_synonyms(
-                conn, en_vsrc_tables, en_vsrc_synonym_tables, en_main
-            )
-            vn_main = en_main_in_dictionary(conn, en_main).VN_main
-            vn_synonyms = vn_main_to_synonyms(conn, vn_synonym_table, vn_main)
-            en_main_vsrc = {
-                vsource.name: en_main_to_vsource_id(conn, vsource, en_main)
-                for vsource in en_vsrc_tables
-            }
+def locate_standard(stdid: str, en_vsrc_table: Optional[Union[Table, str]]):
+    """
+    Locate the concept whose EN_main has id `stdid` in validation source
+    `en_vsrc_table` (a Table or table name), or in any source if None.
+
+    Return the same tuple as `locate_vn_term`, or None if not found
+    """
+    if en_vsrc_table is None:
+        sources = en_vsrc_tables
+    else:
+        if isinstance(en_vsrc_table, Table):
+            en_vsrc_table = en_vsrc_table.name
+        sources = [src for src in en_vsrc_tables if src.name == en_vsrc_table]
+        if not sources:
+            return None
+
+    with engine.connect() as conn:
+        match = fetch_concept(conn, standard_hit(stdid, sources))
+
+    if match[0] is not None:
+        return match
 
-            return vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc
 
+def review_cursor_types(table: Table) -> tuple:
+    """
+    Types of the values of a `review_per_day` cursor, for `decode_cursor`:
+    the date is parsed back from ISO format
+    """
+    key = list(table.primary_key.columns)[0]
+    return datetime.fromisoformat, key.type.python_type
 
-def review_per_day(table: Table, date: str = None, mode="update"):
+
+def review_per_day(
+    table: Table,
+    date: str = None,
+    mode="update",
+    page_size: int = settings.PAGE_SIZE,
+    cursor: Optional[list] = None,
+) -> Tuple[Dict[str, list], Optional[str]]:
     """
-    Show daily records from table
+    Show daily records from table, one page at a time
     table: sqlalchemy.Table
     date: YMD format, e.g., "2023-12-31"
     mode: insert or update. If Update, filter where Update_Date == date, etc
+    page_size: number of records per page
+    cursor: `next_cursor` of the previous page, decoded with
+        `review_cursor_types(table)`; also determines the day when `date` is
+        not given
+
+    Records are sorted by (date, primary key) and selected with a half-open
+    range on the bare date column, so that an index on it can be used.
+    Return (columns_data, next_cursor), next_cursor being None on the last page
     """
+    date_col = table.c.Insert_Date if mode != "update" else table.c.Update_Date
+    key = list(table.primary_key.columns)[0]
+
     with engine.connect() as conn:
-        if not date:
+        if date:
+            day = datetime.strptime(date, "%Y-%m-%d")
+        elif cursor is not None:
+            day = datetime.combine(cursor[0].date(), datetime.min.time())
+        else:
             # If date is not provided, get the latest date from the table
-            latest_date_query = select(func.max(table.c.Update_Date))
-            result = conn.execute(latest_date_query)
-            latest_date = result.scalar()
-            date = latest_date.strftime("%Y-%m-%d") if latest_date else None
+            latest_date = conn.execute(select(func.max(date_col))).scalar()
+            if latest_date is None:
+                return {col: [] for col in table.columns.keys()}, None
+            day = datetime.combine(latest_date.date(), datetime.min.time())
+
+        query = select(table).where(date_col >= day, date_col < day + timedelta(days=1))
+        if cursor is not None:
+            query = query.where(keyset_after([date_col, key], cursor))
+        query = query.order_by(date_col, key).limit(page_size + 1)
 
-        if mode != "update":
-            query = select(table).where(cast(table.c.Insert_Date, Date) == date)
-        else:
-            query = select(table).where(cast(table.c.Update_Date, Date) == date)
         result = conn.execute(query)
+        columns = list(result.keys())
         records = result.fetchall()
 
-        # Convert records to a dictionary with column names
-        # as keys and lists as values
-        columns_data = {col: [] for col in result.keys()}
-        for record in records:
-            for col, value in zip(result.keys(), record):
-                columns_data[col].append(value)
-
-        return columns_data
+    next_cursor = None
+    if len(records) > page_size:
+        records = records[:page_size]
+        last = records[-1]._mapping
+        next_cursor = encode_cursor([last[date_col].isoformat(), last[key]])
+
+    # Convert records to a dictionary with column names
+    # as keys and lists as values
+    values = zip(*records) if records else ([] for _ in columns)
+    columns_data = dict(zip(columns, map(list, values)))
+    return columns_data, next_cursor
@@ -0,0 +1,345 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import MetaData, Table, bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import NoSuchTableError
+
+logger = logging.getLogger(__name__)
+
+
+def schema_version(conn: Connection, table_names: List[str]) -> str:
+    """
+    Cheap fingerprint of the definition of `table_names`, changing whenever
+    one of them is created, dropped or altered.
+
+    SQL Server answers from sys.tables and SQLite from the CREATE statements
+    in sqlite_master, one query each; other dialects hash the reflected
+    columns and keys instead
+    """
+    if conn.dialect.name == "mssql":
+        query = text(
+            "SELECT COUNT(*), MAX(modify_date) FROM sys.tables WHERE name IN :names"
+        ).bindparams(bindparam("names", expanding=True))
+        n_tables, modified = conn.execute(query, {"names": table_names}).one()
+        return f"{n_tables}:{modified.isoformat() if modified else None}"
+
+    if conn.dialect.name == "sqlite":
+        # ALTER TABLE rewrites the stored CREATE statement
+        query = text(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'table' AND name IN :names ORDER BY name"
+        ).bindparams(bindparam("names", expanding=True))
+        digest = hashlib.sha1()
+        for name, sql in conn.execute(query, {"names": table_names}):
+            digest.update(f"{name}:{sql}".encode())
+        return digest.hexdigest()
+
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    digest = hashlib.sha1()
+    for name in sorted(table_names):
+        digest.update(name.encode())
+        if name not in existing:
+            continue
+        for column in inspector.get_columns(name):
+            digest.update(
+                f"{column['name']}:{column['type']}:{column['nullable']}".encode()
+            )
+        digest.update(repr(inspector.get_pk_constraint(name)).encode())
+        digest.update(repr(inspector.get_foreign_keys(name)).encode())
+    return digest.hexdigest()
+
+
+class SchemaSnapshot:
+    """
+    Reflected MetaData of the knowledge-base tables, cached in a local file.
+
+    Workers load the snapshot in milliseconds instead of reflecting every
+    table at import, and can boot while the database is unreachable. The
+    snapshot is checked against the live catalog afterwards (see
+    `validate_in_background`) and rewritten when the schema has changed;
+    workers started after that pick up the new schema.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine of the database to reflect.
+    path : str
+        Snapshot file. An empty path disables the snapshot.
+    table_names : List[str]
+        Tables that must exist.
+    optional_table_names : List[str]
+        Tables reflected if they exist, e.g. so that `get_table` finds them.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        path: str,
+        table_names: List[str],
+        optional_table_names: List[str] = (),
+    ):
+        self.engine = engine
+        self.path = path
+        self.table_names = list(table_names)
+        self.optional_table_names = [
+            name for name in optional_table_names if name not in table_names
+        ]
+        self.version: Optional[str] = None
+        self.created_at: Optional[datetime] = None
+        self.loaded_from_file = False
+        self.stale = False
+        self.last_validated_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def load(self) -> MetaData:
+        """
+        Return the MetaData from the snapshot file if it matches this engine,
+        otherwise reflect it from the database and write the snapshot
+        """
+        snapshot = self._read()
+        if snapshot is not None:
+            self.version = snapshot["version"]
+            self.created_at = snapshot["created_at"]
+            self.loaded_from_file = True
+            return snapshot["metadata"]
+
+        metadata, self.version = self.reflect()
+        self.created_at = datetime.now()
+        self._write(metadata, self.version, self.created_at)
+        return metadata
+
+    def reflect(self):
+        """
+        Reflect the tables from the database. Return (MetaData, version)
+        """
+        metadata = MetaData()
+        with self.engine.connect() as conn:
+            existing = set(inspect(conn).get_table_names())
+            missing = [name for name in self.table_names if name not in existing]
+            if missing:
+                raise NoSuchTableError(", ".join(missing))
+
+            optional = [name for name in self.optional_table_names if name in existing]
+            metadata.reflect(bind=conn, only=self.table_names + optional)
+            version = schema_version(conn, self.all_table_names)
+        return metadata, version
+
+    @property
+    def all_table_names(self) -> List[str]:
+        return self.table_names + self.optional_table_names
+
+    def validate(self) -> bool:
+        """
+        Compare the snapshot with the live catalog and rewrite the snapshot
+        file if the schema changed. Return True if the snapshot is current
+        """
+        try:
+            with self.engine.connect() as conn:
+                live_version = schema_version(conn, self.all_table_names)
+            self.last_validated_at = datetime.now()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = repr(e)
+            logger.warning("Could not validate schema snapshot: %r", e)
+            return False
+
+        if live_version == self.version:
+            return True
+
+        self.stale = True
+        logger.warning(
+            "Schema of %s changed since the snapshot; refreshing %s. "
+            "Restart workers to use the new schema.",
+            self.url,
+            self.path,
+        )
+        metadata, version = self.reflect()
+        self._write(metadata, version, datetime.now())
+        return False
+
+    def validate_in_background(self):
+        """
+        Run `validate` in a daemon thread if the schema came from the file
+        """
+        if self.loaded_from_file:
+            threading.Thread(
+                target=self.validate, name="schema-snapshot", daemon=True
+            ).start()
+
+    def status(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "created_at": self.created_at,
+            "loaded_from_file": self.loaded_from_file,
+            "stale": self.stale,
+            "last_validated_at": self.last_validated_at,
+            "last_error": self.last_error,
+        }
+
+    def _read(self) -> Optional[dict]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            logger.warning("Ignoring unreadable schema snapshot %s: %r", self.path, e)
+            return None
+
+        if snapshot.get("url") != self.url or not set(
+            snapshot.get("table_names", ())
+        ).issuperset(self.table_names):
+            return None
+        return snapshot
+
+    def _write(self, metadata: MetaData, version: str, created_at: datetime):
+        if not self.path:
+            return
+        snapshot = {
+            "url": self.url,
+            "table_names": self.all_table_names,
+            "version": version,
+            "created_at": created_at,
+            "metadata": metadata,
+        }
+        # Write then rename, so that concurrent workers never read a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write schema snapshot %s: %r", self.path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class SchemaCache:
+    """
+    Reflected tables and their catalog information (columns, primary key,
+    foreign keys), served from memory.
+
+    At most every `check_seconds` an access starts a background thread
+    comparing the schema version with the live catalog (`check_version`);
+    if it changed, everything is dropped and reflected again on demand. A
+    negative `check_seconds` disables the check.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine of the database.
+    metadata : MetaData
+        Already reflected tables, e.g. from a SchemaSnapshot.
+    version : str
+        Schema version `metadata` was reflected at.
+    table_names : List[str]
+        Tables whose definition makes up the schema version.
+    check_seconds : float
+        Minimum interval between two schema version checks.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        metadata: MetaData,
+        version: str,
+        table_names: List[str],
+        check_seconds: float,
+    ):
+        self.engine = engine
+        self.metadata = metadata
+        self.version = version
+        self.table_names = list(table_names)
+        self.check_seconds = check_seconds
+        self._checked_at = time.monotonic()
+        self._descriptions: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+
+    def table(self, table_name: str) -> Table:
+        """
+        The Table `table_name`, reflected on first use only
+        """
+        self._check_version()
+        metadata = self.metadata
+        table = metadata.tables.get(table_name)
+        if table is None:
+            with self._lock:
+                table = Table(table_name, metadata, autoload_with=self.engine)
+        return table
+
+    def describe(self, table_name: str) -> dict:
+        """
+        Columns, primary key and foreign keys of `table_name` as returned by
+        the SQLAlchemy inspector, queried from the catalog on first use only
+        """
+        self._check_version()
+        description = self._descriptions.get(table_name)
+        if description is None:
+            inspector = inspect(self.engine)
+            description = {
+                "columns": inspector.get_columns(table_name),
+                "primary_key": inspector.get_pk_constraint(table_name)[
+                    "constrained_columns"
+                ],
+                "foreign_key": inspector.get_foreign_keys(table_name),
+            }
+            self._descriptions[table_name] = description
+        return description
+
+    def invalidate(self):
+        """
+        Drop every cached table and description
+        """
+        self.metadata = MetaData()
+        self._descriptions = {}
+
+    def check_version(self) -> bool:
+        """
+        Compare the schema version with the live catalog and drop the cache
+        if it changed. Return True if it changed
+        """
+        with self.engine.connect() as conn:
+            version = schema_version(conn, self.table_names)
+        if version == self.version:
+            return False
+        logger.info("Schema version changed, dropping cached schema")
+        with self._lock:
+            self.invalidate()
+            self.version = version
+        return True
+
+    def _check_version(self):
+        if self.check_seconds < 0:
+            return
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return
+        # One thread checks, off the request path; requests keep using the
+        # cache meanwhile
+        if not self._check_lock.acquire(blocking=False):
+            return
+        self._checked_at = time.monotonic()
+        threading.Thread(
+            target=self._check_and_release, name="schema-version", daemon=True
+        ).start()
+
+    def _check_and_release(self):
+        try:
+            self.check_version()
+        except Exception as e:
+            logger.warning("Could not check schema version: %r", e)
+        finally:
+            self._check_lock.release()
@@ -1,14 +1,58 @@
 from typing import Generator
 
 from core.config import settings
+from db.instrumentation import instrument
+from db.pool import MonitoredQueuePool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+def is_memory_sqlite(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    """
+    Keyword arguments of create_engine for `url`, taken from the DB_POOL_*
+    and pyodbc settings.
+
+    An in-memory SQLite database lives and dies with its connection: every
+    thread shares a single connection to it instead of a pool
+    """
+    if is_memory_sqlite(url):
+        return dict(poolclass=StaticPool, connect_args={"check_same_thread": False})
+    options = dict(
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if url.startswith("mssql+pyodbc"):
+        options["fast_executemany"] = settings.DB_FAST_EXECUTEMANY
+        if settings.DB_CONNECT_TIMEOUT is not None:
+            options["connect_args"] = {"timeout": settings.DB_CONNECT_TIMEOUT}
+    return options
+
 
 USERNAME_SQLALCHEMY_DATABASE_URL = settings.USERNAME_DB_URL
-userdb_engine = create_engine(USERNAME_SQLALCHEMY_DATABASE_URL)
+userdb_engine = create_engine(
+    USERNAME_SQLALCHEMY_DATABASE_URL, **engine_options(USERNAME_SQLALCHEMY_DATABASE_URL)
+)
 
 KNOWLEDGE_SQLALCHEMY_DATABASE_URL = settings.KNOWLEDGE_DB_URL
-knowledgebase_engine = create_engine(KNOWLEDGE_SQLALCHEMY_DATABASE_URL)
+knowledgebase_engine = create_engine(
+    KNOWLEDGE_SQLALCHEMY_DATABASE_URL,
+    **engine_options(KNOWLEDGE_SQLALCHEMY_DATABASE_URL),
+)
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument(userdb_engine)
+    instrument(knowledgebase_engine)
 
 
 UserdbSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=userdb_engine)
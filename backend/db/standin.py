@@ -0,0 +1,308 @@
+"""
+Local SQLite stand-in for the knowledge-base database: the CID_LCIN tables
+with the columns the repository uses, filled with generated glossary data.
+
+    python -m db.standin standin.sqlite --concepts 20000 --migrate
+
+then point the app at it with KNOWLEDGE_DB_URL=sqlite:///standin.sqlite.
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from db.models.table import TableName
+from sqlalchemy import (Column, DateTime, Integer, MetaData, Table, Unicode,
+                        create_engine, insert)
+from sqlalchemy.engine import Engine
+
+metadata = MetaData()
+
+# Rows per INSERT statement
+CHUNK_SIZE = 10000
+
+VN_SYLLABLES = [
+    "bệnh", "viêm", "đau", "phổi", "gan", "thận", "tim", "mạch", "nhiễm",
+    "trùng", "ung", "thư", "sốt", "ho", "khó", "thở", "xuất", "huyết", "rối",
+    "loạn", "nhịp", "suy", "giãn", "tắc", "nghẽn", "cấp", "mạn", "tính",
+    "dạ", "dày", "ruột", "não", "tủy", "xương", "khớp", "da", "mắt", "tai",
+]  # fmt: skip
+EN_WORDS = [
+    "disease", "syndrome", "disorder", "acute", "chronic", "infection",
+    "inflammation", "lung", "liver", "kidney", "heart", "failure", "pain",
+    "fever", "cancer", "of", "the", "primary", "secondary", "bleeding",
+    "obstruction", "congenital", "bone", "joint", "skin", "eye", "ear",
+]  # fmt: skip
+
+
+def _text(length: int) -> Unicode:
+    """
+    Text compared case-insensitively, like under the live database's *_CI_AS
+    collation (SQLite only folds ASCII letters)
+    """
+    return Unicode(length, collation="NOCASE")
+
+
+def _audit_columns():
+    return [
+        Column("Insert_User", Integer),
+        Column("Insert_Date", DateTime),
+        Column("Update_User", Integer),
+        Column("Update_Date", DateTime),
+    ]
+
+
+dictionary = Table(
+    TableName.TRANSLATION.value,
+    metadata,
+    Column("ID", Integer, primary_key=True),
+    Column("VN_main", _text(200)),
+    Column("EN_main", _text(200)),
+    *_audit_columns(),
+)
+vn_synonym = Table(
+    TableName.VN_SYNONYM.value,
+    metadata,
+    Column("ID", Integer, primary_key=True),
+    Column("VN_synonym", _text(200)),
+    Column("VN_main", _text(200)),
+    *_audit_columns(),
+)
+en_do = Table(
+    TableName.EN_DO.value,
+    metadata,
+    Column("DO_ID", _text(50), primary_key=True),
+    Column("EN_main", _text(200)),
+    *_audit_columns(),
+)
+en_umls = Table(
+    TableName.EN_UMLS.value,
+    metadata,
+    Column("CUI", _text(50), primary_key=True),
+    Column("EN_main", _text(200)),
+    *_audit_columns(),
+)
+do_synonym = Table(
+    TableName.DO_SYNONYM.value,
+    metadata,
+    Column("ID", Integer, primary_key=True),
+    Column("DO_ID", _text(50)),
+    Column("EN_synonym", _text(200)),
+    *_audit_columns(),
+)
+umls_synonym = Table(
+    TableName.UMLS_SYNONYM.value,
+    metadata,
+    Column("ID", Integer, primary_key=True),
+    Column("CUI", _text(50)),
+    Column("EN_synonym", _text(200)),
+    *_audit_columns(),
+)
+editor = Table(
+    TableName.EDITOR.value,
+    metadata,
+    Column("User_Id", Integer, primary_key=True),
+    Column("User_Name", Unicode(100)),
+)
+
+
+class _Activity:
+    """
+    Who edits when: editors weighted by a Zipf law (a few editors do most of
+    the work), work days ten times busier than weekends, office hours, and
+    an editing pace growing over the period. Updates follow inserts after
+    an exponentially distributed delay; some rows are never updated.
+    """
+
+    def __init__(self, rng: random.Random, n_editors: int, days: int, end: datetime):
+        self.rng = rng
+        self.start = end - timedelta(days=days)
+        self.end = end
+        self.editors = list(range(1, n_editors + 1))
+        self.editor_weights = list(
+            itertools.accumulate(1 / rank**1.1 for rank in self.editors)
+        )
+        day_weights = []
+        for offset in range(days):
+            day = self.start + timedelta(days=offset)
+            weekend = day.weekday() >= 5
+            day_weights.append((0.1 if weekend else 1.0) * (1 + offset / days))
+        self.day_weights = list(itertools.accumulate(day_weights))
+
+    def editor(self) -> int:
+        return self.rng.choices(self.editors, cum_weights=self.editor_weights)[0]
+
+    def moment(self) -> datetime:
+        total = self.day_weights[-1]
+        offset = bisect.bisect(self.day_weights, self.rng.random() * total)
+        hour = min(max(self.rng.gauss(13, 3), 6), 22)
+        return self.start + timedelta(days=offset, hours=hour)
+
+    def audit(self) -> Dict:
+        inserted = self.moment()
+        insert_user = self.editor()
+        if self.rng.random() < 0.3:
+            updated, update_user = inserted, insert_user
+        else:
+            delay = timedelta(days=self.rng.expovariate(1 / 10))
+            updated = min(inserted + delay, self.end)
+            update_user = insert_user if self.rng.random() < 0.6 else self.editor()
+        return {
+            "Insert_User": insert_user,
+            "Insert_Date": inserted,
+            "Update_User": update_user,
+            "Update_Date": updated,
+        }
+
+
+def _geometric(rng: random.Random, mean: float, maximum: int) -> int:
+    """
+    Number of synonyms: geometric with the given mean, at most `maximum`
+    """
+    p = 1 / (1 + mean)
+    return min(int(math.log(1 - rng.random()) / math.log(1 - p)), maximum)
+
+
+def _term(rng: random.Random, words: List[str], i: int) -> str:
+    return " ".join(rng.choices(words, k=rng.randint(1, 4))) + f" {i}"
+
+
+def _variant(rng: random.Random, term: str, ratio: float = 0.1) -> str:
+    """
+    `term`, or in `ratio` of the calls the same term with its ASCII letters
+    upper-cased, as the collation still matches it
+    """
+    if rng.random() >= ratio:
+        return term
+    return "".join(c.upper() if c.isascii() else c for c in term)
+
+
+def generate_rows(
+    n_concepts: int = 200,
+    n_editors: int = 4,
+    days: int = 60,
+    seed: int = 0,
+    end: datetime = datetime(2023, 3, 1),
+) -> Dict[Table, List[Dict]]:
+    """
+    Rows of every stand-in table for `n_concepts` dictionary entries and
+    their synonyms, edited by `n_editors` over the `days` days before `end`.
+
+    About 55% of the concepts are charted to DO and 40% to UMLS,
+    independently, so that the validation statistics have charted,
+    uncharted and doubly charted terms. Concepts have 0 to 6 Vietnamese
+    synonyms (1.5 on average) and 0 to 8 synonyms per source (2 on average).
+    A tenth of the references to a main term spell it in another case.
+    """
+    rng = random.Random(seed)
+    activity = _Activity(rng, n_editors, days, end)
+
+    rows: Dict[Table, List[Dict]] = {table: [] for table in metadata.sorted_tables}
+    rows[editor] = [
+        {"User_Id": i, "User_Name": f"editor{i}"} for i in range(1, n_editors + 1)
+    ]
+    for i in range(n_concepts):
+        vn_main, en_main = _term(rng, VN_SYLLABLES, i), _term(rng, EN_WORDS, i)
+        rows[dictionary].append(
+            {"ID": i, "VN_main": vn_main, "EN_main": en_main, **activity.audit()}
+        )
+        for j in range(_geometric(rng, 1.5, 6)):
+            rows[vn_synonym].append(
+                {
+                    "VN_synonym": _term(rng, VN_SYLLABLES, i) + f"-{j}",
+                    "VN_main": _variant(rng, vn_main),
+                    **activity.audit(),
+                }
+            )
+
+        sources = [
+            (0.55, en_do, do_synonym, "DO_ID", f"DOID:{i}"),
+            (0.40, en_umls, umls_synonym, "CUI", f"C{i:07d}"),
+        ]
+        for ratio, source, source_synonym, key, source_id in sources:
+            if rng.random() >= ratio:
+                continue
+            rows[source].append(
+                {key: source_id, "EN_main": _variant(rng, en_main), **activity.audit()}
+            )
+            for j in range(_geometric(rng, 2, 8)):
+                rows[source_synonym].append(
+                    {
+                        key: source_id,
+                        "EN_synonym": _term(rng, EN_WORDS, i) + f"-{j}",
+                        **activity.audit(),
+                    }
+                )
+    return rows
+
+
+def create_standin(
+    engine: Engine,
+    n_concepts: int = 200,
+    n_editors: int = 4,
+    days: int = 60,
+    seed: int = 0,
+):
+    """
+    (Re)create the stand-in tables on `engine` and fill them with
+    `generate_rows`
+    """
+    rows = generate_rows(n_concepts, n_editors, days, seed)
+
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table, table_rows in rows.items():
+            for start in range(0, len(table_rows), CHUNK_SIZE):
+                conn.execute(insert(table), table_rows[start : start + CHUNK_SIZE])
+
+
+def prepare_standin(path: str, migrate: bool = True, **scale):
+    """
+    Create the stand-in at `path`, apply the knowledge-base migrations and
+    point the application at it. Must run before db.repository is imported.
+    `scale` is passed to `create_standin`
+    """
+    os.environ["KNOWLEDGE_DB_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("USERNAME_DB_URL", "sqlite://")
+    os.environ["SCHEMA_SNAPSHOT_PATH"] = ""
+
+    # Start from an empty file: a leftover alembic version table would skip
+    # the migrations
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    create_standin(engine, **scale)
+    if migrate:
+        from alembic import command
+        from alembic.config import Config
+
+        command.upgrade(Config("alembic.ini", ini_section="knowledgebase"), "head")
+    # Give the planner the statistics a live database keeps up to date
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", help="SQLite file to (re)create")
+    parser.add_argument("--concepts", type=int, default=200)
+    parser.add_argument("--editors", type=int, default=4)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--migrate", action="store_true", help="apply the knowledge-base migrations"
+    )
+    args = parser.parse_args()
+    scale = dict(
+        n_concepts=args.concepts, n_editors=args.editors, days=args.days, seed=args.seed
+    )
+    if args.migrate:
+        prepare_standin(args.path, **scale)
+    else:
+        create_standin(create_engine(f"sqlite:///{args.path}"), **scale)
@@ -3,8 +3,14 @@ from fastapi.staticfiles import StaticFiles
 
 from apis.base import api_router
 from apps.base import app_router
+from apps.v1.route_login import request_superuser
+from core.charts import chart_renderer
 from core.config import settings
+from core.http_cache import response_cache
+from core.profiler import ProfilerMiddleware, profile_store
+from core.request_metrics import RequestMetricsMiddleware
 from db.base import Base
+from db.repository import view
 from db.session import userdb_engine
 
 
@@ -21,11 +27,46 @@ def configure_staticfiles(app):
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+def configure_middleware(app):
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        app.add_middleware(
+            RequestMetricsMiddleware, repeat_threshold=settings.SQL_REPEAT_THRESHOLD
+        )
+    if settings.PROFILER_ENABLED:
+        app.add_middleware(
+            ProfilerMiddleware,
+            authorize=request_superuser,
+            store=profile_store,
+            interval=settings.PROFILER_INTERVAL_MS / 1000,
+        )
+
+
+def configure_background_tasks(app):
+    @app.on_event("startup")
+    def start_background_tasks():
+        view.schema_snapshot.validate_in_background()
+        view.suggestions.start()
+        if settings.CONCEPT_INDEX_ENABLED:
+            view.concept_index.start()
+        if settings.CHANGE_FEED_ENABLED:
+            view.change_feed.subscribe(response_cache.invalidate)
+            view.change_feed.start()
+
+    @app.on_event("shutdown")
+    def stop_background_tasks():
+        view.concept_index.stop()
+        view.suggestions.stop()
+        view.change_feed.stop()
+        chart_renderer.shutdown()
+
+
 def start_application():
     app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
     create_tables()
     include_router(app)
     configure_staticfiles(app)
+    configure_middleware(app)
+    configure_background_tasks(app)
     return app
 
 
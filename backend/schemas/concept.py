@@ -0,0 +1,14 @@
+from typing import List
+
+from core.config import settings
+from pydantic import BaseModel, Field
+
+
+class TermBatch(BaseModel):
+    """
+    The Request model for batch concept lookups
+    """
+
+    terms: List[str] = Field(
+        ..., min_items=1, max_items=settings.CONCEPT_BATCH_MAX_TERMS
+    )
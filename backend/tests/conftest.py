@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when the application is first imported: point it at a
+# generated stand-in of the knowledge base before any test module does.
+# Paths in alembic.ini and main.py are relative: run pytest from backend/
+TMP_DIR = tempfile.mkdtemp(prefix="cfdb-tests-")
+os.environ.update(
+    TIMEOUT="30",
+    SECRET_KEY="test-secret",
+    # Cheap hashes; test_hashing checks that the setting is honoured
+    BCRYPT_ROUNDS="4",
+    FAMILY="admin|editor",
+    USERNAME_DB_URL=f"sqlite:///{os.path.join(TMP_DIR, 'users.sqlite')}",
+    CHANGE_FEED_ENABLED="0",
+    CHANGE_FEED_PATH=os.path.join(TMP_DIR, "change_feed.sqlite"),
+    CONCEPT_INDEX_ENABLED="0",
+    PROFILE_DIR=os.path.join(TMP_DIR, "profiles"),
+)
+
+from db.standin import prepare_standin  # noqa: E402
+
+prepare_standin(os.path.join(TMP_DIR, "knowledgebase.sqlite"), n_concepts=300)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def superuser_client(client):
+    from tests.utils.user import login
+
+    return login(client, "admin@example.com", is_superuser=True)
+
+
+@pytest.fixture
+def user_client(client):
+    from tests.utils.user import login
+
+    return login(client, "editor@example.com")
+
+
+@pytest.fixture(scope="session")
+def concept_index():
+    from db.repository import view
+    from db.repository.concept_index import ConceptIndex
+
+    return ConceptIndex.build(
+        view.engine,
+        view.dictionary_table,
+        view.vn_synonym_table,
+        view.en_vsrc_tables,
+        view.en_vsrc_synonym_tables,
+    )
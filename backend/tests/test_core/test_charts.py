@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+
+from core.charts import ChartRenderer
+
+
+def make_charts(renderer: ChartRenderer, table_name: str, n: int) -> list:
+    """
+    `n` chart files of `table_name`, oldest first
+    """
+    os.makedirs(renderer.directory, exist_ok=True)
+    now = time.time()
+    paths = []
+    for i in range(n):
+        path = renderer.path(table_name, f"key{i}")
+        with open(path, "wb"):
+            pass
+        os.utime(path, (now - 100 + i, now - 100 + i))
+        paths.append(path)
+    return paths
+
+
+def test_prune_keeps_the_most_recent_charts(tmp_path):
+    renderer = ChartRenderer(str(tmp_path), workers=1, keep=2)
+    paths = make_charts(renderer, "T", 5)
+    other = make_charts(renderer, "U", 1)
+
+    renderer.prune("T")
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(path) for path in paths[-2:] + other
+    )
+
+
+def test_prune_keeps_the_chart_served_by_this_worker(tmp_path):
+    renderer = ChartRenderer(str(tmp_path), workers=1, keep=2)
+    paths = make_charts(renderer, "T", 5)
+    renderer.current["T"] = paths[0]
+
+    renderer.prune("T")
+    assert all(os.path.exists(path) for path in [paths[0], *paths[-2:]])
+    assert not any(os.path.exists(path) for path in paths[1:-2])
+
+
+def test_serving_a_chart_marks_it_recent(tmp_path):
+    renderer = ChartRenderer(str(tmp_path), workers=1, keep=2)
+    paths = make_charts(renderer, "T", 3)
+
+    path = asyncio.run(renderer.activity_chart({}, "T", "key0"))
+    assert path == paths[0]
+    assert renderer.current["T"] == path
+    # Served from disk, without starting the process pool
+    assert renderer._executor is None and renderer.renders == 0
+
+    renderer.prune("T")
+    assert os.path.exists(paths[0]) and not os.path.exists(paths[1])
+
+
+def test_cancelled_render_is_forgotten(tmp_path):
+    renderer = ChartRenderer(str(tmp_path), workers=1, keep=2)
+    path = renderer.path("T", "key0")
+
+    async def cancel():
+        future = asyncio.get_running_loop().create_future()
+        renderer._rendering[path] = future
+        future.cancel()
+        renderer._rendered(future, path, "T")
+
+    asyncio.run(cancel())
+    assert path not in renderer._rendering
+    assert renderer.renders == 0
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+from core import hashing
+from core.config import settings
+from core.hashing import Hasher, make_context
+
+PASSWORD = "supersecret1234"
+
+
+def rounds(hashed: str) -> int:
+    # "$2b$<rounds>$<salt and checksum>"
+    return int(hashed.split("$")[2])
+
+
+def test_hashes_use_bcrypt_rounds():
+    assert settings.BCRYPT_ROUNDS == 4
+    assert rounds(Hasher.get_password_hash(PASSWORD)) == settings.BCRYPT_ROUNDS
+    assert rounds(make_context(5).hash(PASSWORD)) == 5
+
+
+def test_context_is_shared(monkeypatch):
+    def no_new_context(*args, **kwargs):
+        raise AssertionError("CryptContext built per call")
+
+    monkeypatch.setattr(hashing, "CryptContext", no_new_context)
+    hashed = Hasher.get_password_hash(PASSWORD)
+    assert Hasher.verify_password(PASSWORD, hashed)
+
+
+@pytest.mark.parametrize("password, expected", [(PASSWORD, True), ("wrong", False)])
+def test_async_verify_agrees_with_sync(password, expected):
+    hashed = asyncio.run(Hasher.get_password_hash_async(PASSWORD))
+    assert rounds(hashed) == settings.BCRYPT_ROUNDS
+    assert Hasher.verify_password(password, hashed) is expected
+    assert asyncio.run(Hasher.verify_password_async(password, hashed)) is expected
+
+
+def test_async_hashing_runs_in_the_bcrypt_pool(monkeypatch):
+    threads = []
+
+    class Context:
+        def hash(self, password):
+            threads.append(threading.current_thread().name)
+            return "hashed"
+
+        def verify(self, password, hashed):
+            threads.append(threading.current_thread().name)
+            return True
+
+    monkeypatch.setattr(hashing, "pwd_context", Context())
+
+    async def login():
+        hashed = await Hasher.get_password_hash_async(PASSWORD)
+        return await Hasher.verify_password_async(PASSWORD, hashed)
+
+    assert asyncio.run(login())
+    assert len(threads) == 2
+    assert all(name.startswith("bcrypt") for name in threads)
@@ -0,0 +1,33 @@
+import pytest
+from core.profiler import profile_requested
+
+
+def scope(query_string: bytes = b"", headers=()) -> dict:
+    return {"type": "http", "query_string": query_string, "headers": list(headers)}
+
+
+@pytest.mark.parametrize(
+    "query_string", [b"profile=1", b"limit=5&profile=1", b"profile=1&cursor=x"]
+)
+def test_profile_parameter(query_string):
+    assert profile_requested(scope(query_string))
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        b"",
+        b"profile=0",
+        b"profile=10",
+        b"noprofile=1",
+        b"q=profile=1",
+        b"q=profile%3D1",
+    ],
+)
+def test_other_parameters(query_string):
+    assert not profile_requested(scope(query_string))
+
+
+def test_profile_header():
+    assert profile_requested(scope(headers=[(b"x-profile", b"1")]))
+    assert not profile_requested(scope(headers=[(b"x-profile", b"0")]))
@@ -0,0 +1,125 @@
+import logging
+import re
+
+import pytest
+from core import request_metrics
+from core.request_metrics import RequestMetricsMiddleware
+from db.executor import run_db
+from db.instrumentation import QueryStats, statement_shape
+from db.repository import view
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+ROUTE = "/summary/editor/update_count"
+SERVER_TIMING = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<statements>\d+) statements, '
+    r'(?P<rows>\d+) rows", db-slowest;dur=[\d.]+, total;dur=(?P<total>[\d.]+)'
+)
+
+
+@pytest.fixture
+def view_statements():
+    """
+    Statements run on the knowledge base
+    """
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(view.engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(view.engine, "before_cursor_execute", count)
+
+
+def observations(histogram, *label_values) -> int:
+    entry = histogram._values.get(label_values)
+    return entry[2] if entry else 0
+
+
+def test_statement_shape_ignores_values():
+    assert statement_shape("SELECT * FROM t WHERE a = 1 AND b = 'x'") == (
+        statement_shape("SELECT *  FROM t WHERE a = 22 AND b = 'it''s'")
+    )
+    assert statement_shape("SELECT 1 FROM t WHERE id IN (?, ?)") == (
+        "SELECT ? FROM t WHERE id IN (?)"
+    )
+
+
+def test_repeated_statements():
+    stats = QueryStats()
+    for i in range(4):
+        stats.add_statement(f"SELECT name FROM t WHERE id = {i}", 0.001)
+    stats.add_statement("SELECT count(*) FROM t", 0.002)
+
+    assert stats.statements == 5 and stats.slowest_seconds == 0.002
+    assert stats.repeated(3) == [("SELECT name FROM t WHERE id = ?", 4)]
+    assert stats.repeated(4) == []
+
+
+def test_server_timing_header(user_client, view_statements):
+    response = user_client.get(ROUTE)
+    assert response.status_code == 200
+
+    timing = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+    assert timing is not None
+    # The header also counts the user database lookups of the login check
+    assert int(timing["statements"]) >= len(view_statements) > 0
+    assert int(timing["rows"]) > 0
+    assert 0 < float(timing["db"]) <= float(timing["total"])
+
+
+def test_request_is_recorded(user_client):
+    before = (
+        request_metrics.requests_total._values.get(("GET", ROUTE, "200"), 0),
+        observations(request_metrics.request_seconds, "GET", ROUTE),
+        observations(request_metrics.db_statements, ROUTE),
+        observations(request_metrics.db_rows, ROUTE),
+    )
+    user_client.get(ROUTE)
+    after = (
+        request_metrics.requests_total._values.get(("GET", ROUTE, "200"), 0),
+        observations(request_metrics.request_seconds, "GET", ROUTE),
+        observations(request_metrics.db_statements, ROUTE),
+        observations(request_metrics.db_rows, ROUTE),
+    )
+    assert [a - b for a, b in zip(after, before)] == [1, 1, 1, 1]
+    # Labelled by the route template, not the URL
+    assert ROUTE in "\n".join(request_metrics.db_statements.samples())
+
+
+@pytest.fixture
+def n_plus_one_client():
+    """
+    An application whose one route looks rows up one at a time
+    """
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, repeat_threshold=3)
+
+    def lookup(n: int):
+        with view.engine.connect() as conn:
+            for i in range(n):
+                conn.execute(text(f"SELECT {i} + 1")).scalar()
+
+    @app.get("/lookup/{n}")
+    async def lookup_route(n: int):
+        await run_db(lookup, n)
+        return {}
+
+    return TestClient(app)
+
+
+def test_repeated_statement_is_reported(n_plus_one_client, caplog):
+    route = "/lookup/{n}"
+    before = request_metrics.repeated_statements._values.get((route,), 0)
+
+    with caplog.at_level(logging.WARNING, logger=request_metrics.__name__):
+        n_plus_one_client.get("/lookup/3")
+        assert not caplog.records
+        n_plus_one_client.get("/lookup/5")
+
+    assert request_metrics.repeated_statements._values[(route,)] == before + 1
+    (record,) = caplog.records
+    assert "ran the same statement 5 times" in record.getMessage()
+    assert "SELECT ? + ?" in record.getMessage()
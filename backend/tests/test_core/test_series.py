@@ -0,0 +1,97 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from core.series import activity_series, date_bins
+from db.models.table import Resolution
+
+
+def bin_label(day: date, resolution: Resolution) -> str:
+    if resolution == Resolution.MONTH:
+        return day.strftime("%Y-%m")
+    if resolution == Resolution.WEEK:
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+
+def reference_series(rows, from_date, to_date, resolution):
+    """
+    activity_series spelled out with dicts, one row at a time
+    """
+    labels = []
+    day = from_date
+    while day <= to_date:
+        label = bin_label(day, resolution)
+        if label not in labels:
+            labels.append(label)
+        day += timedelta(days=1)
+
+    series = {}
+    for editor_id, day, count in rows:
+        activity = series.setdefault(editor_id, dict.fromkeys(labels, 0))
+        # Whole weeks and months are counted, even past the range
+        label = bin_label(day, resolution)
+        if label in activity:
+            activity[label] += count
+    return {
+        editor_id: {"dates": tuple(labels), "activity": tuple(activity.values())}
+        for editor_id, activity in series.items()
+    }
+
+
+@pytest.mark.parametrize("resolution", list(Resolution))
+def test_bins_cover_the_range(resolution):
+    from_date, to_date = date(2023, 1, 30), date(2023, 3, 2)
+    labels, edges = date_bins(from_date, to_date, resolution)
+
+    assert len(edges) == len(labels) + 1
+    assert edges[0] <= from_date < edges[1]
+    assert edges[-2] <= to_date < edges[-1]
+    assert list(labels) == sorted(set(labels))
+
+
+def test_day_bins():
+    labels, _ = date_bins(date(2023, 2, 27), date(2023, 3, 1))
+    assert labels == ("2023-02-27", "2023-02-28", "2023-03-01")
+
+
+def test_week_bins_start_on_monday():
+    # 2023-03-01 is a Wednesday
+    labels, edges = date_bins(date(2023, 3, 1), date(2023, 3, 13), Resolution.WEEK)
+    assert labels == ("2023-02-27", "2023-03-06", "2023-03-13")
+    assert str(edges[-1]) == "2023-03-20"
+
+
+def test_month_bins():
+    labels, edges = date_bins(date(2022, 12, 31), date(2023, 2, 1), Resolution.MONTH)
+    assert labels == ("2022-12", "2023-01", "2023-02")
+    assert str(edges[0]) == "2022-12-01" and str(edges[-1]) == "2023-03-01"
+
+
+@pytest.mark.parametrize("resolution", list(Resolution))
+def test_series_match_reference(resolution):
+    rng = random.Random(0)
+    from_date, to_date = date(2023, 1, 3), date(2023, 4, 20)
+    rows = [
+        (
+            rng.randint(1, 5),
+            from_date + timedelta(days=rng.randint(-10, 120)),
+            rng.randint(1, 9),
+        )
+        for _ in range(500)
+    ]
+    assert activity_series(rows, from_date, to_date, resolution) == reference_series(
+        rows, from_date, to_date, resolution
+    )
+
+
+def test_series_accept_datetimes():
+    rows = [(1, datetime(2023, 1, 2, 15, 30), 4), (1, date(2023, 1, 2), 1)]
+    series = activity_series(rows, date(2023, 1, 1), date(2023, 1, 3))
+    assert series == {
+        1: {"dates": ("2023-01-01", "2023-01-02", "2023-01-03"), "activity": (0, 5, 0)}
+    }
+
+
+def test_no_rows_no_series():
+    assert activity_series([], date(2023, 1, 1), date(2023, 1, 3)) == {}
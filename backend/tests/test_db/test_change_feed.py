@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import pytest
+from db.change_feed import ChangeFeed
+from db.repository import view
+
+
+def token(day: int):
+    return (datetime(2023, 3, day), datetime(2023, 3, day), None)
+
+
+class Tables:
+    """
+    Change tokens of a pretend knowledge base, as `fetch_tokens` returns them
+    """
+
+    def __init__(self):
+        self.tokens = {"A": token(1), "B": token(1)}
+        self.fetches = 0
+
+    def __call__(self):
+        self.fetches += 1
+        return dict(self.tokens)
+
+
+@pytest.fixture
+def tables():
+    return Tables()
+
+
+@pytest.fixture
+def make_feed(tmp_path, tables):
+    """
+    Workers sharing a feed file, each with its connection and the events
+    passed to its subscriber
+    """
+
+    def make_feed(lease_seconds: float = 10):
+        feed = ChangeFeed(
+            str(tmp_path / "change_feed.sqlite"),
+            tables,
+            poll_seconds=1,
+            lease_seconds=lease_seconds,
+        )
+        feed.events = []
+        feed.subscribe(lambda table_name, token: feed.events.append(table_name))
+        feed.conn = feed.connect()
+        feed.catch_up(feed.conn)
+        return feed
+
+    return make_feed
+
+
+def test_one_worker_holds_the_lease(make_feed, tables):
+    first, second = make_feed(), make_feed()
+    first.poll(first.conn)
+    second.poll(second.conn)
+    first.poll(first.conn)
+    assert first.is_leader and not second.is_leader
+    # Only the leader reads the knowledge base
+    assert tables.fetches == 2
+
+
+def test_expired_lease_is_taken_over(make_feed):
+    first, second = make_feed(lease_seconds=10), make_feed(lease_seconds=10)
+    first.poll(first.conn)
+    first.conn.execute("UPDATE lease SET expires_at = 0")
+    second.poll(second.conn)
+    assert second.is_leader
+    first.poll(first.conn)
+    assert not first.is_leader
+
+
+def test_changes_reach_every_worker(make_feed, tables):
+    leader, worker = make_feed(), make_feed()
+    leader.poll(leader.conn)
+    worker.poll(worker.conn)
+    assert sorted(worker.events) == ["A", "B"]
+
+    tables.tokens["B"] = token(2)
+    leader.poll(leader.conn)
+    leader.poll(leader.conn)
+    worker.poll(worker.conn)
+    assert sorted(worker.events) == ["A", "B", "B"]
+    assert worker.tokens == tables.tokens
+
+
+def test_catch_up_starts_from_the_watermarks(make_feed, tables):
+    leader = make_feed()
+    leader.poll(leader.conn)
+    tables.tokens["A"] = token(2)
+    leader.poll(leader.conn)
+
+    late = make_feed()
+    assert late.tokens == tables.tokens
+    late.poll(late.conn)
+    # Past events are not replayed
+    assert late.events == []
+
+    tables.tokens["A"] = token(3)
+    leader.poll(leader.conn)
+    late.poll(late.conn)
+    assert late.events == ["A"]
+    assert late.tokens["A"] == token(3)
+
+
+def test_old_events_are_dropped(tmp_path, tables):
+    feed = ChangeFeed(
+        str(tmp_path / "change_feed.sqlite"),
+        tables,
+        poll_seconds=1,
+        lease_seconds=10,
+        keep_events=3,
+    )
+    conn = feed.connect()
+    for day in range(1, 6):
+        tables.tokens["A"] = token(day)
+        feed.poll(conn)
+    n_events = conn.execute("SELECT COUNT(*) FROM event").fetchone()[0]
+    assert n_events == 3
+    assert feed.tokens["A"] == token(5)
+
+
+def test_leader_polls_the_change_tokens():
+    # Index seeks and catalog lookups only, see test_change_tokens
+    assert view.change_feed.fetch_tokens == view.change_tokens.fetch
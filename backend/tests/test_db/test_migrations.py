@@ -0,0 +1,12 @@
+from alembic import command
+from alembic.config import Config
+
+
+def test_knowledgebase_migrations_render_offline(capsys):
+    # `alembic --name knowledgebase upgrade head --sql`: no database to inspect
+    command.upgrade(
+        Config("alembic.ini", ini_section="knowledgebase"), "head", sql=True
+    )
+    sql = capsys.readouterr().out
+    assert 'CREATE INDEX "ix_CID_LCIN_EN_DO_EN_main"' in sql
+    assert 'CREATE INDEX "ix_CID_LCIN_EN_UMLS_SYNONYM_CUI"' in sql
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+from db.plan_check import (SHOWPLAN_NS, check_scans, lookup_checks, run_checks,
+                           showplan_scans)
+from db.repository import view
+
+NS = SHOWPLAN_NS.strip("{}")
+
+
+def showplan(*operators) -> str:
+    """
+    A minimal SHOWPLAN_XML document with one RelOp per (PhysicalOp, table)
+    """
+    rel_ops = "".join(
+        f'<RelOp PhysicalOp="{op}"><IndexScan>'
+        f'<Object Database="[cfdb]" Schema="[dbo]" Table="[{table}]"/>'
+        "</IndexScan></RelOp>"
+        for op, table in operators
+    )
+    return (
+        f'<ShowPlanXML xmlns="{NS}"><BatchSequence><Batch><Statements>'
+        f"<StmtSimple><QueryPlan>{rel_ops}</QueryPlan></StmtSimple>"
+        "</Statements></Batch></BatchSequence></ShowPlanXML>"
+    )
+
+
+def test_showplan_scans_reports_scan_operators_only():
+    plan = showplan(
+        ("Index Seek", "CID_LCIN_DICTIONARY"),
+        ("Clustered Index Scan", "CID_LCIN_EN_DO"),
+        ("Table Scan", "CID_LCIN_EDITOR"),
+    )
+    assert showplan_scans(plan) == ["CID_LCIN_EN_DO", "CID_LCIN_EDITOR"]
+
+
+# The session stand-in has the knowledge-base migrations applied
+@pytest.mark.parametrize("check", lookup_checks(), ids=lambda check: check.name)
+def test_lookup_seeks(check):
+    n_statements, scans = check_scans(view.engine, check)
+    assert n_statements
+    assert scans == []
+
+
+def test_unsupported_dialect_is_skipped(capsys):
+    engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    assert run_checks(engine, lookup_checks()) is None
+    assert "skipped" in capsys.readouterr().out
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from db import schema
+from db.schema import SchemaCache, SchemaSnapshot, schema_version
+from sqlalchemy import create_engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kb.sqlite'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE terms (id INTEGER PRIMARY KEY, term TEXT)")
+    yield engine
+    engine.dispose()
+
+
+def add_column(engine, table_name: str = "terms"):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN note TEXT")
+
+
+def version(engine) -> str:
+    with engine.connect() as conn:
+        return schema_version(conn, ["terms", "extra"])
+
+
+def test_schema_version_follows_the_definitions(engine):
+    before = version(engine)
+    assert version(engine) == before
+    add_column(engine)
+    altered = version(engine)
+    assert altered != before
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE extra (id INTEGER PRIMARY KEY)")
+    assert version(engine) != altered
+
+
+def test_snapshot_round_trip(engine, tmp_path):
+    path = str(tmp_path / "schema_snapshot.pickle")
+    first = SchemaSnapshot(engine, path, ["terms"], ["extra"])
+    metadata = first.load()
+    assert not first.loaded_from_file
+
+    second = SchemaSnapshot(engine, path, ["terms"], ["extra"])
+    loaded = second.load()
+    assert second.loaded_from_file
+    assert second.version == first.version
+    assert [c.name for c in loaded.tables["terms"].c] == [
+        c.name for c in metadata.tables["terms"].c
+    ]
+    assert second.validate()
+
+
+def test_snapshot_is_rewritten_when_the_schema_changes(engine, tmp_path):
+    path = str(tmp_path / "schema_snapshot.pickle")
+    SchemaSnapshot(engine, path, ["terms"]).load()
+    add_column(engine)
+
+    snapshot = SchemaSnapshot(engine, path, ["terms"])
+    snapshot.load()
+    assert not snapshot.validate()
+    assert snapshot.stale
+
+    fresh = SchemaSnapshot(engine, path, ["terms"])
+    assert "note" in fresh.load().tables["terms"].c
+    assert fresh.validate()
+
+
+def make_cache(engine, check_seconds: float) -> SchemaCache:
+    snapshot = SchemaSnapshot(engine, "", ["terms"])
+    metadata = snapshot.load()
+    return SchemaCache(engine, metadata, snapshot.version, ["terms"], check_seconds)
+
+
+def test_cache_is_dropped_when_the_version_changes(engine):
+    cache = make_cache(engine, check_seconds=-1)
+    assert [c["name"] for c in cache.describe("terms")["columns"]] == ["id", "term"]
+    assert not cache.check_version()
+
+    add_column(engine)
+    assert cache.check_version()
+    assert "note" in cache.table("terms").c
+    assert [c["name"] for c in cache.describe("terms")["columns"]][-1] == "note"
+
+
+def test_version_check_is_off_the_request_path(engine, monkeypatch):
+    cache = make_cache(engine, check_seconds=0)
+    checking, release = threading.Event(), threading.Event()
+
+    def slow_version(conn, table_names):
+        checking.set()
+        release.wait(5)
+        return "new"
+
+    monkeypatch.setattr(schema, "schema_version", slow_version)
+    start = time.perf_counter()
+    cache.table("terms")
+    assert checking.wait(5)
+    # Served from the cache while the check is running
+    assert time.perf_counter() - start < 1
+    cache.describe("terms")
+
+    release.set()
+    with cache._check_lock:
+        assert cache.version == "new"
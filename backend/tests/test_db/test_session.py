@@ -0,0 +1,28 @@
+import threading
+
+from db.pool import MonitoredQueuePool
+from db.session import engine_options
+from sqlalchemy import create_engine
+
+
+def test_file_databases_are_pooled(tmp_path):
+    url = f"sqlite:///{tmp_path / 'users.sqlite'}"
+    assert engine_options(url)["poolclass"] is MonitoredQueuePool
+
+
+def test_memory_database_is_shared_between_threads():
+    engine = create_engine("sqlite://", **engine_options("sqlite://"))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE user (email TEXT)")
+        conn.exec_driver_sql("INSERT INTO user VALUES ('editor@example.com')")
+
+    emails = []
+
+    def read():
+        with engine.connect() as conn:
+            emails.extend(conn.exec_driver_sql("SELECT email FROM user").scalars())
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    assert emails == ["editor@example.com"]
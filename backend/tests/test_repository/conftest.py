@@ -0,0 +1,28 @@
+import pytest
+from db.repository import view
+from tests.utils.concept import ascii_upper, column_values
+
+
+@pytest.fixture(scope="session")
+def vn_terms():
+    """
+    Every VN_main and VN_synonym, some of them in another case, and an
+    unknown term
+    """
+    terms = column_values(
+        view.dictionary_table.c.VN_main, view.vn_synonym_table.c.VN_synonym
+    )
+    return terms + [ascii_upper(term) for term in terms[::7]] + ["không có"]
+
+
+@pytest.fixture(scope="session")
+def en_terms():
+    """
+    Every EN_main and EN_synonym, some of them in another case, and an
+    unknown term
+    """
+    terms = column_values(
+        view.dictionary_table.c.EN_main,
+        *[src_synonym.c.EN_synonym for src_synonym in view.en_vsrc_synonym_tables],
+    )
+    return terms + [term.upper() for term in terms[::7]] + ["no such term"]
@@ -0,0 +1,91 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from db.repository import chart, view
+from sqlalchemy import event, select
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(view.engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(view.engine, "before_cursor_execute", count)
+
+
+def updates():
+    """
+    Table name -> [(editor name, Update_Date), ...] of every updated row
+    """
+    editors = view.editor_table
+    rows = {}
+    with view.engine.connect() as conn:
+        for table in view.contribution_tables():
+            rows[table.name] = conn.execute(
+                select(editors.c.User_Name, table.c.Update_Date)
+                .join_from(table, editors, table.c.Update_User == editors.c.User_Id)
+                .where(table.c.Update_Date.is_not(None))
+            ).all()
+    return rows
+
+
+def expected_series(rows, from_date: datetime, to_date: datetime) -> dict:
+    """
+    The daily series of `rows`, zero-filled from `from_date` to `to_date`
+    """
+    days = []
+    day = from_date.date()
+    while day <= to_date.date():
+        days.append(day)
+        day += timedelta(days=1)
+    counts = Counter(
+        (user_name, updated.date())
+        for user_name, updated in rows
+        if from_date.date() <= updated.date() <= to_date.date()
+    )
+    return {
+        user_name: {
+            "dates": tuple(day.isoformat() for day in days),
+            "activity": tuple(counts[user_name, day] for day in days),
+        }
+        for user_name in {user_name for user_name, _ in counts}
+    }
+
+
+def test_default_window_is_the_whole_table(statements):
+    activity = chart.editor_activity()
+    assert len(statements) == 1
+
+    for table_name, rows in updates().items():
+        dates = [updated for _, updated in rows]
+        expected = expected_series(rows, min(dates), max(dates))
+        assert activity[table_name] == expected
+        # Zero-filled: one value per day of the window, for every editor
+        for series in activity[table_name].values():
+            assert len(series["activity"]) == len(series["dates"])
+        assert 0 in next(iter(activity[table_name].values()))["activity"]
+
+
+def test_last_day_is_included_entirely():
+    rows = updates()[view.dictionary_table.name]
+    # A day with updates after midnight
+    last = max(updated for _, updated in rows if updated.time() != datetime.min.time())
+    to_date = datetime.combine(last.date(), datetime.min.time())
+    from_date = to_date - timedelta(days=6)
+
+    activity = chart.editor_activity(from_date, to_date)
+    series = activity[view.dictionary_table.name]
+    assert series == expected_series(rows, from_date, to_date)
+    assert sum(sum(s["activity"]) for s in series.values()) == sum(
+        from_date <= updated < to_date + timedelta(days=1) for _, updated in rows
+    )
+
+
+def test_reversed_window_is_empty():
+    activity = chart.editor_activity(datetime(2023, 2, 1), datetime(2023, 1, 1))
+    assert all(series == [] for series in activity.values())
@@ -0,0 +1,44 @@
+import pytest
+from core.config import settings
+from db.repository import view
+from tests.utils.concept import comparable
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Spread the IN lists over several statements
+    monkeypatch.setattr(settings, "SQL_IN_CHUNK_SIZE", 50)
+
+
+@pytest.fixture
+def with_index(monkeypatch, concept_index):
+    monkeypatch.setattr(view.concept_index, "index", concept_index)
+
+
+def test_locate_vn_terms_matches_single_lookups(small_chunks, vn_terms):
+    batch = view.locate_vn_terms(vn_terms)
+    assert list(batch) == vn_terms
+    for term in vn_terms:
+        assert comparable(batch[term]) == comparable(view.locate_vn_term(term)), term
+
+
+def test_locate_en_terms_matches_single_lookups(small_chunks, en_terms):
+    batch = view.locate_en_terms(en_terms)
+    assert list(batch) == en_terms
+    for term in en_terms:
+        assert comparable(batch[term]) == comparable(view.locate_en_term(term)), term
+
+
+def test_batch_lookups_match_with_index(with_index, vn_terms, en_terms):
+    for term, concept in view.locate_vn_terms(vn_terms).items():
+        assert concept == view.locate_vn_term(term)
+    for term, concept in view.locate_en_terms(en_terms).items():
+        assert concept == view.locate_en_term(term)
+
+
+def test_duplicate_terms_resolve_once(en_terms):
+    term = en_terms[0]
+    assert list(view.locate_en_terms([term, term, term.upper()])) == [
+        term,
+        term.upper(),
+    ]
@@ -0,0 +1,48 @@
+import threading
+
+from db.repository import view
+from db.repository.view import ChangeTokens
+
+
+class SlowTokens(ChangeTokens):
+    """
+    Change tokens whose fetches after the first wait for `release`
+    """
+
+    def __init__(self):
+        super().__init__(view.change_token_tables, ttl=0)
+        self.fetches = 0
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def fetch(self):
+        self.fetches += 1
+        if self.fetches > 1:
+            self.fetching.set()
+            self.release.wait(5)
+        return {"T": (self.fetches, None, None)}
+
+
+def test_first_get_waits_for_the_tokens():
+    tokens = SlowTokens()
+    assert tokens.get() == {"T": (1, None, None)}
+
+
+def test_expired_tokens_are_served_while_one_thread_refreshes():
+    tokens = SlowTokens()
+    tokens.get()
+    # Expired: every get returns the current tokens at once, one refresh runs
+    for _ in range(5):
+        assert tokens.get() == {"T": (1, None, None)}
+    assert tokens.fetching.wait(5)
+    assert tokens.fetches == 2
+
+    tokens.release.set()
+    with tokens._lock:
+        assert tokens.tokens == {"T": (2, None, None)}
+
+
+def test_fetch_does_not_count_rows():
+    statement = str(view.change_tokens_query(view.change_token_tables)).lower()
+    assert "count" not in statement
+    assert all(token[2] is None for token in view.change_tokens.fetch().values())
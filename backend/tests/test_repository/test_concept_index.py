@@ -0,0 +1,38 @@
+from db.collation import collation_key
+from db.repository import view
+from tests.utils.concept import comparable
+
+
+def test_collation_key():
+    assert collation_key("Viêm Phổi  ") == collation_key("viêm phổi")
+    assert collation_key(" fever") != collation_key("fever")
+    assert collation_key("viêm") != collation_key("viem")
+    assert collation_key(None) is None
+
+
+def test_locate_vn_term_matches_sql(concept_index, vn_terms):
+    for term in vn_terms:
+        assert comparable(concept_index.locate_vn_term(term)) == comparable(
+            view.locate_vn_term(term)
+        ), term
+
+
+def test_locate_en_term_matches_sql(concept_index, en_terms):
+    for term in en_terms:
+        assert comparable(concept_index.locate_en_term(term)) == comparable(
+            view.locate_en_term(term)
+        ), term
+
+
+def test_term_exists_matches_sql(concept_index, vn_terms, en_terms):
+    for term in vn_terms:
+        assert concept_index.vn_term_exists(term) == view.vn_term_exists(term), term
+    for term in en_terms:
+        assert concept_index.en_term_exists(term) == view.en_term_exists(term), term
+
+
+def test_lookup_ignores_case_and_trailing_spaces(concept_index, en_terms):
+    term = en_terms[0]
+    found = concept_index.locate_en_term(term)
+    assert found[0] is not None
+    assert concept_index.locate_en_term(term.upper() + "  ") == found
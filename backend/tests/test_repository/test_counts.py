@@ -0,0 +1,99 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from core.cache import LRUCache
+from db.models.table import CountMode
+from db.repository import view
+from db.session import KnowledgebaseSessionLocal
+from sqlalchemy import delete, insert
+
+EXTRA_ID = 2_000_000
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # A cache of its own, so that counts of other tests do not leak in
+    monkeypatch.setattr(view, "row_count_cache", LRUCache(maxsize=64, ttl=60))
+    db = KnowledgebaseSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def extra_row():
+    """
+    Add a dictionary row once called
+    """
+    dictionary = view.dictionary_table
+
+    def add():
+        with view.engine.begin() as conn:
+            conn.execute(
+                insert(dictionary),
+                {"ID": EXTRA_ID, "VN_main": "thêm", "EN_main": "extra"},
+            )
+
+    yield add
+    with view.engine.begin() as conn:
+        conn.execute(delete(dictionary).where(dictionary.c.ID == EXTRA_ID))
+
+
+def count_star(table) -> int:
+    with view.engine.connect() as conn:
+        return conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{table.name}"').scalar()
+
+
+@pytest.mark.parametrize("mode", list(CountMode))
+def test_counts_match_count_star(db, mode):
+    for table in view.concept_tables:
+        assert view.get_count(db, table, mode) == count_star(table), table.name
+
+
+def test_approx_falls_back_without_sys_partitions(db):
+    assert view.approx_count(db, view.dictionary_table) is None
+    assert view.get_count(db, view.dictionary_table, CountMode.APPROX) == count_star(
+        view.dictionary_table
+    )
+
+
+def test_approx_count_reads_sys_partitions():
+    def session(n_rows):
+        result = SimpleNamespace(scalar=lambda: n_rows)
+        return SimpleNamespace(
+            get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mssql")),
+            execute=lambda query: result,
+        )
+
+    assert view.approx_count(session(1234), view.dictionary_table) == 1234
+    # A table missing from the catalog
+    assert view.approx_count(session(None), view.dictionary_table) is None
+
+
+def test_counts_are_cached_until_the_ttl(db, monkeypatch, extra_row):
+    monkeypatch.setattr(view, "row_count_cache", LRUCache(maxsize=64, ttl=0.2))
+    table = view.dictionary_table
+    n_rows = view.get_count(db, table)
+
+    extra_row()
+    assert view.get_count(db, table) == n_rows
+    time.sleep(0.25)
+    assert view.get_count(db, table) == n_rows + 1
+
+
+def test_counts_are_dropped_when_the_table_changes(db, extra_row):
+    table = view.dictionary_table
+    n_rows = view.get_count(db, table)
+
+    extra_row()
+    view.change_tokens.changed(table.name, (None, None, None))
+    assert view.get_count(db, table) == n_rows + 1
+
+
+def test_table_summary_counts(user_client):
+    table = view.dictionary_table
+    for mode in CountMode:
+        summary = user_client.get(
+            f"/table/summary/{table.name}", params={"count": mode.value}
+        ).json()
+        assert summary["n_rows"] == count_star(table)
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+from db.repository import view
+from db.repository.view import EditorContributions
+from sqlalchemy import delete, func, insert, select, update
+
+EXTRA_ID = 3_000_000
+
+
+def group_by_count(mode: str, since=None, until=None) -> dict:
+    """
+    Table name -> editor name -> rows, by one GROUP BY per table, leaving out
+    editors without rows
+    """
+    user_col, date_col = view.contribution_columns(mode)
+    with view.engine.connect() as conn:
+        names = dict(
+            conn.execute(
+                select(view.editor_table.c.User_Id, view.editor_table.c.User_Name)
+            ).all()
+        )
+        expected = {}
+        for table in view.contribution_tables():
+            date = table.c[date_col]
+            query = select(table.c[user_col], func.count()).group_by(table.c[user_col])
+            if since is not None:
+                query = query.where(date >= since)
+            if until is not None:
+                query = query.where(date < until)
+            expected[table.name] = {
+                names[user_id]: n_rows
+                for user_id, n_rows in conn.execute(query)
+                if user_id in names
+            }
+    return expected
+
+
+def nonzero(contribution: dict) -> dict:
+    return {
+        table_name: {name: n for name, n in counts.items() if n}
+        for table_name, counts in contribution.items()
+    }
+
+
+def latest(column) -> datetime:
+    with view.engine.connect() as conn:
+        return conn.execute(select(func.max(column))).scalar()
+
+
+@pytest.fixture
+def dictionary_row():
+    """
+    The first dictionary row updated by editor 1, restored afterwards
+    """
+    dictionary = view.dictionary_table
+    with view.engine.connect() as conn:
+        row = conn.execute(
+            select(dictionary)
+            .where(dictionary.c.Update_User == 1)
+            .order_by(dictionary.c.ID)
+            .limit(1)
+        ).one()
+    yield row
+    with view.engine.begin() as conn:
+        conn.execute(
+            update(dictionary)
+            .where(dictionary.c.ID == row.ID)
+            .values(Update_Date=row.Update_Date)
+        )
+        conn.execute(delete(dictionary).where(dictionary.c.ID == EXTRA_ID))
+
+
+@pytest.mark.parametrize("mode", ["insert", "update"])
+def test_full_counts(mode):
+    assert nonzero(view.rows_per_editors(mode)) == group_by_count(mode)
+
+
+@pytest.mark.parametrize("mode", ["insert", "update"])
+def test_window_counts(mode):
+    _, date_col = view.contribution_columns(mode)
+    until = latest(view.dictionary_table.c[date_col])
+    since = until - timedelta(days=7)
+    counts = view.rows_per_editors(mode, since, until)
+    assert nonzero(counts) == group_by_count(mode, since, until)
+    # Every editor is listed, with 0 where they did nothing
+    assert all(
+        len(c) == len(counts[view.dictionary_table.name]) for c in counts.values()
+    )
+
+
+def test_incremental_insert_counts(dictionary_row):
+    contributions = EditorContributions(full_refresh_seconds=3600)
+    assert nonzero(contributions.counts()) == group_by_count("insert")
+
+    later = latest(view.dictionary_table.c.Insert_Date) + timedelta(minutes=1)
+    with view.engine.begin() as conn:
+        conn.execute(
+            insert(view.dictionary_table),
+            {
+                "ID": EXTRA_ID,
+                "VN_main": "mới",
+                "EN_main": "new",
+                "Insert_User": 1,
+                "Insert_Date": later,
+                "Update_User": 1,
+                "Update_Date": later,
+            },
+        )
+    assert nonzero(contributions.counts()) == group_by_count("insert")
+
+
+def test_row_updated_again_by_the_same_editor(user_client, dictionary_row):
+    before = group_by_count("update")
+    later = latest(view.dictionary_table.c.Update_Date) + timedelta(minutes=1)
+    with view.engine.begin() as conn:
+        conn.execute(
+            update(view.dictionary_table)
+            .where(view.dictionary_table.c.ID == dictionary_row.ID)
+            .values(Update_Date=later)
+        )
+    assert group_by_count("update") == before
+
+    for incremental in ("false", "true", "true"):
+        counts = user_client.get(
+            "/summary/editor/update_count", params={"incremental": incremental}
+        ).json()
+        assert nonzero(counts) == before
@@ -0,0 +1,70 @@
+import pytest
+from db.repository import view
+from db.repository.concept_index import ConceptIndex
+from sqlalchemy import delete, event, insert
+
+FIRST_ID, SECOND_ID = 1_000_000, 1_000_001
+
+
+@pytest.fixture
+def duplicates():
+    """
+    Two dictionary rows sharing VN_main and a VN_synonym listed for both,
+    inserted with the higher id first
+    """
+    dictionary, synonyms = view.dictionary_table, view.vn_synonym_table
+    with view.engine.begin() as conn:
+        conn.execute(
+            insert(dictionary),
+            [
+                {"ID": SECOND_ID, "VN_main": "trùng lặp", "EN_main": "second"},
+                {"ID": FIRST_ID, "VN_main": "Trùng lặp", "EN_main": "first"},
+            ],
+        )
+        conn.execute(
+            insert(synonyms),
+            [
+                {"ID": SECOND_ID, "VN_synonym": "lặp lại", "VN_main": "khác"},
+                {"ID": FIRST_ID, "VN_synonym": "lặp lại", "VN_main": "trùng lặp"},
+            ],
+        )
+    yield
+    with view.engine.begin() as conn:
+        conn.execute(delete(dictionary).where(dictionary.c.ID >= FIRST_ID))
+        conn.execute(delete(synonyms).where(synonyms.c.ID >= FIRST_ID))
+
+
+@pytest.fixture
+def reversed_scans():
+    """
+    Have SQLite return unordered rows backwards, so that only an ORDER BY
+    gets the lowest id first
+    """
+
+    def reverse(conn):
+        conn.exec_driver_sql("PRAGMA reverse_unordered_selects = ON")
+
+    event.listen(view.engine, "engine_connect", reverse)
+    yield
+    event.remove(view.engine, "engine_connect", reverse)
+    # Drop the pooled connections the pragma was set on
+    view.engine.dispose()
+
+
+def build_index() -> ConceptIndex:
+    return ConceptIndex.build(
+        view.engine,
+        view.dictionary_table,
+        view.vn_synonym_table,
+        view.en_vsrc_tables,
+        view.en_vsrc_synonym_tables,
+    )
+
+
+@pytest.mark.parametrize("term", ["trùng lặp", "TRùNG lặp", "lặp lại"])
+def test_lowest_primary_key_wins(duplicates, reversed_scans, term):
+    index = build_index()
+    for locate in (view.locate_vn_term, index.locate_vn_term):
+        vn_main, en_main, *_ = locate(term)
+        assert (vn_main, en_main) == ("Trùng lặp", "first")
+    assert view.locate_vn_terms([term])[term][:2] == ("Trùng lặp", "first")
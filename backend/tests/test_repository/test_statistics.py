@@ -0,0 +1,39 @@
+from db.repository import view
+from sqlalchemy import select
+
+
+def statistics_from_joins(en_vsrc_tables):
+    """
+    The statistics as computed before the aggregate query: the length of
+    each join result
+    """
+    with view.engine.connect() as conn:
+        dictionary_size = len(
+            conn.execute(select(view.dictionary_table.c.EN_main)).fetchall()
+        )
+    return {
+        "dictionary_size": dictionary_size,
+        "count_uncharted_en_mains": len(
+            view.calculate_non_validated_en_main(en_vsrc_tables)
+        ),
+        "count_charted": {
+            src.name: len(view.calculate_validated_en_main([src]))
+            for src in en_vsrc_tables
+        },
+        "count_charted_to_all_vsources": len(
+            view.calculate_validated_en_main(en_vsrc_tables)
+        ),
+    }
+
+
+def test_statistics_match_joins():
+    statistics = view.validated_en_main_statistics(view.en_vsrc_tables)
+    assert statistics == statistics_from_joins(view.en_vsrc_tables)
+    # The stand-in has charted, uncharted and doubly charted terms
+    assert 0 < statistics["count_uncharted_en_mains"]
+    assert 0 < statistics["count_charted_to_all_vsources"]
+
+
+def test_statistics_of_one_source_match_joins():
+    sources = view.en_vsrc_tables[:1]
+    assert view.validated_en_main_statistics(sources) == statistics_from_joins(sources)
@@ -0,0 +1,68 @@
+import pytest
+from db.repository import view
+from db.repository.suggest import SuggestIndex, Suggestions, fold
+
+
+@pytest.fixture(scope="module")
+def suggestions():
+    return Suggestions.build(
+        view.engine,
+        view.dictionary_table,
+        view.vn_synonym_table,
+        view.en_vsrc_tables,
+        view.en_vsrc_synonym_tables,
+    )
+
+
+def test_fold():
+    assert fold("Viêm  Phổi ") == "viem phoi"
+    assert fold("Đau đầu") == "dau dau"
+    assert fold("FEVER") == fold("fever")
+    assert fold("   ") == ""
+
+
+def test_mains_rank_before_synonyms():
+    index = SuggestIndex(
+        ["sốt cao", "Sot xuat huyet", "ho"],
+        [("sốt nhẹ", "sốt cao"), ("số ít", None), ("ho khan", "ho")],
+    )
+    assert index.suggest("SO", 10) == [
+        {"term": "sốt cao", "main": "sốt cao", "kind": "main"},
+        {"term": "Sot xuat huyet", "main": "Sot xuat huyet", "kind": "main"},
+        {"term": "số ít", "main": None, "kind": "synonym"},
+        {"term": "sốt nhẹ", "main": "sốt cao", "kind": "synonym"},
+    ]
+    assert [s["term"] for s in index.suggest("sot", 2)] == ["sốt cao", "Sot xuat huyet"]
+
+
+def test_term_is_suggested_once():
+    index = SuggestIndex(["ho"], [("ho", "ho"), ("họ", "ho")])
+    assert index.suggest("ho", 10) == [
+        {"term": "ho", "main": "ho", "kind": "main"},
+        {"term": "họ", "main": "ho", "kind": "synonym"},
+    ]
+
+
+def test_blank_prefix_suggests_nothing():
+    assert SuggestIndex(["ho"], []).suggest("  ", 10) == []
+
+
+def test_every_term_is_suggested(suggestions, vn_terms, en_terms):
+    for index, terms in ((suggestions.vn, vn_terms), (suggestions.en, en_terms)):
+        # The last term is unknown
+        for term in terms[:-1]:
+            found = index.suggest(term, 1000)
+            assert fold(term) in [fold(s["term"]) for s in found], term
+
+
+def test_database_fallback_until_built(monkeypatch, suggestions, vn_terms):
+    # Only the index ignores diacritics
+    term = next(t for t in vn_terms if fold(t) != t.casefold())
+
+    monkeypatch.setattr(view.suggestions, "index", None)
+    fallback = view.suggest_vn_terms(fold(term), 50)
+    monkeypatch.setattr(view.suggestions, "index", suggestions)
+    built = view.suggest_vn_terms(fold(term), 50)
+
+    assert term not in [s["term"] for s in fallback]
+    assert term in [s["term"] for s in built]
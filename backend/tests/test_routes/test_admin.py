@@ -0,0 +1,50 @@
+import pytest
+from core.config import settings
+
+SUPERUSER_ROUTES = ["/health/db", "/admin/schema", "/admin/cache", "/metrics"]
+
+
+@pytest.mark.parametrize("path", SUPERUSER_ROUTES)
+def test_superuser_route_redirects_anonymous_users(client, path):
+    response = client.get(path, follow_redirects=False)
+    assert response.status_code == 302
+    assert response.headers["location"].startswith("/auth/login")
+
+
+@pytest.mark.parametrize("path", SUPERUSER_ROUTES)
+def test_superuser_route_forbids_other_users(user_client, path):
+    assert user_client.get(path, follow_redirects=False).status_code == 403
+
+
+@pytest.mark.parametrize("path", SUPERUSER_ROUTES)
+def test_superuser_route_serves_superusers(superuser_client, path):
+    assert superuser_client.get(path, follow_redirects=False).status_code == 200
+
+
+def test_health_db_reports_both_pools(superuser_client):
+    assert set(superuser_client.get("/health/db").json()) == {
+        "userdb",
+        "knowledgebase",
+    }
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+
+def test_metrics_accepts_the_token(client, metrics_token):
+    response = client.get(
+        "/metrics", headers={"Authorization": f"Bearer {metrics_token}"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+@pytest.mark.parametrize("header", ["Bearer wrong", "Basic scrape-secret", ""])
+def test_metrics_rejects_other_credentials(user_client, metrics_token, header):
+    response = user_client.get(
+        "/metrics", headers={"Authorization": header}, follow_redirects=False
+    )
+    assert response.status_code == 403
@@ -0,0 +1,49 @@
+import pytest
+from core.charts import chart_renderer
+
+PATH = "/summary/editor/activity"
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """
+    Charts the route asks for, without drawing them
+    """
+    calls = []
+
+    async def activity_chart(data, table_name, key):
+        calls.append(key)
+        return chart_renderer.path(table_name, key)
+
+    monkeypatch.setattr(chart_renderer, "activity_chart", activity_chart)
+    return calls
+
+
+def test_page_carries_an_etag(user_client, renders):
+    response = user_client.get(PATH)
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert renders
+
+
+@pytest.mark.parametrize("tag", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_revalidation_skips_rendering(user_client, renders, tag):
+    etag = user_client.get(PATH).headers["etag"]
+    renders.clear()
+
+    response = user_client.get(PATH, headers={"If-None-Match": tag.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert renders == []
+
+
+def test_other_etag_renders_the_page(user_client, renders):
+    response = user_client.get(PATH, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert renders
+
+
+def test_etag_depends_on_resolution(user_client, renders):
+    day = user_client.get(PATH, params={"resolution": "day"}).headers["etag"]
+    week = user_client.get(PATH, params={"resolution": "week"}).headers["etag"]
+    assert day != week
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+from db.repository import view
+from sqlalchemy import select, update
+
+PATH = "/concept/vi/{}"
+
+
+@pytest.fixture
+def vn_main():
+    dictionary = view.dictionary_table
+    with view.engine.connect() as conn:
+        return conn.execute(
+            select(dictionary.c.VN_main).order_by(dictionary.c.ID).limit(1)
+        ).scalar()
+
+
+@pytest.fixture
+def fresh_tokens(monkeypatch):
+    """
+    Have the next request fetch the change tokens
+    """
+
+    def refetch():
+        monkeypatch.setattr(view.change_tokens, "fetched_at", None)
+
+    refetch()
+    return refetch
+
+
+def test_concept_carries_validators(user_client, vn_main, fresh_tokens):
+    response = user_client.get(PATH.format(vn_main))
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" in response.headers
+
+
+def test_matching_etag_is_not_modified(user_client, vn_main, fresh_tokens):
+    first = user_client.get(PATH.format(vn_main))
+    response = user_client.get(
+        PATH.format(vn_main), headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+def test_if_modified_since_is_not_modified(user_client, vn_main, fresh_tokens):
+    first = user_client.get(PATH.format(vn_main))
+    response = user_client.get(
+        PATH.format(vn_main),
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert response.status_code == 304
+
+
+def test_write_changes_the_etag(user_client, vn_main, fresh_tokens):
+    dictionary = view.dictionary_table
+    first = user_client.get(PATH.format(vn_main))
+    with view.engine.begin() as conn:
+        row = conn.execute(
+            select(dictionary.c.ID, dictionary.c.EN_main, dictionary.c.Update_Date)
+            .where(dictionary.c.VN_main == vn_main)
+            .order_by(dictionary.c.ID)
+        ).first()
+        conn.execute(
+            update(dictionary)
+            .where(dictionary.c.ID == row.ID)
+            .values(EN_main="changed", Update_Date=datetime(2100, 1, 1))
+        )
+    try:
+        fresh_tokens()
+        response = user_client.get(
+            PATH.format(vn_main), headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert response.status_code == 200
+        assert response.json()["en_main"] == "changed"
+        assert response.headers["etag"] != first.headers["etag"]
+    finally:
+        with view.engine.begin() as conn:
+            conn.execute(
+                update(dictionary)
+                .where(dictionary.c.ID == row.ID)
+                .values(EN_main=row.EN_main, Update_Date=row.Update_Date)
+            )
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+from db.repository import view
+from db.repository.pagination import decode_cursor, encode_cursor
+from sqlalchemy import func, select
+
+TABLE_NAME = view.dictionary_table.name
+PATH = f"/review/{TABLE_NAME}"
+
+
+def review_pages(table, date, page_size):
+    ids, cursor = [], None
+    while True:
+        page, next_cursor = view.review_per_day(
+            table, date, "update", page_size, cursor
+        )
+        assert len(page["ID"]) <= page_size
+        ids += page["ID"]
+        if next_cursor is None:
+            return ids
+        cursor = decode_cursor(next_cursor, *view.review_cursor_types(table))
+
+
+@pytest.fixture(scope="module")
+def busiest_day():
+    table = view.dictionary_table
+    day = func.date(table.c.Update_Date)
+    with view.engine.connect() as conn:
+        return conn.execute(
+            select(day).group_by(day).order_by(func.count().desc()).limit(1)
+        ).scalar_one()
+
+
+def test_pages_cover_the_day(busiest_day):
+    table = view.dictionary_table
+    start = datetime.fromisoformat(busiest_day)
+    with view.engine.connect() as conn:
+        expected = (
+            conn.execute(
+                select(table.c.ID)
+                .where(
+                    table.c.Update_Date >= start,
+                    table.c.Update_Date < start + timedelta(days=1),
+                )
+                .order_by(table.c.Update_Date, table.c.ID)
+            )
+            .scalars()
+            .all()
+        )
+
+    assert len(expected) > 2
+    assert review_pages(table, busiest_day, page_size=2) == expected
+
+
+def test_page_links_to_the_next_page(user_client, busiest_day):
+    response = user_client.get(PATH, params={"date": busiest_day, "page_size": 1})
+    assert response.status_code == 200
+    assert "cursor=" in response.text
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        encode_cursor(["2023-01-01T10:00:00"]),
+        encode_cursor(["yesterday", 1]),
+        encode_cursor([20230101, 1]),
+        encode_cursor(["2023-01-01T10:00:00", "1"]),
+        encode_cursor([["2023-01-01T10:00:00"], 1]),
+    ],
+)
+def test_invalid_cursor_is_a_bad_request(user_client, cursor):
+    response = user_client.get(PATH, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_invalid_date_is_a_bad_request(user_client):
+    response = user_client.get(PATH, params={"date": "2023-31-12"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid date"
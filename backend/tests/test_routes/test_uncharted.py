@@ -0,0 +1,67 @@
+import json
+from collections import Counter
+
+import pytest
+from db.repository import view
+from db.repository.pagination import encode_cursor
+
+PATH = "/status/uncharted_en_main"
+
+
+@pytest.fixture(scope="module")
+def uncharted():
+    # The pages leave out NULL EN_mains
+    return Counter(
+        en_main
+        for en_main in view.calculate_non_validated_en_main(view.en_vsrc_tables)
+        if en_main is not None
+    )
+
+
+def read_pages(client, limit: int) -> list:
+    en_mains, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get(PATH, params=params).json()
+        assert len(page["uncharted_en_mains"]) <= limit
+        en_mains += page["uncharted_en_mains"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return en_mains
+
+
+def test_pages_cover_every_uncharted_en_main(user_client, uncharted):
+    en_mains = read_pages(user_client, limit=7)
+    assert Counter(en_mains) == uncharted
+    assert en_mains == read_pages(user_client, limit=len(en_mains) + 1)
+
+
+def test_stream_matches_pages(user_client, uncharted):
+    response = user_client.get(PATH, params={"format": "ndjson"})
+    en_mains = [json.loads(line) for line in response.text.splitlines()]
+    assert en_mains == read_pages(user_client, limit=50)
+
+
+def test_stream_resumes_after_cursor(user_client):
+    first = user_client.get(PATH, params={"limit": 5}).json()
+    response = user_client.get(
+        PATH, params={"format": "ndjson", "cursor": first["next_cursor"]}
+    )
+    rest = [json.loads(line) for line in response.text.splitlines()]
+    assert first["uncharted_en_mains"] + rest == read_pages(user_client, limit=50)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        encode_cursor(["fever"]),
+        encode_cursor([1, "fever"]),
+        encode_cursor(["fever", "1"]),
+        encode_cursor(["fever", True]),
+        encode_cursor({"en_main": "fever"}),
+    ],
+)
+def test_invalid_cursor_is_a_bad_request(user_client, cursor):
+    response = user_client.get(PATH, params={"limit": 5, "cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import pytest
+from apis.v1 import route_login
+from core.config import settings
+from core.security import Principal, create_access_token, principal_cache
+from db.models.user import User
+from db.session import UserdbSessionLocal
+from fastapi.testclient import TestClient
+from jose import jwt
+from tests.utils.user import get_or_create_user, login
+
+EMAIL = "editor.principal@example.com"
+
+
+@pytest.fixture
+def userdb(app):
+    # The user tables are created with the application
+    get_or_create_user(EMAIL)
+    principal_cache.clear()
+    db = UserdbSessionLocal()
+    yield db
+    db.close()
+    principal_cache.clear()
+
+
+@pytest.fixture
+def user_lookups(monkeypatch):
+    """
+    Emails get_current_user looked up in the user database
+    """
+    lookups = []
+    get_user_ = route_login.get_user
+
+    def get_user(email, db):
+        lookups.append(email)
+        return get_user_(email=email, db=db)
+
+    monkeypatch.setattr(route_login, "get_user", get_user)
+    return lookups
+
+
+@pytest.fixture
+def cached_ttls(monkeypatch):
+    ttls = []
+    set_ = principal_cache.set
+
+    def spy(key, value, ttl=None, nbytes=0):
+        ttls.append(ttl)
+        set_(key, value, ttl=ttl, nbytes=nbytes)
+
+    monkeypatch.setattr(principal_cache, "set", spy)
+    return ttls
+
+
+def test_verified_token_is_cached(userdb, user_lookups):
+    token = create_access_token(data={"sub": EMAIL})
+    first = route_login.get_current_user(token=token, db=userdb)
+    second = route_login.get_current_user(token=token, db=userdb)
+    assert first == second == Principal(EMAIL, True, False)
+    assert user_lookups == [EMAIL]
+
+
+def test_cache_lifetime_is_capped_at_exp(userdb, cached_ttls):
+    token = create_access_token(
+        data={"sub": EMAIL}, expires_delta=timedelta(seconds=30)
+    )
+    route_login.get_current_user(token=token, db=userdb)
+    assert 0 < cached_ttls[0] <= 30 < settings.PRINCIPAL_CACHE_TTL_SECONDS
+
+
+def test_token_without_exp(userdb, cached_ttls):
+    token = jwt.encode(
+        {"sub": EMAIL}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    assert route_login.get_current_user(token=token, db=userdb).email == EMAIL
+    assert cached_ttls == [settings.PRINCIPAL_CACHE_TTL_SECONDS]
+
+
+def test_deactivation_evicts_cached_tokens(app, superuser_client, userdb):
+    victim = login(TestClient(app), EMAIL)
+    assert victim.get("/table/names", follow_redirects=False).status_code == 200
+
+    response = superuser_client.post(f"/admin/users/{EMAIL}/deactivate")
+    assert response.json() == {"email": EMAIL, "is_active": False}
+    try:
+        # Nothing left to evict
+        assert principal_cache.evict(lambda token, p: p.email == EMAIL) == 0
+        assert victim.get("/table/names", follow_redirects=False).status_code == 302
+    finally:
+        userdb.query(User).filter_by(email=EMAIL).update({"is_active": True})
+        userdb.commit()
+
+
+def test_deactivate_unknown_user(superuser_client):
+    response = superuser_client.post("/admin/users/nobody@example.com/deactivate")
+    assert response.status_code == 404
+
+
+def test_deactivate_is_for_superusers(user_client):
+    response = user_client.post(f"/admin/users/{EMAIL}/deactivate")
+    assert response.status_code == 403
@@ -0,0 +1,29 @@
+from db.repository import view
+from sqlalchemy import select
+
+
+def ascii_upper(term: str) -> str:
+    """
+    Case variant of `term` the stand-in's NOCASE collation still matches
+    """
+    return "".join(c.upper() if c.isascii() else c for c in term)
+
+
+def comparable(concept: tuple) -> tuple:
+    """
+    Concept tuple with its synonyms sorted: the SQL implementation returns
+    them in no particular order
+    """
+    vn_main, en_main, vn_synonyms, en_synonyms, en_main_vsrc = concept
+    if vn_main is None:
+        return concept
+    return vn_main, en_main, sorted(vn_synonyms), sorted(en_synonyms), en_main_vsrc
+
+
+def column_values(*columns) -> list:
+    with view.engine.connect() as conn:
+        return [
+            value
+            for column in columns
+            for value in conn.execute(select(column).distinct()).scalars()
+        ]
@@ -0,0 +1,34 @@
+from core.security import create_access_token
+from db.models.user import User
+from db.session import UserdbSessionLocal
+from fastapi.testclient import TestClient
+
+
+def get_or_create_user(email: str, is_superuser: bool = False) -> User:
+    """
+    User `email`, created without a usable password: tests sign in with
+    a token, see `login`
+    """
+    db = UserdbSessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            user = User(
+                email=email, password="", is_active=True, is_superuser=is_superuser
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return user
+    finally:
+        db.close()
+
+
+def login(client: TestClient, email: str, is_superuser: bool = False) -> TestClient:
+    """
+    Send the requests of `client` as user `email`
+    """
+    get_or_create_user(email, is_superuser)
+    token = create_access_token(data={"sub": email})
+    client.cookies.set("access_token", f"Bearer {token}")
+    return client